@@ -0,0 +1,264 @@
+"""
+Laufzeit-Benchmark der heißen Pfade mit synthetischen Spielabenden
+Ein deterministischer Generator erzeugt Sessions mit 4-6 Spielern und 100 bis 50.000 Runden
+(Soli, Bock-Runden, reihum Aussetzende). Pro Session werden Punkte, alle Statistik-Funktionen aus
+src/statistics.py, die Historie, der Export-Schnappschuss jedes Sidebar-Reruns, Export/Import und
+serialize_game_data gemessen - jeweils kalt (nach einer Änderung der Runden, alle Caches ungültig)
+und warm (unveränderte Runden, wie bei Reruns).
+Gemessen wird der Median mehrerer Durchläufe in Millisekunden.
+
+Aufruf (im Projektverzeichnis):
+    python benchmarks/hot_paths.py [--sizes 4x100 5x1000 6x10000 6x50000] [--output benchmarks/baseline.json]
+    python benchmarks/hot_paths.py --compare benchmarks/baseline.json [--tolerance 0.25]
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Kein Vorwärm-Thread während der Messung (pandas wird beim ersten Historien-Aufruf geladen)
+os.environ.setdefault("DOPPELKOPF_PREWARM", "0")
+
+import streamlit as st  # noqa: E402
+from streamlit import logger as streamlit_logger  # noqa: E402
+
+# Spieler x Runden
+DEFAULT_SIZES = ('4x100', '5x1000', '6x10000', '6x50000')
+
+PLAYER_NAMES = ('Anna', 'Ben', 'Carla', 'Dirk', 'Eva', 'Frank')
+
+# Langsamer als Baseline × (1 + Toleranz) gilt als Regression, Abweichungen unter MIN_DELTA_MS sind Rauschen
+DEFAULT_TOLERANCE = 0.25
+MIN_DELTA_MS = 0.05
+
+# Messung je Funktion: mindestens MIN_REPEAT Durchläufe, weitere bis MIN_TOTAL_SECONDS erreicht sind
+MIN_REPEAT = 3
+MAX_REPEAT = 200
+MIN_TOTAL_SECONDS = 0.2
+
+
+def generate_session(num_players: int, num_rounds: int, seed: int = 0) -> Dict:
+    """
+    Deterministische Session im Exportformat (gleiche Parameter = gleiche Daten)
+    
+    Ab 5 Spielern setzt reihum einer aus. Etwa 10 % der Runden sind Soli (gewonnen oder verloren),
+    Bock-Runden kommen in Serien so lang wie die Anzahl aktiver Spieler. Punkte werden wie in
+    _build_round verteilt.
+    """
+    rng = random.Random(seed * 1_000_003 + num_players * 100_000 + num_rounds)
+    names = list(PLAYER_NAMES[:num_players])
+    players = [{'id': str(uuid.UUID(int=rng.getrandbits(128), version=4)), 'name': name} for name in names]
+    started = datetime(2026, 1, 1, 19, 0)
+    
+    rounds = []
+    bock_remaining = 0
+    for position in range(num_rounds):
+        sitting_out = names[position % num_players] if num_players > 4 else None
+        active = [name for name in names if name != sitting_out]
+        points = rng.choice((1, 1, 2, 2, 3, 3, 4, 5, 6, 8))
+        
+        is_bock = bock_remaining > 0
+        bock_remaining = max(0, bock_remaining - 1)
+        if rng.random() < 0.05:
+            bock_remaining += len(active)
+        
+        is_solo = rng.random() < 0.1
+        scores = {name: 0 for name in names}
+        if is_solo:
+            solo_player = rng.choice(active)
+            solo_won = rng.random() < 0.45
+            winners = [solo_player] if solo_won else [name for name in active if name != solo_player]
+            for name in active:
+                if name == solo_player:
+                    scores[name] = points * (len(active) - 1) * (1 if solo_won else -1)
+                else:
+                    scores[name] = -points if solo_won else points
+        else:
+            solo_player = None
+            team_size = 2 if len(active) == 4 else rng.choice((2, 3))
+            winner_set = set(rng.sample(active, team_size))
+            winners = [name for name in active if name in winner_set]
+            for name in active:
+                scores[name] = points if name in winner_set else -points
+        
+        timestamp = started + timedelta(days=position // 60, minutes=(position % 60) * 4, seconds=rng.randrange(60))
+        rounds.append({
+            'id': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            'round_number': position + 1,
+            'timestamp': timestamp.isoformat(),
+            'is_solo': is_solo,
+            'winners': winners,
+            'points': points,
+            'solo_player': solo_player,
+            'sitting_out': sitting_out,
+            'winning_team': rng.choice(('Re', 'Kontra')),
+            'is_bock': is_bock,
+            'scores': scores
+        })
+    
+    return {
+        'session_id': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        'created_at': started.isoformat(),
+        'players': players,
+        'rounds': rounds
+    }
+
+
+def measure(function: Callable, setup: Callable = None) -> float:
+    """Median der Laufzeit von function() in ms; setup() läuft vor jedem Durchlauf und wird nicht mitgemessen"""
+    timings = []
+    total = 0.0
+    while len(timings) < MIN_REPEAT or (total < MIN_TOTAL_SECONDS and len(timings) < MAX_REPEAT):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        timings.append(elapsed * 1000)
+        total += elapsed
+    return round(statistics.median(timings), 4)
+
+
+def hot_paths() -> List[Tuple[str, Callable, bool]]:
+    """
+    Die gemessenen Funktionen: Punkte, alle Funktionen aus src/statistics.py, Historie, Export/Import
+    
+    Returns:
+        (Name, Funktion, nutzt Caches auf die Runden-Version - dann kalt und warm messen)
+    """
+    from src import statistics as stats_module
+    from src.game_logic import calculate_scores, get_round_store
+    from src.data_manager import export_session, import_session, session_exporter
+    from src.cloud_sync import serialize_game_data
+    from src.ui_history import HISTORY_PAGE_SIZE, _build_history_table
+    
+    def history_page():
+        rounds = st.session_state.rounds
+        names = [player['name'] for player in st.session_state.players]
+        _build_history_table(rounds, max(0, len(rounds) - HISTORY_PAGE_SIZE), names)
+    
+    def history_cumulative():
+        get_round_store().cumulative()
+    
+    def import_roundtrip():
+        # Export des aktuellen Stands wieder einlesen (Prüfung aller Runden, Übernahme in den Session State)
+        if not import_session(st.session_state.benchmark_export):
+            raise RuntimeError("Import der exportierten Session fehlgeschlagen")
+    
+    paths = [('calculate_scores', calculate_scores, True)]
+    paths += [
+        (name, function, True)
+        for name, function in inspect.getmembers(stats_module, inspect.isfunction)
+        if function.__module__ == stats_module.__name__
+    ]
+    paths += [
+        ('history_page', history_page, True),
+        ('history_cumulative', history_cumulative, True),
+        # Läuft bei jedem Rerun der Sidebar (Download-Button), das JSON entsteht erst beim Klick
+        ('session_exporter', session_exporter, False),
+        ('serialize_game_data', serialize_game_data, False),
+        ('export_session', export_session, False),
+        ('import_session', import_roundtrip, False),
+    ]
+    return paths
+
+
+def run_case(num_players: int, num_rounds: int, seed: int) -> Dict[str, float]:
+    """Alle heißen Pfade für eine generierte Session (Caches nutzende kalt und warm)"""
+    from src.session_manager import init_session_state
+    from src.data_manager import apply_imported_session, export_session
+    from src.game_logic import mark_rounds_changed
+    
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
+    init_session_state()
+    apply_imported_session(generate_session(num_players, num_rounds, seed))
+    st.session_state.benchmark_export = export_session()
+    
+    results = {}
+    for name, function, cached in hot_paths():
+        if not cached:
+            results[name] = measure(function)
+            continue
+        results[f"{name} (kalt)"] = measure(function, setup=mark_rounds_changed)
+        function()
+        results[f"{name} (warm)"] = measure(function)
+    return results
+
+
+def compare(baseline: Dict, current: Dict, tolerance: float) -> List[str]:
+    """Regressionen gegenüber der Baseline (nur Fälle und Messungen, die in beiden vorkommen)"""
+    regressions = []
+    for case, timings in current['results'].items():
+        for name, value in timings.items():
+            reference = baseline['results'].get(case, {}).get(name)
+            if reference is None:
+                continue
+            if value > reference * (1 + tolerance) and value - reference > MIN_DELTA_MS:
+                regressions.append(f"{case} {name}: {reference:.3f} ms -> {value:.3f} ms ({value / reference - 1:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Laufzeit der heißen Pfade mit synthetischen Sessions messen")
+    parser.add_argument('--sizes', nargs='+', default=list(DEFAULT_SIZES), help="Spieler x Runden, z.B. 4x100 6x50000")
+    parser.add_argument('--seed', type=int, default=0, help="Startwert des Generators")
+    parser.add_argument('--output', help="Ergebnisse als JSON-Baseline speichern")
+    parser.add_argument('--compare', help="Mit einer gespeicherten Baseline vergleichen (Exit-Code 1 bei Regression)")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="Erlaubte Verlangsamung (0.25 = 25 %%)")
+    args = parser.parse_args()
+    
+    # Ohne "streamlit run" warnt Streamlit bei jedem Zugriff auf den Session State
+    streamlit_logger.set_log_level('error')
+    
+    current = {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'seed': args.seed
+        },
+        'results': {}
+    }
+    for size in args.sizes:
+        num_players, num_rounds = (int(value) for value in size.lower().split('x'))
+        if not 4 <= num_players <= len(PLAYER_NAMES):
+            parser.error(f"{size}: 4 bis {len(PLAYER_NAMES)} Spieler")
+        
+        print(f"== {num_players} Spieler, {num_rounds} Runden")
+        results = run_case(num_players, num_rounds, args.seed)
+        current['results'][size] = results
+        width = max(len(name) for name in results)
+        for name, value in results.items():
+            print(f"{name:<{width}}  {value:10.3f} ms")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(current, file, indent=2, ensure_ascii=False)
+        print(f"Baseline gespeichert: {args.output}")
+    
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare(baseline, current, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} Regression(en) über {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nKeine Regression über {args.tolerance:.0%} gegenüber {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Startzeit-Benchmark: Importzeit pro Modul
+Jedes Modul wird in einem frischen Interpreter importiert (kalter Modul-Cache, warmer Dateisystem-Cache),
+nachdem streamlit bereits geladen ist - so wie im laufenden Server. Gemessen wird der Median aus
+mehreren Durchläufen in Millisekunden, einschließlich aller noch nicht geladenen Abhängigkeiten.
+
+Aufruf (im Projektverzeichnis):
+    python benchmarks/import_times.py [--repeat 5] [--baseline streamlit] [module ...]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Was streamlit_app.py beim Start importiert (zusammen gemessen als "App-Start")
+APP_MODULES = (
+    'src.session_manager',
+    'src.ui_sidebar',
+    'src.ui_player_setup',
+    'src.ui_new_round',
+    'src.ui_overview',
+    'src.ui_history',
+    'src.ui_statistics',
+)
+
+DEFAULT_MODULES = (
+    'numpy',
+    'pandas',
+    'plotly.graph_objects',
+    'boto3',
+    'src.game_logic',
+    'src.cloud_sync',
+    'src.dynamodb_backend',
+) + APP_MODULES
+
+MEASURE_SCRIPT = """
+import importlib, sys, time
+for module in sys.argv[2:]:
+    if module:
+        importlib.import_module(module)
+started = time.perf_counter()
+for module in sys.argv[1].split(','):
+    importlib.import_module(module)
+print((time.perf_counter() - started) * 1000)
+"""
+
+
+def measure(modules: str, baseline: str, repeat: int) -> float:
+    """Median der Importzeit (ms) von modules (kommagetrennt) in frischen Interpretern"""
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', MEASURE_SCRIPT, modules, baseline],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importzeit pro Modul messen")
+    parser.add_argument('modules', nargs='*', help="Module (Standard: Bibliotheken und App-Module)")
+    parser.add_argument('--repeat', type=int, default=5, help="Durchläufe pro Modul (Median)")
+    parser.add_argument('--baseline', default='streamlit', help="Vorab geladenes Modul, leer für keines")
+    args = parser.parse_args()
+    
+    rows = [(module, module) for module in (args.modules or DEFAULT_MODULES)]
+    if not args.modules:
+        rows.insert(0, ('streamlit', 'streamlit'))
+        rows.append(("App-Start", ','.join(APP_MODULES)))
+    
+    width = max(len(label) for label, _ in rows)
+    for label, modules in rows:
+        baseline = '' if modules == args.baseline else args.baseline
+        print(f"{label:<{width}}  {measure(modules, baseline, args.repeat):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
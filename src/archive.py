@@ -0,0 +1,590 @@
+"""
+Archiv vergangener Spielabende (REQUIREMENTS 6.1)
+Beendete Sessions werden normalisiert in SQLite abgelegt (Sessions, Spieler, Runden, Punkte je Spieler),
+damit Abfragen wie "alle Soli von Anna in 2026" oder "alle Abende mit diesen 5 Spielern" über Indizes
+laufen, statt jede exportierte Datei zu laden. Der JSON-Export bleibt das Austauschformat.
+"""
+import heapq
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from src.rollups import PlayerRollup, StreakBounds, chain_streaks, compute_session_rollup, top_k
+
+# Runden-Felder mit eigener Spalte; alle übrigen landen verlustfrei in rounds.extra
+_ROUND_COLUMNS = (
+    'id', 'round_number', 'timestamp', 'is_solo', 'winners', 'points', 'solo_player',
+    'sitting_out', 'winning_team', 'is_bock', 'scores'
+)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS sessions ("
+    " session_pk INTEGER PRIMARY KEY,"
+    " session_id TEXT NOT NULL UNIQUE,"
+    " played_on TEXT NOT NULL,"          # Datum des Abends (YYYY-MM-DD)
+    " created_at TEXT,"
+    " archived_at TEXT NOT NULL,"
+    " player_key TEXT NOT NULL,"         # Sortierte Spielernamen (Abende mit genau diesen Spielern)
+    " round_count INTEGER NOT NULL,"
+    " extra TEXT)",
+    "CREATE TABLE IF NOT EXISTS players ("
+    " player_pk INTEGER PRIMARY KEY,"
+    " name TEXT NOT NULL UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS session_players ("
+    " session_pk INTEGER NOT NULL REFERENCES sessions ON DELETE CASCADE,"
+    " player_pk INTEGER NOT NULL REFERENCES players,"
+    " seat INTEGER NOT NULL,"
+    " player_id TEXT,"
+    " PRIMARY KEY (session_pk, player_pk)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS rounds ("
+    " round_pk INTEGER PRIMARY KEY,"
+    " session_pk INTEGER NOT NULL REFERENCES sessions ON DELETE CASCADE,"
+    " round_id TEXT NOT NULL,"
+    " round_number INTEGER NOT NULL,"
+    " played_at TEXT,"
+    " points INTEGER NOT NULL,"
+    " is_solo INTEGER NOT NULL,"
+    " is_bock INTEGER NOT NULL,"
+    " winning_team TEXT,"
+    " solo_player_pk INTEGER REFERENCES players,"
+    " sitting_out_pk INTEGER REFERENCES players,"
+    " extra TEXT)",
+    "CREATE TABLE IF NOT EXISTS round_scores ("
+    " round_pk INTEGER NOT NULL REFERENCES rounds ON DELETE CASCADE,"
+    " player_pk INTEGER NOT NULL REFERENCES players,"
+    " score INTEGER NOT NULL,"
+    " is_winner INTEGER NOT NULL,"
+    " PRIMARY KEY (round_pk, player_pk)) WITHOUT ROWID",
+    # Indizes für Spieler, Datum, Session und die Runden-Flags
+    "CREATE INDEX IF NOT EXISTS sessions_played_on ON sessions (played_on)",
+    "CREATE INDEX IF NOT EXISTS sessions_player_key ON sessions (player_key)",
+    "CREATE INDEX IF NOT EXISTS session_players_player ON session_players (player_pk, session_pk)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS rounds_session ON rounds (session_pk, round_number)",
+    "CREATE INDEX IF NOT EXISTS rounds_played_at ON rounds (played_at)",
+    "CREATE INDEX IF NOT EXISTS rounds_solo ON rounds (solo_player_pk, played_at) WHERE is_solo",
+    "CREATE INDEX IF NOT EXISTS rounds_bock ON rounds (played_at) WHERE is_bock",
+    "CREATE INDEX IF NOT EXISTS round_scores_player ON round_scores (player_pk, round_pk)",
+    # Verdichtete Kennzahlen pro Abend (src/rollups.py), geschrieben beim Archivieren
+    "CREATE TABLE IF NOT EXISTS session_rollups ("
+    " session_pk INTEGER PRIMARY KEY REFERENCES sessions ON DELETE CASCADE,"
+    " rounds INTEGER NOT NULL,"
+    " solo_count INTEGER NOT NULL,"
+    " bock_count INTEGER NOT NULL,"
+    " normal_points INTEGER NOT NULL,"
+    " bock_points INTEGER NOT NULL,"
+    " re_wins INTEGER NOT NULL,"
+    " kontra_wins INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS player_rollups ("
+    " session_pk INTEGER NOT NULL REFERENCES sessions ON DELETE CASCADE,"
+    " player_pk INTEGER NOT NULL REFERENCES players,"
+    " points INTEGER NOT NULL,"
+    " wins INTEGER NOT NULL,"
+    " games INTEGER NOT NULL,"
+    " solo_count INTEGER NOT NULL,"
+    " solo_wins INTEGER NOT NULL,"
+    " bock_games INTEGER NOT NULL,"
+    " bock_points INTEGER NOT NULL,"
+    " first_outcome INTEGER,"            # Strähnen-Grenzen zum Verketten über Abende (StreakBounds)
+    " first_length INTEGER NOT NULL,"
+    " last_outcome INTEGER,"
+    " last_length INTEGER NOT NULL,"
+    " max_win INTEGER NOT NULL,"
+    " max_loss INTEGER NOT NULL,"
+    " PRIMARY KEY (session_pk, player_pk)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS pair_rollups ("
+    " session_pk INTEGER NOT NULL REFERENCES sessions ON DELETE CASCADE,"
+    " player_a_pk INTEGER NOT NULL REFERENCES players,"
+    " player_b_pk INTEGER NOT NULL REFERENCES players,"
+    " points INTEGER NOT NULL,"
+    " games INTEGER NOT NULL,"
+    " PRIMARY KEY (session_pk, player_a_pk, player_b_pk)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS player_rollups_player ON player_rollups (player_pk, session_pk)",
+)
+
+
+class ArchivedSession(NamedTuple):
+    """Eintrag der Archivliste (ohne Runden)"""
+    session_id: str
+    played_on: str
+    created_at: Optional[str]
+    archived_at: str
+    players: List[str]
+    round_count: int
+
+
+class PairTotals(NamedTuple):
+    """Summe eines Pärchens über mehrere Abende"""
+    players: Tuple[str, str]
+    points: int
+    games: int
+    
+    @property
+    def avg_points(self) -> float:
+        return self.points / self.games if self.games else 0.0
+
+
+class StreakRecord(NamedTuple):
+    """Strähnen eines Spielers über alle Abende eines Zeitraums"""
+    name: str
+    longest_win: int
+    longest_loss: int
+    current: Tuple[Optional[bool], int]
+
+
+class SessionArchive:
+    """
+    Archiv in einer SQLite-Datei (WAL), eine Verbindung pro Aufruf wie SQLiteBackend
+    
+    Sessions werden über ihre session_id identifiziert; erneutes Archivieren ersetzt den alten Stand.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            self._backfill_rollups(connection)
+    
+    @contextmanager
+    def _connect(self):
+        """Verbindung als Transaktion (Commit bei Erfolg, Rollback bei Fehler), danach geschlossen"""
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.execute("PRAGMA foreign_keys=ON")
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+    
+    def archive_session(self, game_data: Dict) -> str:
+        """
+        Legt eine Session (Exportformat, wie von serialize_game_data() oder dem Import) im Archiv ab
+        
+        Returns:
+            session_id der archivierten Session
+        """
+        with self._connect() as connection:
+            return self._archive(connection, game_data)
+    
+    def archive_sessions(self, sessions: Iterable[Dict]) -> int:
+        """Archiviert viele Sessions in einer Transaktion (z.B. ein Jahr aus einem Import-Archiv)"""
+        count = 0
+        with self._connect() as connection:
+            for game_data in sessions:
+                self._archive(connection, game_data)
+                count += 1
+        return count
+    
+    def _archive(self, connection: sqlite3.Connection, game_data: Dict) -> str:
+        players = [player['name'] for player in game_data.get('players', [])]
+        rounds = game_data.get('rounds', [])
+        session_id = game_data.get('session_id') or _fallback_session_id(game_data)
+        created_at = game_data.get('created_at')
+        played_on = (created_at or (rounds[0].get('timestamp') if rounds else None) or datetime.now().isoformat())[:10]
+        extra = {
+            key: value for key, value in game_data.items()
+            if key not in ('session_id', 'created_at', 'players', 'rounds')
+        }
+        
+        connection.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        session_pk = connection.execute(
+            "INSERT INTO sessions (session_id, played_on, created_at, archived_at, player_key, round_count, extra)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (session_id, played_on, created_at, datetime.now().isoformat(), _player_key(players), len(rounds),
+             json.dumps(extra, ensure_ascii=False) if extra else None)
+        ).lastrowid
+        
+        player_pks = self._player_pks(connection, players)
+        connection.executemany(
+            "INSERT INTO session_players (session_pk, player_pk, seat, player_id) VALUES (?, ?, ?, ?)",
+            [
+                (session_pk, player_pks[player['name']], seat, player.get('id'))
+                for seat, player in enumerate(game_data.get('players', []))
+            ]
+        )
+        
+        for round_data in rounds:
+            extra = {key: value for key, value in round_data.items() if key not in _ROUND_COLUMNS}
+            round_pk = connection.execute(
+                "INSERT INTO rounds (session_pk, round_id, round_number, played_at, points, is_solo, is_bock,"
+                " winning_team, solo_player_pk, sitting_out_pk, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session_pk, round_data['id'], round_data['round_number'], round_data.get('timestamp'),
+                    round_data['points'], bool(round_data.get('is_solo')), bool(round_data.get('is_bock')),
+                    round_data.get('winning_team'), player_pks.get(round_data.get('solo_player')),
+                    player_pks.get(round_data.get('sitting_out')),
+                    json.dumps(extra, ensure_ascii=False) if extra else None
+                )
+            ).lastrowid
+            winners = set(round_data.get('winners', []))
+            connection.executemany(
+                "INSERT INTO round_scores (round_pk, player_pk, score, is_winner) VALUES (?, ?, ?, ?)",
+                [
+                    (round_pk, player_pks[name], score, name in winners)
+                    for name, score in round_data.get('scores', {}).items()
+                ]
+            )
+        
+        self._store_rollup(connection, session_pk, players, rounds, player_pks)
+        return session_id
+    
+    def _store_rollup(self, connection: sqlite3.Connection, session_pk: int, players: List[str],
+                      rounds: List[Dict], player_pks: Dict[str, int]):
+        """Verdichtet einen Abend einmalig in session_rollups, player_rollups und pair_rollups"""
+        rollup = compute_session_rollup(players, rounds)
+        connection.execute(
+            "INSERT INTO session_rollups (session_pk, rounds, solo_count, bock_count, normal_points, bock_points,"
+            " re_wins, kontra_wins) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (session_pk, rollup.rounds, rollup.solo_count, rollup.bock_count, rollup.normal_points,
+             rollup.bock_points, rollup.re_wins, rollup.kontra_wins)
+        )
+        connection.executemany(
+            "INSERT INTO player_rollups (session_pk, player_pk, points, wins, games, solo_count, solo_wins,"
+            " bock_games, bock_points, first_outcome, first_length, last_outcome, last_length, max_win, max_loss)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (session_pk, player_pks[name], *totals[1:], *rollup.streaks[name][:-1])
+                for name, totals in rollup.players.items()
+            ]
+        )
+        connection.executemany(
+            "INSERT INTO pair_rollups (session_pk, player_a_pk, player_b_pk, points, games) VALUES (?, ?, ?, ?, ?)",
+            [
+                (session_pk, player_pks[first], player_pks[second], points, games)
+                for (first, second), (points, games) in rollup.pairs.items()
+            ]
+        )
+    
+    def _backfill_rollups(self, connection: sqlite3.Connection):
+        """Verdichtet Abende ohne Rollup (Archive aus der Zeit vor den Rollup-Tabellen)"""
+        missing = connection.execute(
+            "SELECT session_pk, session_id FROM sessions WHERE session_pk NOT IN (SELECT session_pk FROM session_rollups)"
+        ).fetchall()
+        for session_pk, session_id in missing:
+            game_data = self._load_session(connection, session_id)
+            players = [player['name'] for player in game_data['players']]
+            self._store_rollup(connection, session_pk, players, game_data['rounds'],
+                               self._player_pks(connection, players))
+    
+    def _player_pks(self, connection: sqlite3.Connection, names: List[str]) -> Dict[str, int]:
+        connection.executemany("INSERT OR IGNORE INTO players (name) VALUES (?)", [(name,) for name in names])
+        placeholders = ','.join('?' * len(names))
+        return dict(connection.execute(
+            f"SELECT name, player_pk FROM players WHERE name IN ({placeholders})", names
+        ).fetchall()) if names else {}
+    
+    def player_names(self) -> List[str]:
+        """Alle Spieler, die in archivierten Abenden vorkommen"""
+        with self._connect() as connection:
+            return [row[0] for row in connection.execute(
+                "SELECT name FROM players WHERE player_pk IN (SELECT player_pk FROM session_players) ORDER BY name"
+            )]
+    
+    def list_sessions(self, players: Optional[List[str]] = None, exact_players: bool = False,
+                      date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[ArchivedSession]:
+        """
+        Archivierte Abende, neueste zuerst
+        
+        Args:
+            players: Nur Abende, an denen alle diese Spieler teilgenommen haben
+            exact_players: Nur Abende mit genau diesen Spielern (über den Index auf player_key)
+            date_from: Erstes Datum (YYYY-MM-DD, einschließlich)
+            date_to: Letztes Datum (YYYY-MM-DD, einschließlich)
+        """
+        conditions = []
+        params: List = []
+        if players and exact_players:
+            conditions.append("s.player_key = ?")
+            params.append(_player_key(players))
+        elif players:
+            # Pro Spieler ein Lookup über session_players_player
+            for name in players:
+                conditions.append(
+                    "s.session_pk IN (SELECT sp.session_pk FROM session_players sp"
+                    " JOIN players p ON p.player_pk = sp.player_pk WHERE p.name = ?)"
+                )
+                params.append(name)
+        if date_from:
+            conditions.append("s.played_on >= ?")
+            params.append(date_from)
+        if date_to:
+            conditions.append("s.played_on <= ?")
+            params.append(date_to)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT s.session_id, s.played_on, s.created_at, s.archived_at, s.round_count,"
+                " (SELECT group_concat(name, char(31)) FROM (SELECT p.name FROM session_players sp"
+                "  JOIN players p ON p.player_pk = sp.player_pk WHERE sp.session_pk = s.session_pk ORDER BY sp.seat))"
+                f" FROM sessions s {where} ORDER BY s.played_on DESC, s.created_at DESC",
+                params
+            ).fetchall()
+        return [
+            ArchivedSession(session_id, played_on, created_at, archived_at, names.split('\x1f') if names else [], round_count)
+            for session_id, played_on, created_at, archived_at, round_count, names in rows
+        ]
+    
+    def find_rounds(self, player: Optional[str] = None, solo: Optional[bool] = None, bock: Optional[bool] = None,
+                    date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Dict]:
+        """
+        Runden über alle Abende, z.B. find_rounds('Anna', solo=True, date_from='2026-01-01', date_to='2026-12-31')
+        
+        Mit solo=True bezieht sich player auf den Solisten, sonst auf einen Mitspieler der Runde.
+        Datumsgrenzen gelten für den Zeitstempel der Runde (einschließlich).
+        
+        Returns:
+            Runden im Exportformat, ergänzt um 'session_id'
+        """
+        where, params = _round_filter(player, solo, bock, date_from, date_to)
+        with self._connect() as connection:
+            return self._load_rounds(connection, f"{where} ORDER BY r.played_at, r.session_pk, r.round_number", params)
+    
+    def count_rounds(self, player: Optional[str] = None, solo: Optional[bool] = None, bock: Optional[bool] = None,
+                     date_from: Optional[str] = None, date_to: Optional[str] = None) -> int:
+        """Anzahl der Runden wie find_rounds(), ohne sie zu laden"""
+        where, params = _round_filter(player, solo, bock, date_from, date_to)
+        with self._connect() as connection:
+            return connection.execute(f"SELECT COUNT(*) FROM rounds r {where}", params).fetchone()[0]
+    
+    def load_session(self, session_id: str) -> Optional[Dict]:
+        """Lädt eine archivierte Session im Exportformat (None wenn nicht vorhanden)"""
+        with self._connect() as connection:
+            return self._load_session(connection, session_id)
+    
+    def _load_session(self, connection: sqlite3.Connection, session_id: str) -> Optional[Dict]:
+        row = connection.execute(
+            "SELECT session_pk, created_at, extra FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        session_pk, created_at, extra = row
+        players = [
+            {'id': player_id, 'name': name}
+            for player_id, name in connection.execute(
+                "SELECT sp.player_id, p.name FROM session_players sp JOIN players p ON p.player_pk = sp.player_pk"
+                " WHERE sp.session_pk = ? ORDER BY sp.seat",
+                (session_pk,)
+            )
+        ]
+        rounds = self._load_rounds(connection, "WHERE r.session_pk = ? ORDER BY r.round_number", [session_pk])
+        
+        for round_data in rounds:
+            del round_data['session_id']
+        return {
+            **(json.loads(extra) if extra else {}),
+            'session_id': session_id,
+            'created_at': created_at,
+            'players': players,
+            'rounds': rounds
+        }
+    
+    def _load_rounds(self, connection: sqlite3.Connection, clause: str, params: List) -> List[Dict]:
+        """Baut Runden-Dicts aus rounds und round_scores (Punkte in Sitzreihenfolge der Session)"""
+        rows = connection.execute(
+            "SELECT r.round_pk, s.session_id, r.round_id, r.round_number, r.played_at, r.is_solo, r.points,"
+            " solo.name, sitting.name, r.winning_team, r.is_bock, r.extra"
+            " FROM rounds r JOIN sessions s ON s.session_pk = r.session_pk"
+            " LEFT JOIN players solo ON solo.player_pk = r.solo_player_pk"
+            f" LEFT JOIN players sitting ON sitting.player_pk = r.sitting_out_pk {clause}",
+            params
+        ).fetchall()
+        
+        rounds = []
+        by_pk = {}
+        for round_pk, session_id, round_id, number, played_at, is_solo, points, solo, sitting, team, is_bock, extra in rows:
+            round_data = {
+                'id': round_id,
+                'round_number': number,
+                'timestamp': played_at,
+                'is_solo': bool(is_solo),
+                'winners': [],
+                'points': points,
+                'solo_player': solo,
+                'sitting_out': sitting,
+                'winning_team': team,
+                'is_bock': bool(is_bock),
+                'scores': {},
+                'session_id': session_id,
+                **(json.loads(extra) if extra else {})
+            }
+            rounds.append(round_data)
+            by_pk[round_pk] = round_data
+        
+        # Punkte in Blöcken nachladen (SQLite begrenzt die Anzahl der Parameter)
+        round_pks = list(by_pk)
+        for start in range(0, len(round_pks), 500):
+            chunk = round_pks[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for round_pk, name, score, is_winner in connection.execute(
+                "SELECT rs.round_pk, p.name, rs.score, rs.is_winner FROM round_scores rs"
+                " JOIN rounds r ON r.round_pk = rs.round_pk"
+                " JOIN session_players sp ON sp.session_pk = r.session_pk AND sp.player_pk = rs.player_pk"
+                " JOIN players p ON p.player_pk = rs.player_pk"
+                f" WHERE rs.round_pk IN ({placeholders}) ORDER BY rs.round_pk, sp.seat",
+                chunk
+            ):
+                round_data = by_pk[round_pk]
+                round_data['scores'][name] = score
+                if is_winner:
+                    round_data['winners'].append(name)
+        return rounds
+    
+    # ===== Ranglisten über die Rollups =====
+    
+    def player_totals(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[PlayerRollup]:
+        """Summen pro Spieler über alle Abende im Zeitraum (Datum des Abends, einschließlich)"""
+        where, params = _session_filter(date_from, date_to)
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT p.name, SUM(pr.points), SUM(pr.wins), SUM(pr.games), SUM(pr.solo_count), SUM(pr.solo_wins),"
+                " SUM(pr.bock_games), SUM(pr.bock_points) FROM player_rollups pr"
+                " JOIN sessions s ON s.session_pk = pr.session_pk JOIN players p ON p.player_pk = pr.player_pk"
+                f" {where} GROUP BY pr.player_pk",
+                params
+            ).fetchall()
+        return [PlayerRollup(*row) for row in rows]
+    
+    def leaderboard(self, metric: str = 'points', k: int = 10, date_from: Optional[str] = None,
+                    date_to: Optional[str] = None, min_games: int = 1) -> List[PlayerRollup]:
+        """
+        Die k besten Spieler nach metric (Schlüssel aus LEADERBOARD_METRICS)
+        
+        Ohne Zeitraum ist das die ewige Rangliste; min_games blendet Gelegenheitsspieler
+        bei Quoten wie win_rate aus.
+        """
+        return top_k(self.player_totals(date_from, date_to), metric, k, min_games)
+    
+    def period_leaderboards(self, period: str = 'year', metric: str = 'points', k: int = 3,
+                            min_games: int = 1) -> Dict[str, List[PlayerRollup]]:
+        """
+        Rangliste pro Jahr ('year', Schlüssel YYYY) oder Monat ('month', Schlüssel YYYY-MM), neueste zuerst
+        """
+        length = {'year': 4, 'month': 7}[period]
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT substr(s.played_on, 1, ?) AS period, p.name, SUM(pr.points), SUM(pr.wins), SUM(pr.games),"
+                " SUM(pr.solo_count), SUM(pr.solo_wins), SUM(pr.bock_games), SUM(pr.bock_points)"
+                " FROM player_rollups pr JOIN sessions s ON s.session_pk = pr.session_pk"
+                " JOIN players p ON p.player_pk = pr.player_pk GROUP BY period, pr.player_pk",
+                (length,)
+            ).fetchall()
+        
+        by_period: Dict[str, List[PlayerRollup]] = {}
+        for row in rows:
+            by_period.setdefault(row[0], []).append(PlayerRollup(*row[1:]))
+        return {
+            key: top_k(totals, metric, k, min_games)
+            for key, totals in sorted(by_period.items(), reverse=True)
+        }
+    
+    def pair_leaderboard(self, k: int = 5, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                         min_games: int = 1, worst: bool = False) -> List[PairTotals]:
+        """Die k besten (bzw. mit worst=True schlechtesten) Pärchen nach Punkten pro Spiel"""
+        where, params = _session_filter(date_from, date_to)
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT a.name, b.name, SUM(pr.points), SUM(pr.games) FROM pair_rollups pr"
+                " JOIN sessions s ON s.session_pk = pr.session_pk"
+                " JOIN players a ON a.player_pk = pr.player_a_pk JOIN players b ON b.player_pk = pr.player_b_pk"
+                f" {where} GROUP BY pr.player_a_pk, pr.player_b_pk",
+                params
+            ).fetchall()
+        pairs = [
+            PairTotals(tuple(sorted((first, second))), points, games)
+            for first, second, points, games in rows if games >= min_games
+        ]
+        select = heapq.nsmallest if worst else heapq.nlargest
+        return select(k, pairs, key=lambda pair: pair.avg_points)
+    
+    def streak_records(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[StreakRecord]:
+        """
+        Längste Sieges- und Pechsträhnen pro Spieler über alle Abende im Zeitraum
+        Strähnen laufen über Abendgrenzen weiter; verkettet werden nur die gespeicherten Grenzen.
+        """
+        where, params = _session_filter(date_from, date_to)
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT p.name, pr.first_outcome, pr.first_length, pr.last_outcome, pr.last_length, pr.max_win,"
+                " pr.max_loss, pr.games FROM player_rollups pr"
+                " JOIN sessions s ON s.session_pk = pr.session_pk JOIN players p ON p.player_pk = pr.player_pk"
+                f" {where} ORDER BY s.played_on, s.created_at, s.session_pk",
+                params
+            ).fetchall()
+        
+        bounds: Dict[str, List[StreakBounds]] = {}
+        for name, first_outcome, first_length, last_outcome, last_length, max_win, max_loss, games in rows:
+            bounds.setdefault(name, []).append(StreakBounds(
+                None if first_outcome is None else bool(first_outcome), first_length,
+                None if last_outcome is None else bool(last_outcome), last_length,
+                max_win, max_loss, games
+            ))
+        return [StreakRecord(name, *chain_streaks(player_bounds)) for name, player_bounds in bounds.items()]
+    
+    def delete_session(self, session_id: str) -> bool:
+        with self._connect() as connection:
+            return connection.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount > 0
+    
+    def iter_export(self, session_ids: Optional[List[str]] = None) -> Iterator[str]:
+        """Archivierte Sessions als JSON Lines (eine Session pro Zeile, wieder importierbar)"""
+        if session_ids is None:
+            session_ids = [session.session_id for session in self.list_sessions()]
+        for session_id in session_ids:
+            game_data = self.load_session(session_id)
+            if game_data is not None:
+                yield json.dumps(game_data, separators=(',', ':'), ensure_ascii=False) + '\n'
+
+
+def _round_filter(player: Optional[str], solo: Optional[bool], bock: Optional[bool],
+                  date_from: Optional[str], date_to: Optional[str]):
+    """WHERE-Klausel und Parameter für Rundenabfragen (Tabellenalias r)"""
+    conditions = []
+    params: List = []
+    if player is not None and solo:
+        conditions.append("r.solo_player_pk = (SELECT player_pk FROM players WHERE name = ?)")
+        params.append(player)
+    elif player is not None:
+        conditions.append(
+            "r.round_pk IN (SELECT round_pk FROM round_scores"
+            " WHERE player_pk = (SELECT player_pk FROM players WHERE name = ?))"
+        )
+        params.append(player)
+    if solo is not None:
+        conditions.append("r.is_solo" if solo else "NOT r.is_solo")
+    if bock is not None:
+        conditions.append("r.is_bock" if bock else "NOT r.is_bock")
+    if date_from:
+        conditions.append("r.played_at >= ?")
+        params.append(date_from)
+    if date_to:
+        # Zeitstempel sind ISO-Strings: bis vor den Folgetag statt <= Datum (das wäre kleiner als jeder Zeitpunkt)
+        conditions.append("r.played_at < ?")
+        params.append((date.fromisoformat(date_to) + timedelta(days=1)).isoformat())
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
+
+
+def _session_filter(date_from: Optional[str], date_to: Optional[str]):
+    """WHERE-Klausel und Parameter für das Datum des Abends (Tabellenalias s)"""
+    conditions = []
+    params: List = []
+    if date_from:
+        conditions.append("s.played_on >= ?")
+        params.append(date_from)
+    if date_to:
+        conditions.append("s.played_on <= ?")
+        params.append(date_to)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
+
+
+def _player_key(names: Iterable[str]) -> str:
+    return '\x1f'.join(sorted(names))
+
+
+def _fallback_session_id(game_data: Dict) -> str:
+    """Stabile ID für Sessions ohne session_id (alte Exporte): Erstellungszeit und erste Runde"""
+    rounds = game_data.get('rounds', [])
+    return f"{game_data.get('created_at', '')}:{rounds[0]['id'] if rounds else ''}"
@@ -1,45 +1,168 @@
 """
-DynamoDB Cloud Sync für Doppelkopf Zettel
-Speichert und lädt Spielstände aus AWS DynamoDB
+Cloud Sync für Doppelkopf Zettel
+Speichert und lädt Spielstände über das konfigurierte Speicher-Backend (DynamoDB, SQLite oder In-Memory)
 """
 import streamlit as st
-import boto3
-from datetime import datetime, timedelta
-from botocore.exceptions import ClientError
-import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+import threading
+from src.game_logic import mark_rounds_changed
+from src.round_record import compact_rounds, round_dicts
+from src.sync_worker import SyncWorker
+from src.game_data_merge import merge_game_data
+from src.storage_backend import (
+    StorageBackend,
+    InMemoryBackend,
+    SQLiteBackend,
+    CachedBackend,
+    VersionConflictError
+)
+from src.sync_journal import SyncJournal, diff_game_data, changed_entries, apply_journal
 
+logger = logging.getLogger(__name__)
 
-def get_dynamodb_client():
-    """Erstellt einen DynamoDB Client mit Streamlit Secrets"""
+
+# Ein Client pro Prozess: Connection-Pool mit Keep-Alive statt neuem TLS-Handshake pro Speichern
+# (nur die Optionen - botocore wird erst beim Erstellen des Clients importiert)
+DYNAMODB_CLIENT_OPTIONS = {
+    'max_pool_connections': 20,
+    'tcp_keepalive': True,
+    'connect_timeout': 5,
+    'read_timeout': 10,
+    'retries': {'max_attempts': 3, 'mode': 'standard'}
+}
+
+DEFAULT_TABLE_NAME = "doppelkopf_sessions"
+
+# Speicher-Backends (secrets.toml [storage] backend oder Umgebungsvariable DOPPELKOPF_STORAGE)
+STORAGE_BACKENDS = ('dynamodb', 'sqlite', 'memory')
+DEFAULT_SQLITE_PATH = "doppelkopf_sessions.sqlite"
+# Lokaler Cache vor DynamoDB: Fortsetzen auf demselben Server liest von der Platte
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "doppelkopf_session_cache.sqlite")
+# Write-Ahead-Journal: Änderungen, die noch nicht hochgeladen sind (überlebt Netzausfälle und Neustarts)
+DEFAULT_JOURNAL_PATH = os.path.join(tempfile.gettempdir(), "doppelkopf_sync_journal.sqlite")
+
+# Versuche pro Speicherung, wenn ein anderes Gerät zwischenzeitlich gespeichert hat
+WRITE_CONFLICT_MAX_ATTEMPTS = 5
+
+# Zuletzt gelesene/geschriebene Version pro Sync-Schlüssel (siehe _sync_key)
+_known_versions = {}
+_known_versions_lock = threading.Lock()
+
+
+@st.cache_resource(show_spinner=False)
+def _load_aws_settings():
+    """
+    Liest die AWS-Einstellungen einmalig pro Prozess aus den Streamlit Secrets
+    
+    Returns:
+        Dictionary mit Credentials und Tabellennamen, None wenn keine Credentials konfiguriert sind
+    """
     try:
-        return boto3.client(
-            'dynamodb',
-            aws_access_key_id=st.secrets["aws"]["aws_access_key_id"],
-            aws_secret_access_key=st.secrets["aws"]["aws_secret_access_key"],
-            region_name=st.secrets["aws"]["aws_region"]
-        )
-    except KeyError:
-        st.error("❌ AWS Credentials nicht in Streamlit Secrets konfiguriert!")
+        aws = st.secrets["aws"]
+        credentials = (aws["aws_access_key_id"], aws["aws_secret_access_key"], aws["aws_region"])
+    except (KeyError, FileNotFoundError):
         return None
+    
+    return {
+        'aws_access_key_id': credentials[0],
+        'aws_secret_access_key': credentials[1],
+        'aws_region': credentials[2],
+        'table_name': aws.get("dynamodb_table_name", DEFAULT_TABLE_NAME),
+        'rounds_table_name': aws.get("dynamodb_rounds_table_name")
+    }
 
 
-def get_table_name():
-    """Holt den DynamoDB Tabellennamen aus Secrets"""
+@st.cache_resource(show_spinner=False)
+def _load_storage_settings():
+    """
+    Ermittelt einmalig pro Prozess das Speicher-Backend
+    Ohne Angabe wird DynamoDB verwendet, sofern AWS Credentials konfiguriert sind
+    
+    Returns:
+        Dictionary mit 'backend', 'sqlite_path', 'cache_path' und 'journal_path', None wenn kein Backend verfügbar ist
+    """
     try:
-        return st.secrets["aws"]["dynamodb_table_name"]
-    except KeyError:
-        return "doppelkopf_sessions"
+        storage = dict(st.secrets.get("storage", {}))
+    except FileNotFoundError:
+        storage = {}
+    
+    backend = os.environ.get("DOPPELKOPF_STORAGE") or storage.get("backend")
+    if backend is None and _load_aws_settings() is not None:
+        backend = 'dynamodb'
+    
+    if backend not in STORAGE_BACKENDS:
+        if backend is not None:
+            logger.warning("Unbekanntes Speicher-Backend '%s' (erlaubt: %s)", backend, ", ".join(STORAGE_BACKENDS))
+        return None
+    if backend == 'dynamodb' and _load_aws_settings() is None:
+        return None
+    
+    return {
+        'backend': backend,
+        'sqlite_path': storage.get("sqlite_path", DEFAULT_SQLITE_PATH),
+        'cache_path': storage.get("cache_path", DEFAULT_CACHE_PATH),
+        'journal_path': storage.get("journal_path", DEFAULT_JOURNAL_PATH)
+    }
+
+
+@st.cache_resource(show_spinner=False)
+def _create_dynamodb_client(aws_access_key_id: str, aws_secret_access_key: str, region_name: str):
+    """Erstellt einen DynamoDB Client pro Credential-Satz (boto3 Clients sind thread-safe)"""
+    # boto3 kostet beim Import über 100 ms, daher erst hier statt beim App-Start
+    import boto3
+    from botocore.config import Config
+    
+    return boto3.client(
+        'dynamodb',
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        region_name=region_name,
+        config=Config(**DYNAMODB_CLIENT_OPTIONS)
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_storage_backend():
+    """
+    Prozessweit geteiltes Speicher-Backend laut Einstellungen
+    
+    Returns:
+        StorageBackend oder None wenn keines konfiguriert ist
+    """
+    settings = _load_storage_settings()
+    if settings is None:
+        return None
+    
+    if settings['backend'] == 'memory':
+        return InMemoryBackend()
+    if settings['backend'] == 'sqlite':
+        return SQLiteBackend(settings['sqlite_path'])
+    
+    from src.dynamodb_backend import DynamoDBBackend
+    
+    aws = _load_aws_settings()
+    client = _create_dynamodb_client(aws['aws_access_key_id'], aws['aws_secret_access_key'], aws['aws_region'])
+    backend = DynamoDBBackend(client, aws['table_name'], aws['rounds_table_name'])
+    if settings['cache_path']:
+        backend = CachedBackend(backend, SQLiteBackend(settings['cache_path']))
+    return backend
 
 
-def calculate_ttl(days=365):
-    """Berechnet TTL (Unix Timestamp) für DynamoDB"""
-    expire_date = datetime.now() + timedelta(days=days)
-    return int(expire_date.timestamp())
+@st.cache_resource(show_spinner=False)
+def get_sync_journal():
+    """Prozessweites Write-Ahead-Journal (None ohne Speicher-Backend oder mit journal_path = "")"""
+    settings = _load_storage_settings()
+    if settings is None or not settings['journal_path']:
+        return None
+    return SyncJournal(settings['journal_path'])
 
 
 def serialize_game_data(state=None):
     """
-    Serialisiert den aktuellen Session State für DynamoDB
+    Serialisiert den aktuellen Session State für das Speicher-Backend
     
     Args:
         state: Session State Objekt (default: st.session_state)
@@ -52,10 +175,11 @@ def serialize_game_data(state=None):
     
     return {
         "players": state.players,
-        "rounds": state.rounds,
+        "rounds": round_dicts(state.rounds),
         "session_started": state.session_started,
         "created_at": state.get('created_at', datetime.now().isoformat()),
-        "sitting_out_index": state.get('sitting_out_index', 0)
+        "sitting_out_index": state.get('sitting_out_index', 0),
+        "deleted_round_ids": state.get('deleted_round_ids', [])
     }
 
 
@@ -71,15 +195,93 @@ def deserialize_game_data(game_data, state=None):
         state = st.session_state
     
     state.players = game_data.get("players", [])
-    state.rounds = game_data.get("rounds", [])
+    state.rounds = compact_rounds(game_data.get("rounds", []), [player['name'] for player in state.players])
+    mark_rounds_changed(state)
     state.session_started = game_data.get("session_started", False)
     state.created_at = game_data.get("created_at", datetime.now().isoformat())
     state.sitting_out_index = game_data.get("sitting_out_index", 0)
+    state.deleted_round_ids = list(game_data.get("deleted_round_ids", []))
+    # Geladener Stand ist der Ausgangspunkt für die nächsten Journal-Einträge
+    state.journal_base = _snapshot_game_data(state)
+    state.changed_round_ids = []
+
+
+def _snapshot_game_data(state=None):
+    """
+    Spieldaten mit kopierten Listen, Runden als Datensätze aus dem Session State (ohne Umwandlung)
+    Der Sync-Worker arbeitet damit weiter, während die App die Listen des Session States verändert;
+    Runden werden bei Änderungen ersetzt, nie verändert. Backends kodieren sie erst beim Schreiben.
+    """
+    if state is None:
+        state = st.session_state
+    
+    return {
+        "players": list(state.players),
+        "rounds": list(state.rounds),
+        "session_started": state.session_started,
+        "created_at": state.get('created_at', datetime.now().isoformat()),
+        "sitting_out_index": state.get('sitting_out_index', 0),
+        "deleted_round_ids": list(state.get('deleted_round_ids', []))
+    }
+
+
+def _journal_changes(session_name: str):
+    """
+    Hält die Änderungen seit dem letzten Aufruf im Write-Ahead-Journal fest (vor jedem Upload)
+    
+    Returns:
+        (Spieldaten-Snapshot zum Hochladen, Funktion die die Einträge nach erfolgreichem Upload bestätigt)
+    """
+    game_data = _snapshot_game_data()
+    journal = get_sync_journal()
+    if journal is None:
+        # Ohne Journal zählen die IDs nur noch für adopt_merged_sync_result (Änderungen seit diesem Upload)
+        st.session_state.changed_round_ids = []
+        return game_data, lambda: None
+    
+    writer = st.session_state.session_id
+    base = st.session_state.get('journal_base')
+    changed = st.session_state.get('changed_round_ids')
+    if base is not None and changed is not None:
+        # Nur die von add_round/update_round/delete_round gemeldeten Runden statt aller vergleichen
+        entries = changed_entries(base, game_data, changed)
+    else:
+        entries = diff_game_data(base, game_data)
+    up_to_seq = journal.append(session_name, writer, entries)
+    st.session_state.journal_base = game_data
+    st.session_state.changed_round_ids = []
+    # Beim Laden nachgetragene Einträge anderer (beendeter) Browser-Sessions stecken ebenfalls im Stand
+    recovered_seq = st.session_state.get('journal_recovered_seq', {}).get(session_name, 0)
+    
+    def acknowledge():
+        journal.acknowledge(session_name, up_to_seq, writer)
+        if recovered_seq:
+            journal.acknowledge(session_name, recovered_seq)
+    
+    return game_data, acknowledge
+
+
+def _sync_key(session_name: str) -> str:
+    """
+    Schlüssel für Versionen und Delta-Stand: Browser-Session + Cloud-Session
+    Zwei Geräte am selben Server teilen sich so weder Version noch Schreib-Warteschlange
+    """
+    return f"{st.session_state.session_id}:{session_name}"
+
+
+def _get_known_version(sync_key: str) -> int:
+    with _known_versions_lock:
+        return _known_versions.get(sync_key, 0)
+
+
+def _set_known_version(sync_key: str, version: int):
+    with _known_versions_lock:
+        _known_versions[sync_key] = version
 
 
 def save_to_dynamodb(session_name: str) -> bool:
     """
-    Speichert den aktuellen Spielstand in DynamoDB
+    Speichert den aktuellen Spielstand im Speicher-Backend (Name aus der Zeit mit nur DynamoDB)
     
     Args:
         session_name: Der eindeutige Session-Name (wie ein Passwort)
@@ -87,42 +289,88 @@ def save_to_dynamodb(session_name: str) -> bool:
     Returns:
         True wenn erfolgreich, False bei Fehler
     """
-    client = get_dynamodb_client()
-    if not client:
+    backend = get_storage_backend()
+    if backend is None:
+        st.error("❌ Kein Speicher-Backend konfiguriert!")
         return False
     
     try:
-        table_name = get_table_name()
-        now = datetime.now().isoformat()
-        
-        # Spieldaten serialisieren
-        game_data = serialize_game_data()
-        
-        # In DynamoDB speichern
-        client.put_item(
-            TableName=table_name,
-            Item={
-                'session_name': {'S': session_name},
-                'last_updated': {'S': now},
-                'created_at': {'S': game_data.get('created_at', now)},
-                'game_data': {'S': json.dumps(game_data)},
-                'ttl': {'N': str(calculate_ttl(365))}  # 1 Jahr TTL
-            }
-        )
-        
+        # Spieldaten ins Journal und dann speichern
+        game_data, acknowledge = _journal_changes(session_name)
+        result = _write_session(backend, session_name, game_data, _sync_key(session_name))
+        acknowledge()
+        if result['merged']:
+            # Runden eines anderen Geräts übernehmen (synchron, daher keine neueren lokalen Änderungen)
+            deserialize_game_data(result['game_data'])
+            st.session_state.cloud_adopted_version = result['version']
+            st.info("🔀 Runden eines anderen Geräts wurden übernommen")
         return True
-        
-    except ClientError as e:
-        st.error(f"❌ DynamoDB Fehler: {e.response['Error']['Message']}")
-        return False
+    
     except Exception as e:
-        st.error(f"❌ Unerwarteter Fehler: {str(e)}")
+        st.error(f"❌ {_describe_error(e, 'Unerwarteter Fehler')}")
         return False
 
 
+def _describe_error(error: Exception, fallback: str) -> str:
+    """Fehlertext für die UI; botocore-ClientErrors werden an ihrer Antwort erkannt (ohne botocore zu importieren)"""
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict) and 'Error' in response:
+        return f"DynamoDB Fehler: {response['Error'].get('Message', error)}"
+    return f"{fallback}: {error}"
+
+
+def _write_session(backend: StorageBackend, session_name: str, game_data: dict, sync_key: str) -> dict:
+    """
+    Speichert einen Spielstand bedingt auf die zuletzt bekannte Version (ohne UI-Ausgaben)
+    Wird sowohl im Script-Run als auch vom Sync-Worker verwendet
+    
+    Hat ein anderes Gerät seit dem letzten Lesen gespeichert, wird dessen Stand geladen,
+    auf Runden-Ebene zusammengeführt (siehe merge_game_data) und erneut bedingt geschrieben.
+    
+    Returns:
+        Dictionary mit 'version', 'merged' (True wenn fremde Änderungen eingeflossen sind) und 'game_data'
+    """
+    merged = False
+    
+    for attempt in range(WRITE_CONFLICT_MAX_ATTEMPTS):
+        try:
+            head = backend.save(session_name, game_data, _get_known_version(sync_key))
+        except VersionConflictError:
+            # Lädt den fremden Stand und merkt sich dessen Version für den nächsten Versuch
+            remote = _load_game_data(backend, session_name, sync_key)
+            if remote is not None:
+                game_data = merge_game_data(game_data, remote)
+                merged = True
+            continue
+        
+        _set_known_version(sync_key, head.version)
+        return {'version': head.version, 'merged': merged, 'game_data': game_data}
+    
+    raise RuntimeError("Speichern fehlgeschlagen: zu viele gleichzeitige Änderungen anderer Geräte")
+
+
+def _load_game_data(backend: StorageBackend, session_name: str, sync_key: str):
+    """
+    Lädt die Spieldaten einer Session und merkt sich die gelesene Version
+    als Basis für das nächste bedingte Speichern
+    
+    Returns:
+        Dictionary mit Spieldaten oder None wenn die Session nicht existiert
+    """
+    stored = backend.load(session_name)
+    if stored is None:
+        # Auch ohne Spielstand kann schon eine Version vergeben sein (laufende erste Speicherung)
+        head = backend.head(session_name)
+        _set_known_version(sync_key, head.version if head else 0)
+        return None
+    
+    _set_known_version(sync_key, stored.version)
+    return stored.game_data
+
+
 def load_from_dynamodb(session_name: str) -> bool:
     """
-    Lädt einen Spielstand aus DynamoDB
+    Lädt einen Spielstand aus dem Speicher-Backend (Name aus der Zeit mit nur DynamoDB)
     
     Args:
         session_name: Der eindeutige Session-Name
@@ -130,29 +378,27 @@ def load_from_dynamodb(session_name: str) -> bool:
     Returns:
         True wenn erfolgreich geladen, False wenn nicht gefunden oder Fehler
     """
-    client = get_dynamodb_client()
-    if not client:
+    backend = get_storage_backend()
+    if backend is None:
+        st.error("❌ Kein Speicher-Backend konfiguriert!")
         return False
     
     try:
-        table_name = get_table_name()
-        
-        # Item aus DynamoDB laden
-        response = client.get_item(
-            TableName=table_name,
-            Key={
-                'session_name': {'S': session_name}
-            }
-        )
+        # Spieldaten laden
+        game_data = _load_game_data(backend, session_name, _sync_key(session_name))
         
-        # Prüfen ob Item existiert
-        if 'Item' not in response:
+        # Prüfen ob die Session existiert
+        if game_data is None:
             st.warning(f"⚠️ Keine Session mit dem Namen '{session_name}' gefunden.")
             return False
         
-        # Spieldaten deserialisieren
-        item = response['Item']
-        game_data = json.loads(item['game_data']['S'])
+        # Nicht hochgeladene Änderungen aus dem Journal nachtragen (z.B. nach Netzausfall oder Neustart)
+        journal = get_sync_journal()
+        pending = journal.pending(session_name) if journal else []
+        if pending:
+            game_data = apply_journal(game_data, pending)
+            st.session_state.setdefault('journal_recovered_seq', {})[session_name] = pending[-1].seq
+            st.info(f"📝 {len(pending)} noch nicht hochgeladene Änderungen aus dem Journal nachgetragen")
         
         # In Session State laden
         deserialize_game_data(game_data)
@@ -161,14 +407,15 @@ def load_from_dynamodb(session_name: str) -> bool:
         st.session_state.cloud_session_name = session_name
         st.session_state.cloud_sync_enabled = True
         
+        if pending:
+            # Nachgetragene Änderungen gesammelt in einem Schreibvorgang hochladen
+            _submit_sync(backend, session_name, game_data, journal_acknowledge=lambda: journal.acknowledge(session_name, pending[-1].seq))
+        
         st.success(f"✅ Session '{session_name}' erfolgreich geladen!")
         return True
-        
-    except ClientError as e:
-        st.error(f"❌ DynamoDB Fehler: {e.response['Error']['Message']}")
-        return False
+    
     except Exception as e:
-        st.error(f"❌ Fehler beim Laden: {str(e)}")
+        st.error(f"❌ {_describe_error(e, 'Fehler beim Laden')}")
         return False
 
 
@@ -176,22 +423,80 @@ def auto_sync_after_round():
     """
     Automatisches Speichern nach jeder Runde (wenn Cloud-Sync aktiv)
     Sollte nach jeder Runde aufgerufen werden
+    Das Speichern läuft im Hintergrund-Worker, die Runde ist sofort eingetragen.
+    Der Status erscheint beim nächsten Rerun in der Sidebar (siehe get_sync_status).
     """
     if st.session_state.get('cloud_sync_enabled', False):
         session_name = st.session_state.get('cloud_session_name')
         if session_name:
-            if save_to_dynamodb(session_name):
-                st.success(f"☁️ Spielstand automatisch gespeichert!")
-            else:
-                st.warning("⚠️ Automatische Speicherung fehlgeschlagen")
+            backend = get_storage_backend()
+            if backend is None:
+                return
+            
+            # Erst ins Journal (übersteht Netzausfall), dann im Hintergrund hochladen
+            game_data, acknowledge = _journal_changes(session_name)
+            _submit_sync(backend, session_name, game_data, acknowledge)
 
 
-def check_cloud_credentials() -> bool:
-    """Prüft ob AWS Credentials konfiguriert sind"""
-    try:
-        st.secrets["aws"]["aws_access_key_id"]
-        st.secrets["aws"]["aws_secret_access_key"]
-        st.secrets["aws"]["aws_region"]
-        return True
-    except (KeyError, FileNotFoundError):
+def _submit_sync(backend: StorageBackend, session_name: str, game_data: dict, journal_acknowledge):
+    """
+    Reiht einen Upload im Hintergrund-Worker ein
+    Die Journal-Einträge werden erst nach erfolgreichem Upload bestätigt; schlägt er fehl,
+    bleiben sie liegen und fließen in den nächsten Upload ein (der Worker versucht es erneut)
+    """
+    sync_key = _sync_key(session_name)
+    
+    def write():
+        result = _write_session(backend, session_name, game_data, sync_key)
+        journal_acknowledge()
+        return result
+    
+    get_sync_worker().submit(sync_key, write)
+
+
+def get_pending_journal_count(session_name: str) -> int:
+    """Anzahl noch nicht hochgeladener Journal-Einträge einer Session"""
+    journal = get_sync_journal()
+    return journal.pending_count(session_name) if journal else 0
+
+
+@st.cache_resource(show_spinner=False)
+def get_sync_worker() -> SyncWorker:
+    """Prozessweiter Hintergrund-Worker für Cloud-Speicherungen"""
+    return SyncWorker()
+
+
+def get_sync_status(session_name: str):
+    """Letzter Status des Hintergrund-Syncs einer Session (None wenn noch nichts gespeichert wurde)"""
+    return get_sync_worker().status(_sync_key(session_name))
+
+
+def adopt_merged_sync_result(session_name: str) -> bool:
+    """
+    Übernimmt Runden anderer Geräte, die der Hintergrund-Sync beim Speichern zusammengeführt hat
+    Lokal inzwischen neu eingetragene Runden bleiben erhalten (erneutes Zusammenführen), werden vorher
+    ins Journal geschrieben und danach mit dem übernommenen Stand hochgeladen
+    
+    Returns:
+        True wenn sich der lokale Stand dadurch geändert hat
+    """
+    status = get_sync_status(session_name)
+    result = status.get('result') if status else None
+    if not result or not result['merged'] or result['version'] == st.session_state.get('cloud_adopted_version'):
         return False
+    
+    st.session_state.cloud_adopted_version = result['version']
+    # Änderungen seit dem Snapshot des Workers (None = unbekannt, z.B. nach einem Import): deserialize_game_data
+    # setzt die Journal-Basis auf den übernommenen Stand, sie würden sonst nie ins Journal gelangen
+    unsynced = st.session_state.get('changed_round_ids')
+    _journal_changes(session_name)
+    deserialize_game_data(merge_game_data(serialize_game_data(), result['game_data']))
+    if unsynced is None or unsynced:
+        # Der Worker hat nur den älteren Stand zusammengeführt und geschrieben
+        auto_sync_after_round()
+    return True
+
+
+def check_cloud_credentials() -> bool:
+    """Prüft ob ein Speicher-Backend verfügbar ist (AWS Credentials oder lokales Backend)"""
+    return _load_storage_settings() is not None
@@ -2,34 +2,142 @@
 Import/Export Funktionalität für Sessions
 """
 import streamlit as st
+import io
 import json
+import os
 from datetime import datetime
 import uuid
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+from src.game_logic import mark_rounds_changed
+from src.round_record import compact_rounds, round_dicts
+from src.session_import import iter_import_sessions
+from src.archive import SessionArchive
+
+# Archiv-Datei (dauerhaft, anders als Cache und Journal nicht im Temp-Verzeichnis)
+DEFAULT_ARCHIVE_PATH = "doppelkopf_archive.sqlite"
 
 
 def export_session() -> str:
-    """Exportiert die aktuelle Session als JSON"""
-    export_data = {
+    """Exportiert die aktuelle Session als kompaktes JSON"""
+    return session_exporter()().decode('utf-8')
+
+
+def session_exporter() -> Callable[[], bytes]:
+    """
+    Hält den aktuellen Stand fest und liefert eine Funktion, die erst beim Aufruf das JSON erzeugt
+    
+    Für st.download_button(data=...): Streamlit ruft sie erst beim Klick auf (in einem eigenen
+    Thread ohne Session State), normale Reruns kosten so unabhängig von der Rundenzahl fast nichts.
+    Festgehalten wird nur eine flache Kopie der Listen: Runden werden bei Änderungen (auch beim
+    Neu-Nummerieren) ersetzt, nie verändert. Erst export() wandelt sie in Dictionaries um.
+    """
+    session_data = _current_session_data()
+    
+    def export() -> bytes:
+        export_data = {**session_data, 'rounds': round_dicts(session_data['rounds']), 'exported_at': datetime.now().isoformat()}
+        return json.dumps(export_data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    
+    return export
+
+
+def _current_session_data() -> Dict:
+    """Aktuelle Session als Schnappschuss (flache Kopien der Listen, Runden als Datensätze)"""
+    return {
         'session_id': st.session_state.session_id,
         'created_at': st.session_state.created_at,
-        'exported_at': datetime.now().isoformat(),
-        'players': st.session_state.players,
-        'rounds': st.session_state.rounds
+        'players': list(st.session_state.players),
+        'rounds': list(st.session_state.rounds)
     }
-    
-    return json.dumps(export_data, indent=2, ensure_ascii=False)
 
 
 def import_session(json_data: str) -> bool:
-    """Importiert eine Session aus JSON"""
-    try:
-        data = json.loads(json_data)
-        st.session_state.session_id = data.get('session_id', str(uuid.uuid4()))
-        st.session_state.created_at = data.get('created_at', datetime.now().isoformat())
-        st.session_state.players = data.get('players', [])
-        st.session_state.rounds = data.get('rounds', [])
-        st.session_state.session_started = len(st.session_state.players) > 0
-        return True
-    except Exception as e:
-        st.error(f"Fehler beim Importieren: {e}")
+    """Importiert eine einzelne Session aus JSON (geprüft wie beim Datei-Import)"""
+    game_data, overview = read_import_file(io.BytesIO(json_data.encode('utf-8')), "session.json")
+    if game_data is None:
+        errors = [entry['error'] for entry in overview if entry['error']]
+        st.error(f"Fehler beim Importieren: {errors[0] if errors else 'keine einzelne Session gefunden'}")
         return False
+    apply_imported_session(game_data)
+    return True
+
+
+def read_import_file(file: BinaryIO, name: str, progress=None) -> Tuple[Optional[Dict], List[Dict]]:
+    """
+    Liest eine Import-Datei (einzelne Session, JSON Lines oder Zip) mit Prüfung aller Runden
+    
+    Returns:
+        (game_data, overview): game_data nur bei genau einer gültigen Session, sonst None;
+        overview enthält pro Session 'source', 'error', 'players', 'rounds' und 'created_at'
+    """
+    game_data = None
+    overview = []
+    for index, result in enumerate(iter_import_sessions(file, name, progress)):
+        data = result.game_data or {}
+        overview.append({
+            'source': result.source,
+            'error': result.error,
+            'players': [player['name'] for player in data.get('players', [])],
+            'rounds': len(data.get('rounds', [])),
+            'created_at': data.get('created_at')
+        })
+        # Bei mehreren Sessions nur die Übersicht behalten (eine Session nach der anderen im Speicher)
+        game_data = result.game_data if index == 0 else None
+    return game_data, overview
+
+
+def load_import_session(file: BinaryIO, name: str, index: int) -> Optional[Dict]:
+    """Liest die index-te Session (Position in der Übersicht von read_import_file) erneut aus der Datei"""
+    for position, result in enumerate(iter_import_sessions(file, name)):
+        if position == index:
+            return result.game_data
+    return None
+
+
+def apply_imported_session(game_data: Dict):
+    """Übernimmt eine geprüfte Session in den Session State"""
+    st.session_state.session_id = game_data.get('session_id', str(uuid.uuid4()))
+    st.session_state.created_at = game_data.get('created_at', datetime.now().isoformat())
+    st.session_state.players = game_data['players']
+    st.session_state.rounds = compact_rounds(game_data['rounds'], [player['name'] for player in game_data['players']])
+    st.session_state.deleted_round_ids = []
+    # Keine einzelnen Änderungen bekannt: das nächste Journal vergleicht den ganzen Stand
+    st.session_state.changed_round_ids = None
+    mark_rounds_changed()
+    st.session_state.session_started = len(st.session_state.players) > 0
+
+
+@st.cache_resource(show_spinner=False)
+def get_session_archive() -> SessionArchive:
+    """Prozessweites Archiv; Pfad aus DOPPELKOPF_ARCHIVE oder [archive] path in den Secrets"""
+    try:
+        settings = dict(st.secrets.get("archive", {}))
+    except FileNotFoundError:
+        settings = {}
+    return SessionArchive(os.environ.get("DOPPELKOPF_ARCHIVE") or settings.get("path", DEFAULT_ARCHIVE_PATH))
+
+
+def archive_current_session() -> str:
+    """Legt den aktuellen Spielabend im Archiv ab (erneutes Archivieren ersetzt den alten Stand)"""
+    session_data = _current_session_data()
+    return get_session_archive().archive_session({**session_data, 'rounds': round_dicts(session_data['rounds'])})
+
+
+def archive_import_file(file: BinaryIO, name: str, progress=None) -> Tuple[int, int]:
+    """
+    Übernimmt alle gültigen Sessions einer Import-Datei ins Archiv (eine nach der anderen, eine Transaktion)
+    
+    Returns:
+        (archivierte Sessions, übersprungene ungültige Sessions)
+    """
+    skipped = 0
+    
+    def valid_sessions():
+        nonlocal skipped
+        for result in iter_import_sessions(file, name, progress):
+            if result.game_data is None:
+                skipped += 1
+            else:
+                yield result.game_data
+    
+    archived = get_session_archive().archive_sessions(valid_sessions())
+    return archived, skipped
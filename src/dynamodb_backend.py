@@ -0,0 +1,339 @@
+"""
+DynamoDB-Backend für Spielstände
+Entweder ein Item pro Session (game_data komprimiert) oder Delta-Sync mit einer Runde pro Item
+"""
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from botocore.exceptions import ClientError
+from src.game_data_codec import encode_game_data, decode_game_data
+from src.storage_backend import StorageBackend, SessionHead, StoredSession, VersionConflictError
+
+
+# ===== Delta-Sync: eine Runde pro Item =====
+# Tabelle mit Partition Key session_name (S) und Sort Key seq (N).
+# seq 0 ist der Header (Spieler, Metadaten), seq 1..n sind die Runden in Reihenfolge.
+
+HEADER_SEQ = 0
+BATCH_WRITE_LIMIT = 25  # Maximum von BatchWriteItem
+BATCH_WRITE_MAX_RETRIES = 5
+TRANSACT_WRITE_LIMIT = 100  # Maximum von TransactWriteItems
+
+
+def calculate_ttl(days=365):
+    """Berechnet TTL (Unix Timestamp) für DynamoDB"""
+    expire_date = datetime.now() + timedelta(days=days)
+    return int(expire_date.timestamp())
+
+
+class DynamoDBBackend(StorageBackend):
+    """
+    Spielstände in DynamoDB
+    
+    Ohne rounds_table_name wird der komplette Spielstand als ein Item in table_name gespeichert.
+    Mit rounds_table_name wird pro Runde ein Item geschrieben (nur die Änderungen seit der
+    zuletzt bekannten Version); table_name dient dann nur noch zum Lesen alter Sessions.
+    """
+    
+    name = 'dynamodb'
+    
+    def __init__(self, client, table_name: str, rounds_table_name: Optional[str] = None):
+        self.client = client
+        self.table_name = table_name
+        self.rounds_table_name = rounds_table_name
+        # Delta-Sync: zuletzt gelesener/geschriebener Stand pro Session als (Version, Runden-Objekte)
+        self._synced = {}
+        self._synced_lock = threading.Lock()
+    
+    # ----- Schnittstelle -----
+    
+    def head(self, session_name: str) -> Optional[SessionHead]:
+        projection = {
+            'ProjectionExpression': '#version, last_updated',
+            'ExpressionAttributeNames': {'#version': 'version'},
+            'ConsistentRead': True
+        }
+        if self.rounds_table_name:
+            item = self.client.get_item(
+                TableName=self.rounds_table_name, Key=_session_key(session_name, HEADER_SEQ), **projection
+            ).get('Item')
+            if item is not None:
+                return _item_head(item)
+        
+        item = self.client.get_item(
+            TableName=self.table_name, Key={'session_name': {'S': session_name}}, **projection
+        ).get('Item')
+        if item is None:
+            return None
+        # Im Delta-Modus zählt die Version der Delta-Tabelle (dort wird gespeichert)
+        head = _item_head(item)
+        return head._replace(version=0) if self.rounds_table_name else head
+    
+    def load(self, session_name: str) -> Optional[StoredSession]:
+        delta_version = 0
+        if self.rounds_table_name:
+            stored, delta_version = self._query_session_rounds(session_name)
+            if stored is not None:
+                return stored
+        
+        response = self.client.get_item(
+            TableName=self.table_name,
+            Key={
+                'session_name': {'S': session_name}
+            },
+            ConsistentRead=True
+        )
+        
+        if 'Item' not in response:
+            return None
+        
+        item = response['Item']
+        head = _item_head(item)
+        version = delta_version if self.rounds_table_name else head.version
+        return StoredSession(_decode_game_data_attribute(item['game_data']), version, head.last_updated)
+    
+    def save(self, session_name: str, game_data: Dict, expected_version: int) -> SessionHead:
+        try:
+            if self.rounds_table_name:
+                return self._sync_rounds_delta(session_name, game_data, expected_version)
+            return self._put_game_data(session_name, game_data, expected_version)
+        except ClientError as e:
+            if _is_write_conflict(e):
+                raise VersionConflictError(session_name) from e
+            raise
+    
+    def prime(self, session_name: str, stored: StoredSession):
+        # Basis für den Delta-Vergleich, damit nach einem Cache-Treffer nicht alles neu geschrieben wird
+        # (nur mit Delta-Version: Version 0 kann eine alte Session aus table_name sein)
+        if self.rounds_table_name and stored.version:
+            with self._synced_lock:
+                self._synced[session_name] = (stored.version, list(stored.game_data.get('rounds', [])))
+    
+    # ----- Ein Item pro Session -----
+    
+    def _put_game_data(self, session_name: str, game_data: Dict, expected_version: int) -> SessionHead:
+        """Schreibt den kompletten Spielstand als ein Item, bedingt auf expected_version"""
+        head = SessionHead(expected_version + 1, datetime.now().isoformat())
+        self.client.put_item(
+            TableName=self.table_name,
+            Item={
+                'session_name': {'S': session_name},
+                'last_updated': {'S': head.last_updated},
+                'created_at': {'S': game_data.get('created_at', head.last_updated)},
+                'game_data': {'B': encode_game_data(game_data)},
+                'version': {'N': str(head.version)},
+                'ttl': {'N': str(calculate_ttl(365))}  # 1 Jahr TTL
+            },
+            # Neue Session oder Item aus der Zeit vor der Versionierung
+            **_version_condition(expected_version, 'attribute_not_exists(session_name) OR attribute_not_exists(#version)')
+        )
+        return head
+    
+    # ----- Delta-Sync -----
+    
+    def _sync_rounds_delta(self, session_name: str, game_data: Dict, expected_version: int) -> SessionHead:
+        """
+        Schreibt nur die Änderungen seit dem letzten Sync: Header + neue/geänderte Runden
+        
+        Im Normalfall (neue Runde angehängt) sind das zwei Items. Wurde eine Runde mittendrin
+        gelöscht, eingefügt oder bearbeitet, werden die Runden ab dieser Position neu geschrieben
+        und überzählige Items am Ende gelöscht.
+        
+        Die Version steht am Header. Passen alle Items in eine Transaktion, wird der Header bedingt
+        zusammen mit den Runden geschrieben; sonst wird die Version vorab per bedingtem Update reserviert.
+        """
+        table_name = self.rounds_table_name
+        rounds = game_data['rounds']
+        head = SessionHead(expected_version + 1, datetime.now().isoformat())
+        ttl = str(calculate_ttl(365))  # 1 Jahr TTL
+        
+        with self._synced_lock:
+            synced_version, synced_rounds = self._synced.get(session_name, (None, None))
+        
+        if synced_version is not None and synced_version > expected_version:
+            # Hier wurde schon eine neuere Version gelesen/geschrieben: die Bedingung kann nicht gelingen
+            raise VersionConflictError(session_name)
+        
+        if synced_rounds is None or synced_version != expected_version:
+            # Unbekannter Stand (z.B. erster Sync): alles schreiben, Altlasten am Ende löschen
+            first_changed = 0
+            synced_count = self._count_remote_rounds(session_name)
+        else:
+            # Runden werden bei Änderungen ersetzt: meist reicht der Identitätsvergleich,
+            # inhaltlich gleiche Kopien (z.B. von einem anderen Gerät geladen) zählen ebenfalls als unverändert
+            first_changed = min(len(rounds), len(synced_rounds))
+            for position, (current, synced) in enumerate(zip(rounds, synced_rounds)):
+                if current is not synced and current != synced:
+                    first_changed = position
+                    break
+            synced_count = len(synced_rounds)
+        
+        header = {key: value for key, value in game_data.items() if key != 'rounds'}
+        header['round_count'] = len(rounds)
+        
+        put_items = [
+            {
+                **_session_key(session_name, position + 1),
+                'round': {'S': json.dumps(dict(rounds[position]))},
+                'ttl': {'N': ttl}
+            }
+            for position in range(first_changed, len(rounds))
+        ]
+        
+        header_item = {
+            **_session_key(session_name, HEADER_SEQ),
+            'last_updated': {'S': head.last_updated},
+            'created_at': {'S': game_data.get('created_at', head.last_updated)},
+            'header': {'S': json.dumps(header)},
+            'version': {'N': str(head.version)},
+            'ttl': {'N': ttl}
+        }
+        
+        delete_keys = [_session_key(session_name, seq) for seq in range(len(rounds) + 1, synced_count + 1)]
+        condition = _version_condition(expected_version, 'attribute_not_exists(#version)')
+        
+        if len(put_items) + len(delete_keys) < TRANSACT_WRITE_LIMIT:
+            # Alles oder nichts: bei fremder Version wird keine einzige Runde geschrieben
+            self.client.transact_write_items(TransactItems=(
+                [{'Put': {'TableName': table_name, 'Item': item}} for item in put_items]
+                + [{'Delete': {'TableName': table_name, 'Key': key}} for key in delete_keys]
+                + [{'Put': {'TableName': table_name, 'Item': header_item, **condition}}]
+            ))
+        else:
+            # Zu groß für eine Transaktion (z.B. erster Sync einer langen Session): Version reservieren,
+            # dann in Batches schreiben. Header zuletzt: bricht der Sync ab, verweist round_count noch
+            # auf den alten, vollständigen Stand
+            self.client.update_item(
+                TableName=table_name,
+                Key=_session_key(session_name, HEADER_SEQ),
+                UpdateExpression='SET #version = :version',
+                **{**condition, 'ExpressionAttributeValues': {
+                    **condition.get('ExpressionAttributeValues', {}),
+                    ':version': {'N': str(head.version)}
+                }}
+            )
+            _batch_write(self.client, table_name, put_items + [header_item], delete_keys)
+        
+        with self._synced_lock:
+            self._synced[session_name] = (head.version, list(rounds))
+        
+        return head
+    
+    def _query_session_items(self, session_name: str, **kwargs):
+        """Liest alle Items einer Session seitenweise per Query (aufsteigend nach seq)"""
+        query_args = {
+            'TableName': self.rounds_table_name,
+            'KeyConditionExpression': 'session_name = :session_name',
+            'ExpressionAttributeValues': {':session_name': {'S': session_name}},
+            'ConsistentRead': True,
+            **kwargs
+        }
+        while True:
+            response = self.client.query(**query_args)
+            yield from response.get('Items', [])
+            if 'LastEvaluatedKey' not in response:
+                break
+            query_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
+    def _count_remote_rounds(self, session_name: str) -> int:
+        """Höchste in der Cloud gespeicherte Runden-Sequenz einer Session"""
+        seqs = [int(item['seq']['N']) for item in self._query_session_items(session_name, ProjectionExpression='seq')]
+        return max(seqs, default=HEADER_SEQ)
+    
+    def _query_session_rounds(self, session_name: str):
+        """
+        Setzt eine Session aus Header- und Runden-Items zusammen
+        
+        Returns:
+            (StoredSession oder None wenn kein Header existiert, Version am Header)
+        """
+        header = None
+        head = SessionHead(0, None)
+        rounds = []
+        for item in self._query_session_items(session_name):
+            if int(item['seq']['N']) == HEADER_SEQ:
+                head = _item_head(item)
+                # Ein Header nur mit Version ist eine gerade laufende erste Speicherung
+                if 'header' in item:
+                    header = json.loads(item['header']['S'])
+            else:
+                rounds.append(json.loads(item['round']['S']))
+        
+        if header is None:
+            return None, head.version
+        
+        # Nur so viele Runden wie im Header vermerkt (falls ein Sync abgebrochen ist)
+        rounds = rounds[:header.pop('round_count', len(rounds))]
+        game_data = {**header, 'rounds': rounds}
+        
+        with self._synced_lock:
+            self._synced[session_name] = (head.version, list(rounds))
+        
+        return StoredSession(game_data, head.version, head.last_updated), head.version
+
+
+def _batch_write(client, table_name: str, put_items: list, delete_keys: list):
+    """Schreibt/löscht Items mit BatchWriteItem in 25er-Blöcken, unverarbeitete Items mit Backoff erneut"""
+    requests = [{'PutRequest': {'Item': item}} for item in put_items]
+    requests += [{'DeleteRequest': {'Key': key}} for key in delete_keys]
+    
+    for start in range(0, len(requests), BATCH_WRITE_LIMIT):
+        pending = {table_name: requests[start:start + BATCH_WRITE_LIMIT]}
+        for attempt in range(BATCH_WRITE_MAX_RETRIES + 1):
+            response = client.batch_write_item(RequestItems=pending)
+            pending = response.get('UnprocessedItems') or {}
+            if not pending:
+                break
+            if attempt == BATCH_WRITE_MAX_RETRIES:
+                raise RuntimeError(f"{len(pending[table_name])} Items konnten nicht geschrieben werden")
+            time.sleep(min(0.05 * 2 ** attempt, 2.0))
+
+
+def _session_key(session_name: str, seq: int) -> dict:
+    return {'session_name': {'S': session_name}, 'seq': {'N': str(seq)}}
+
+
+def _item_head(item: dict) -> SessionHead:
+    """Version (0 bei Items aus der Zeit vor der Versionierung) und last_updated eines Items"""
+    last_updated = item.get('last_updated')
+    return SessionHead(int(item.get('version', {'N': '0'})['N']), last_updated['S'] if last_updated else None)
+
+
+def _decode_game_data_attribute(attribute: dict) -> dict:
+    """Liest game_data im alten (S: JSON-Text) und neuen Format (B: komprimiert, siehe game_data_codec)"""
+    if 'B' in attribute:
+        return decode_game_data(attribute['B'])
+    return json.loads(attribute['S'])
+
+
+def _is_write_conflict(error: ClientError) -> bool:
+    """True wenn ein bedingter Schreibvorgang an einer fremden Version gescheitert ist"""
+    code = error.response['Error']['Code']
+    if code == 'ConditionalCheckFailedException':
+        return True
+    if code == 'TransactionCanceledException':
+        reasons = error.response.get('CancellationReasons', [])
+        return any(reason.get('Code') == 'ConditionalCheckFailed' for reason in reasons)
+    return False
+
+
+def _version_condition(expected_version: int, missing_condition: str) -> dict:
+    """
+    Bedingung für einen Schreibvorgang auf Basis der erwarteten Version
+    
+    Args:
+        expected_version: Zuletzt bekannte Version (0 = Session war beim letzten Lesen unbekannt)
+        missing_condition: Bedingung für noch nicht versionierte Items
+    """
+    if expected_version:
+        return {
+            'ConditionExpression': '#version = :expected',
+            'ExpressionAttributeNames': {'#version': 'version'},
+            'ExpressionAttributeValues': {':expected': {'N': str(expected_version)}}
+        }
+    return {
+        'ConditionExpression': missing_condition,
+        'ExpressionAttributeNames': {'#version': 'version'}
+    }
@@ -0,0 +1,95 @@
+"""
+Kompakte Binär-Kodierung der Spieldaten für Cloud-Speicherungen
+Spielernamen werden nur einmal gespeichert, Runden referenzieren sie per Index; das Ganze ist zlib-komprimiert
+"""
+import json
+import zlib
+from typing import Dict, List
+
+# Erstes Byte der Nutzlast = Format-Version
+CODEC_VERSION = 1
+
+# Feldreihenfolge einer kompakt kodierten Runde
+ROUND_FIELDS = (
+    'id', 'round_number', 'timestamp', 'is_solo', 'winners', 'points',
+    'solo_player', 'sitting_out', 'winning_team', 'is_bock', 'scores'
+)
+
+# Optionales Feld bearbeiteter Runden, wird nur bei Bedarf angehängt
+OPTIONAL_ROUND_FIELDS = ('updated_at',)
+
+
+def encode_game_data(game_data: Dict) -> bytes:
+    """
+    Kodiert die Spieldaten als versionierte, komprimierte Binärdaten
+    
+    Args:
+        game_data: Dictionary wie von serialize_game_data()
+    
+    Returns:
+        Bytes: Versions-Byte + zlib-komprimiertes JSON
+    """
+    names = [player['name'] for player in game_data.get('players', [])]
+    name_index = {name: idx for idx, name in enumerate(names)}
+    
+    payload = {key: value for key, value in game_data.items() if key != 'rounds'}
+    payload['rounds'] = [_encode_round(round_data, names, name_index) for round_data in game_data.get('rounds', [])]
+    
+    raw = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return bytes([CODEC_VERSION]) + zlib.compress(raw, 6)
+
+
+def decode_game_data(data: bytes) -> Dict:
+    """Dekodiert Binärdaten aus encode_game_data() zurück in das übliche Dictionary"""
+    version = data[0]
+    if version != CODEC_VERSION:
+        raise ValueError(f"Unbekannte Spieldaten-Version: {version}")
+    
+    payload = json.loads(zlib.decompress(data[1:]).decode('utf-8'))
+    names = [player['name'] for player in payload.get('players', [])]
+    payload['rounds'] = [_decode_round(round_data, names) for round_data in payload.get('rounds', [])]
+    return payload
+
+
+def _encode_round(round_data: Dict, names: List[str], name_index: Dict[str, int]):
+    """
+    Runde als Liste in ROUND_FIELDS-Reihenfolge mit Spieler-Indizes
+    Runden mit abweichender Struktur (z.B. aus alten Importen) bleiben unverändert als Dictionary
+    """
+    scores = round_data.get('scores', {})
+    people = list(round_data.get('winners', [])) + [round_data.get('solo_player'), round_data.get('sitting_out')]
+    optional = [field for field in OPTIONAL_ROUND_FIELDS if field in round_data]
+    if set(round_data) != set(ROUND_FIELDS) | set(optional) \
+            or set(scores) != set(names) \
+            or any(name is not None and name not in name_index for name in people):
+        return round_data
+    
+    def index_of(name):
+        return None if name is None else name_index[name]
+    
+    return [
+        round_data['id'],
+        round_data['round_number'],
+        round_data['timestamp'],
+        round_data['is_solo'],
+        [name_index[name] for name in round_data['winners']],
+        round_data['points'],
+        index_of(round_data['solo_player']),
+        index_of(round_data['sitting_out']),
+        round_data['winning_team'],
+        round_data['is_bock'],
+        [scores[name] for name in names]
+    ] + [round_data[field] for field in optional]
+
+
+def _decode_round(encoded, names: List[str]) -> Dict:
+    """Gegenstück zu _encode_round()"""
+    if isinstance(encoded, dict):
+        return encoded
+    
+    round_data = dict(zip(ROUND_FIELDS + OPTIONAL_ROUND_FIELDS, encoded))
+    round_data['winners'] = [names[idx] for idx in round_data['winners']]
+    round_data['solo_player'] = None if round_data['solo_player'] is None else names[round_data['solo_player']]
+    round_data['sitting_out'] = None if round_data['sitting_out'] is None else names[round_data['sitting_out']]
+    round_data['scores'] = dict(zip(names, round_data['scores']))
+    return round_data
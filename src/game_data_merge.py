@@ -0,0 +1,88 @@
+"""
+Zusammenführen zweier Spielstände auf Runden-Ebene
+Wird bei Schreibkonflikten im Cloud-Sync verwendet (zwei Geräte tragen in dieselbe Session ein)
+"""
+from typing import Dict, List
+
+
+def merge_game_data(local: Dict, remote: Dict) -> Dict:
+    """
+    Führt den lokalen und den entfernten Spielstand zusammen
+    
+    Regeln:
+    - Runden werden über ihre ID vereinigt, gelöschte IDs (Tombstones beider Seiten) fallen raus
+    - Gibt es eine Runde auf beiden Seiten, gewinnt die zuletzt bearbeitete Fassung (updated_at)
+    - Reihenfolge des entfernten Stands bleibt, nur lokal bekannte Runden folgen ihrem lokalen Vorgänger
+    - Spieler werden über den Namen vereinigt, alle übrigen Felder kommen vom lokalen Stand
+    
+    Args:
+        local: Spieldaten dieses Geräts (wie von serialize_game_data())
+        remote: Zuletzt in der Cloud gespeicherte Spieldaten
+    
+    Returns:
+        Neues Dictionary mit zusammengeführten Spieldaten (Runden-Dicts werden nicht verändert)
+    """
+    tombstones = list(local.get('deleted_round_ids', []))
+    known = set(tombstones)
+    for round_id in remote.get('deleted_round_ids', []):
+        if round_id not in known:
+            known.add(round_id)
+            tombstones.append(round_id)
+    
+    local_rounds = [r for r in local.get('rounds', []) if r['id'] not in known]
+    local_by_id = {r['id']: r for r in local_rounds}
+    
+    # Basis: entfernte Reihenfolge; unveränderte Runden behalten das entfernte Objekt (Delta-Sync vergleicht per Identität)
+    merged = []
+    for remote_round in remote.get('rounds', []):
+        if remote_round['id'] in known:
+            continue
+        local_round = local_by_id.get(remote_round['id'])
+        if local_round is None or _same_round(local_round, remote_round) or _edited_at(remote_round) > _edited_at(local_round):
+            merged.append(remote_round)
+        else:
+            merged.append(local_round)
+    
+    # Nur lokal bekannte Runden hinter ihrem letzten gemeinsamen Vorgänger einsortieren
+    merged_ids = {r['id'] for r in merged}
+    following: Dict[str, List[Dict]] = {}
+    anchor = None
+    for local_round in local_rounds:
+        if local_round['id'] in merged_ids:
+            anchor = local_round['id']
+        else:
+            following.setdefault(anchor, []).append(local_round)
+    
+    rounds = list(following.get(None, []))
+    for round_data in merged:
+        rounds.append(round_data)
+        rounds.extend(following.get(round_data['id'], []))
+    
+    # Lückenlos neu nummerieren (Kopie nur bei geänderter Nummer)
+    for position, round_data in enumerate(rounds):
+        if round_data.get('round_number') != position + 1:
+            rounds[position] = {**round_data, 'round_number': position + 1}
+    
+    players = list(remote.get('players', []))
+    player_names = {player['name'] for player in players}
+    for player in local.get('players', []):
+        if player['name'] not in player_names:
+            players.append(player)
+            player_names.add(player['name'])
+    
+    return {
+        **local,
+        'players': players,
+        'rounds': rounds,
+        'deleted_round_ids': tombstones
+    }
+
+
+def _same_round(first: Dict, second: Dict) -> bool:
+    """Gleicher Inhalt, abgesehen von der Rundennummer (die nach Löschungen nur verschoben ist)"""
+    return first == second or {**first, 'round_number': None} == {**second, 'round_number': None}
+
+
+def _edited_at(round_data: Dict) -> str:
+    """Zeitpunkt der letzten Bearbeitung (ISO-String), unbearbeitete Runden zählen ab ihrer Erfassung"""
+    return round_data.get('updated_at') or round_data.get('timestamp', '')
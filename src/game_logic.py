@@ -5,10 +5,41 @@ import streamlit as st
 from typing import List, Dict, Optional
 from datetime import datetime
 import uuid
+from src.round_store import RoundStore
+from src.round_record import Round, compact_round
+from src.stats_engine import start_consistency_check
 
 
-def calculate_scores() -> Dict[str, int]:
-    """Berechnet die Gesamtpunktzahl für jeden Spieler"""
+def mark_rounds_changed(state=None):
+    """
+    Markiert die Runden als geändert (invalidiert abgeleitete Daten wie den Punkte-Ledger)
+    Muss aufgerufen werden, wenn die Runden außerhalb von add_round/delete_round ersetzt werden
+    
+    Args:
+        state: Session State Objekt (default: st.session_state)
+    """
+    if state is None:
+        state = st.session_state
+    
+    state.rounds_version = state.get('rounds_version', 0) + 1
+
+
+def get_rounds_key() -> tuple:
+    """Versionsschlüssel der Spieldaten (Runden-Version + Spielerliste) für abgeleitete Caches"""
+    return (
+        st.session_state.get('rounds_version', 0),
+        tuple(player['name'] for player in st.session_state.players)
+    )
+
+
+def _ledger_is_current() -> bool:
+    """Prüft ob der Ledger zum aktuellen Stand der Runden passt"""
+    ledger = st.session_state.get('score_ledger')
+    return ledger is not None and ledger['key'] == get_rounds_key()
+
+
+def _full_recompute_scores() -> Dict[str, int]:
+    """Berechnet die Gesamtpunktzahl komplett neu aus allen Runden"""
     scores = {player['name']: 0 for player in st.session_state.players}
     
     for round_data in st.session_state.rounds:
@@ -19,8 +50,51 @@ def calculate_scores() -> Dict[str, int]:
     return scores
 
 
-def add_round(winners: List[str], points: int, is_solo: bool = False, solo_player: Optional[str] = None, sitting_out: Optional[str] = None, winning_team: str = 'Re', is_bock: bool = False):
-    """Fügt eine neue Runde hinzu"""
+def rebuild_score_ledger() -> Dict[str, int]:
+    """Baut den laufenden Punkte-Ledger komplett neu auf (vektorisiert über den Spaltenspeicher)"""
+    totals = get_round_store().totals()
+    st.session_state.score_ledger = {'key': get_rounds_key(), 'totals': totals}
+    return totals
+
+
+def verify_score_ledger() -> bool:
+    """
+    Konsistenzprüfung: Vergleicht den Ledger mit einer vollständigen Neuberechnung
+    Bei Abweichung wird der Ledger neu aufgebaut
+    
+    Returns:
+        True wenn der Ledger konsistent war, False wenn er neu aufgebaut wurde
+    """
+    ledger = st.session_state.get('score_ledger')
+    expected = _full_recompute_scores()
+    if _ledger_is_current() and ledger['totals'] == expected:
+        return True
+    
+    st.session_state.score_ledger = {'key': get_rounds_key(), 'totals': expected}
+    return False
+
+
+def _apply_to_ledger(scores: Dict[str, int], sign: int = 1):
+    """Addiert (sign=1) oder subtrahiert (sign=-1) die Punkte einer Runde im Ledger"""
+    totals = st.session_state.score_ledger['totals']
+    for player_name, points in scores.items():
+        if player_name in totals:
+            totals[player_name] += sign * points
+
+
+def calculate_scores() -> Dict[str, int]:
+    """
+    Gibt die Gesamtpunktzahl für jeden Spieler zurück
+    Liest aus dem laufenden Ledger (O(Spieler)), baut ihn nur bei veraltetem Stand neu auf
+    """
+    if not _ledger_is_current():
+        rebuild_score_ledger()
+    
+    return dict(st.session_state.score_ledger['totals'])
+
+
+def _build_round(winners: List[str], points: int, is_solo: bool = False, solo_player: Optional[str] = None, sitting_out: Optional[str] = None, winning_team: str = 'Re', is_bock: bool = False) -> Dict:
+    """Erstellt das Runden-Dictionary inkl. Punkteverteilung (ohne es zu speichern)"""
     round_data = {
         'id': str(uuid.uuid4()),
         'round_number': len(st.session_state.rounds) + 1,
@@ -75,9 +149,293 @@ def add_round(winners: List[str], points: int, is_solo: bool = False, solo_playe
             else:
                 round_data['scores'][player['name']] = -points
     
+    return round_data
+
+
+def _compact(round_data: Dict):
+    """Runde als kompakter Datensatz für den Session State (siehe src/round_record.py)"""
+    return compact_round(round_data, tuple(player['name'] for player in st.session_state.players))
+
+
+def _renumber_rounds(start: int = 0):
+    """
+    Vergibt die Rundennummern ab Position start lückenlos neu
+    Geänderte Runden werden ersetzt statt verändert: Schnappschüsse (Export, Cloud-Sync) teilen die Datensätze
+    """
+    rounds = st.session_state.rounds
+    for position in range(start, len(rounds)):
+        round_data = rounds[position]
+        if round_data['round_number'] != position + 1:
+            rounds[position] = round_data.renumbered(position + 1) if isinstance(round_data, Round) else {**round_data, 'round_number': position + 1}
+
+
+def _note_round_change(round_id: str):
+    """
+    Merkt sich eine geänderte Runde für das nächste Journal des Cloud-Syncs (siehe cloud_sync._journal_changes)
+    Ohne Liste (Runden wurden komplett ersetzt, z.B. Import) vergleicht das Journal den ganzen Stand
+    """
+    changed = st.session_state.get('changed_round_ids')
+    if changed is not None:
+        changed.append(round_id)
+
+
+def add_round(winners: List[str], points: int, is_solo: bool = False, solo_player: Optional[str] = None, sitting_out: Optional[str] = None, winning_team: str = 'Re', is_bock: bool = False):
+    """Fügt eine neue Runde hinzu"""
+    round_data = _compact(_build_round(winners, points, is_solo, solo_player, sitting_out, winning_team, is_bock))
+    
+    ledger_current = _ledger_is_current()
+    index_current = _score_index_is_current()
+    store_current = _round_store_is_current()
+    stats_current = _stats_snapshot_is_current()
     st.session_state.rounds.append(round_data)
+    _note_round_change(round_data['id'])
+    mark_rounds_changed()
+    
+    # Ledger und Index inkrementell fortschreiben statt neu zu berechnen
+    if ledger_current:
+        _apply_to_ledger(round_data['scores'])
+        st.session_state.score_ledger['key'] = get_rounds_key()
+    
+    if index_current:
+        st.session_state.score_index.append(round_data['scores'])
+        st.session_state.score_index.key = get_rounds_key()
+    
+    if store_current:
+        st.session_state.round_store.append(round_data)
+        st.session_state.round_store.key = get_rounds_key()
+    
+    if stats_current:
+        st.session_state.stats_snapshot.apply_round(st.session_state.rounds, len(st.session_state.rounds) - 1)
+        _stats_snapshot_updated()
+
+
+def insert_round(position: int, winners: List[str], points: int, is_solo: bool = False, solo_player: Optional[str] = None, sitting_out: Optional[str] = None, winning_team: str = 'Re', is_bock: bool = False):
+    """
+    Fügt eine Runde an Position position (0-basiert) ein und nummeriert die folgenden Runden neu
+    Der Score-Index wird dabei beim nächsten Zugriff neu aufgebaut (O(n))
+    """
+    round_data = _compact(_build_round(winners, points, is_solo, solo_player, sitting_out, winning_team, is_bock))
+    position = max(0, min(position, len(st.session_state.rounds)))
+    
+    ledger_current = _ledger_is_current()
+    stats_current = _stats_snapshot_is_current()
+    st.session_state.rounds.insert(position, round_data)
+    _renumber_rounds(position)
+    _note_round_change(round_data['id'])
+    mark_rounds_changed()
+    
+    if ledger_current:
+        _apply_to_ledger(round_data['scores'])
+        st.session_state.score_ledger['key'] = get_rounds_key()
+    
+    if stats_current:
+        st.session_state.stats_snapshot.apply_round(st.session_state.rounds, position)
+        _stats_snapshot_updated()
+
+
+def update_round(round_id: str, winners: List[str], points: int, is_solo: bool = False, solo_player: Optional[str] = None, sitting_out: Optional[str] = None, winning_team: str = 'Re', is_bock: bool = False) -> bool:
+    """
+    Bearbeitet eine bestehende Runde (REQUIREMENTS 3.4)
+    ID, Rundennummer und Zeitstempel bleiben erhalten, die Punkte werden neu verteilt
+    
+    Returns:
+        True wenn die Runde gefunden und geändert wurde
+    """
+    position = _find_round_position(round_id)
+    if position is None:
+        return False
+    
+    old_round = st.session_state.rounds[position]
+    new_round = _build_round(winners, points, is_solo, solo_player, sitting_out, winning_team, is_bock)
+    new_round['id'] = old_round['id']
+    new_round['round_number'] = old_round['round_number']
+    new_round['timestamp'] = old_round['timestamp']
+    new_round['updated_at'] = datetime.now().isoformat()  # Beim Zusammenführen gewinnt die jüngste Bearbeitung
+    new_round = _compact(new_round)
+    
+    ledger_current = _ledger_is_current()
+    index_current = _score_index_is_current()
+    stats_current = _stats_snapshot_is_current()
+    if stats_current:
+        st.session_state.stats_snapshot.unapply_round(st.session_state.rounds, position)
+    
+    st.session_state.rounds[position] = new_round
+    _note_round_change(round_id)
+    mark_rounds_changed()
+    
+    if ledger_current:
+        _apply_to_ledger(old_round['scores'], sign=-1)
+        _apply_to_ledger(new_round['scores'])
+        st.session_state.score_ledger['key'] = get_rounds_key()
+    
+    if index_current:
+        st.session_state.score_index.update(position, old_round['scores'], new_round['scores'])
+        st.session_state.score_index.key = get_rounds_key()
+    
+    if stats_current:
+        st.session_state.stats_snapshot.apply_round(st.session_state.rounds, position)
+        _stats_snapshot_updated()
+    
+    return True
+
+
+def _find_round_position(round_id: str) -> Optional[int]:
+    """Gibt die Listenposition einer Runde zurück (None wenn nicht vorhanden)"""
+    for position, round_data in enumerate(st.session_state.rounds):
+        if round_data['id'] == round_id:
+            return position
+    return None
 
 
 def delete_round(round_id: str):
-    """Löscht eine Runde"""
-    st.session_state.rounds = [r for r in st.session_state.rounds if r['id'] != round_id]
+    """Löscht eine Runde und nummeriert die folgenden Runden lückenlos neu"""
+    position = _find_round_position(round_id)
+    if position is None:
+        return
+    
+    ledger_current = _ledger_is_current()
+    stats_current = _stats_snapshot_is_current()
+    if stats_current:
+        # Statistiken zurücknehmen solange die Runde noch in der Liste steht (lokaler Strähnen-Scan)
+        st.session_state.stats_snapshot.unapply_round(st.session_state.rounds, position)
+    
+    deleted = st.session_state.rounds.pop(position)
+    # Tombstone für den Cloud-Sync: andere Geräte sollen die Runde beim Zusammenführen nicht wiederbeleben
+    st.session_state.setdefault('deleted_round_ids', []).append(round_id)
+    _renumber_rounds(position)
+    _note_round_change(round_id)
+    mark_rounds_changed()
+    
+    if ledger_current:
+        _apply_to_ledger(deleted['scores'], sign=-1)
+        st.session_state.score_ledger['key'] = get_rounds_key()
+    
+    if stats_current:
+        _stats_snapshot_updated()
+
+
+class FenwickTree:
+    """Fenwick-Baum (Binary Indexed Tree) für Präfixsummen in O(log n)"""
+    
+    def __init__(self, values: List[int] = None):
+        # Lineare Konstruktion in O(n), Index 0 ist unbenutzt
+        self.tree = [0] + list(values or [])
+        for i in range(1, len(self.tree)):
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+    
+    def __len__(self) -> int:
+        return len(self.tree) - 1
+    
+    def prefix_sum(self, k: int) -> int:
+        """Summe der ersten k Werte"""
+        k = max(0, min(k, len(self)))
+        total = 0
+        while k > 0:
+            total += self.tree[k]
+            k -= k & -k
+        return total
+    
+    def add(self, position: int, delta: int):
+        """Addiert delta auf den Wert an Position position (0-basiert)"""
+        i = position + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+    
+    def append(self, value: int):
+        """Hängt einen Wert an (O(log n))"""
+        i = len(self.tree)
+        # Knoten i deckt die Werte (i - lowbit(i), i] ab
+        self.tree.append(value + self.prefix_sum(i - 1) - self.prefix_sum(i - (i & -i)))
+
+
+class ScoreIndex:
+    """Ein Fenwick-Baum pro Spieler über die Punkteänderungen aller Runden"""
+    
+    def __init__(self, player_names: List[str], rounds: List[Dict]):
+        self.key = None
+        self.trees = {
+            name: FenwickTree([r['scores'].get(name, 0) for r in rounds])
+            for name in player_names
+        }
+    
+    def __len__(self) -> int:
+        return len(next(iter(self.trees.values()))) if self.trees else 0
+    
+    def append(self, scores: Dict[str, int]):
+        for name, tree in self.trees.items():
+            tree.append(scores.get(name, 0))
+    
+    def update(self, position: int, old_scores: Dict[str, int], new_scores: Dict[str, int]):
+        for name, tree in self.trees.items():
+            delta = new_scores.get(name, 0) - old_scores.get(name, 0)
+            if delta:
+                tree.add(position, delta)
+    
+    def totals_after(self, k: int) -> Dict[str, int]:
+        """Gesamtpunkte pro Spieler nach den ersten k Runden"""
+        return {name: tree.prefix_sum(k) for name, tree in self.trees.items()}
+    
+    def range_sum(self, start: int, end: int) -> Dict[str, int]:
+        """Punkte pro Spieler in den Runden start+1 bis end (entspricht rounds[start:end])"""
+        return {name: tree.prefix_sum(end) - tree.prefix_sum(start) for name, tree in self.trees.items()}
+
+
+def _score_index_is_current() -> bool:
+    """Prüft ob der Score-Index zum aktuellen Stand der Runden passt"""
+    index = st.session_state.get('score_index')
+    return index is not None and index.key == get_rounds_key()
+
+
+def get_score_index() -> ScoreIndex:
+    """Gibt den Score-Index zurück und baut ihn bei veraltetem Stand neu auf"""
+    if not _score_index_is_current():
+        index = ScoreIndex([p['name'] for p in st.session_state.players], st.session_state.rounds)
+        index.key = get_rounds_key()
+        st.session_state.score_index = index
+    
+    return st.session_state.score_index
+
+
+def score_after_round(k: int) -> Dict[str, int]:
+    """Gesamtpunkte pro Spieler nach Runde k (k=0: Startstand) in O(Spieler · log n)"""
+    return get_score_index().totals_after(k)
+
+
+def scores_in_range(first_round: int, last_round: int) -> Dict[str, int]:
+    """Summe der Punkte pro Spieler von Runde first_round bis last_round (inklusive)"""
+    return get_score_index().range_sum(first_round - 1, last_round)
+
+
+def _round_store_is_current() -> bool:
+    """Prüft ob der Spaltenspeicher zum aktuellen Stand der Runden passt"""
+    store = st.session_state.get('round_store')
+    return store is not None and store.key == get_rounds_key()
+
+
+def get_round_store() -> RoundStore:
+    """
+    Gibt den spaltenbasierten Runden-Speicher zurück
+    Neue Runden werden angehängt, alle anderen Änderungen führen zum Neuaufbau beim nächsten Zugriff
+    """
+    if not _round_store_is_current():
+        store = RoundStore.from_rounds([p['name'] for p in st.session_state.players], st.session_state.rounds)
+        store.key = get_rounds_key()
+        st.session_state.round_store = store
+    
+    return st.session_state.round_store
+
+
+def _stats_snapshot_is_current() -> bool:
+    """Prüft ob der Statistik-Snapshot (siehe statistics.get_stats_snapshot) aktuell ist"""
+    snapshot = st.session_state.get('stats_snapshot')
+    return snapshot is not None and snapshot.key == get_rounds_key()
+
+
+def _stats_snapshot_updated():
+    """Markiert den inkrementell fortgeschriebenen Snapshot als aktuell (Debug: Gegenprüfung im Hintergrund)"""
+    snapshot = st.session_state.stats_snapshot
+    snapshot.key = get_rounds_key()
+    start_consistency_check(snapshot, [p['name'] for p in st.session_state.players], st.session_state.rounds)
@@ -0,0 +1,77 @@
+"""
+Vorwärmen teurer Imports
+Die App lädt plotly, pandas und boto3 erst bei der ersten Nutzung. Damit der erste Klick auf
+Übersicht oder Historie trotzdem nicht auf den Import wartet, holt ein Hintergrund-Thread sie
+direkt nach dem ersten Script-Run des Prozesses nach.
+"""
+import importlib
+import logging
+import os
+import threading
+import time
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+# In Reihenfolge der erwarteten Nutzung (Übersicht vor Historie)
+PREWARM_MODULES = ('plotly.graph_objects', 'pandas')
+
+# Nur wenn DynamoDB als Speicher-Backend konfiguriert ist
+CLOUD_PREWARM_MODULES = ('boto3', 'botocore.config', 'src.dynamodb_backend')
+
+# Gesetzt, sobald PREWARM_MODULES vollständig geladen sind (oder nichts vorgewärmt wird)
+_libraries_ready = threading.Event()
+
+
+@st.cache_resource(show_spinner=False)
+def start_prewarm():
+    """
+    Startet einmal pro Prozess den Vorwärm-Thread (abschaltbar mit DOPPELKOPF_PREWARM=0)
+    
+    Returns:
+        Der gestartete Thread oder None wenn abgeschaltet
+    """
+    if os.environ.get("DOPPELKOPF_PREWARM", "1") == "0":
+        _libraries_ready.set()
+        return None
+    
+    from src.cloud_sync import _load_storage_settings
+    
+    settings = _load_storage_settings()
+    cloud = settings is not None and settings['backend'] == 'dynamodb'
+    
+    thread = threading.Thread(target=_prewarm, args=(cloud,), name="doppelkopf-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def wait_for_prewarm(timeout: float = 10):
+    """
+    Wartet, bis der Vorwärm-Thread plotly und pandas fertig geladen hat
+    
+    Vor dem ersten Diagramm bzw. der ersten Tabelle aufrufen: plotly und streamlit prüfen pandas
+    über sys.modules, ohne auf den Import-Lock zu warten, und sähen sonst ein halb initialisiertes Modul.
+    """
+    if start_prewarm() is not None:
+        _libraries_ready.wait(timeout)
+
+
+def _prewarm(cloud: bool):
+    try:
+        _import_modules(PREWARM_MODULES)
+    finally:
+        _libraries_ready.set()
+    if cloud:
+        _import_modules(CLOUD_PREWARM_MODULES)
+
+
+def _import_modules(modules):
+    """Importiert die Module nacheinander; Fehler werden nur protokolliert (der echte Import meldet sie erneut)"""
+    for module in modules:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            logger.warning("Vorwärmen von %s fehlgeschlagen: %s", module, e)
+            continue
+        logger.info("%s vorgewärmt (%.0f ms)", module, (time.perf_counter() - started) * 1000)
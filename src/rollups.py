@@ -0,0 +1,195 @@
+"""
+Verdichtete Kennzahlen pro Spielabend (REQUIREMENTS 6.2)
+Beim Archivieren wird jeder Abend genau einmal zu Summen pro Spieler und Pärchen verdichtet.
+Ranglisten über alle Abende oder einen Zeitraum addieren danach nur noch diese Zeilen,
+statt die Runden aller Abende erneut auszuwerten.
+"""
+import heapq
+from itertools import combinations
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from src.team_stats import MAX_PLAYERS, TeamStats
+
+
+class StreakBounds(NamedTuple):
+    """
+    Strähnen eines Spielers an einem Abend
+    
+    Erste und letzte Strähne werden gespeichert, damit Strähnen über Abendgrenzen hinweg
+    verkettet werden können (siehe chain_streaks); Ergebnis True = gewonnen, None = nicht gespielt.
+    """
+    first_outcome: Optional[bool] = None
+    first_length: int = 0
+    last_outcome: Optional[bool] = None
+    last_length: int = 0
+    max_win: int = 0
+    max_loss: int = 0
+    games: int = 0
+
+
+class PlayerRollup(NamedTuple):
+    """Summen eines Spielers an einem Abend (bzw. über mehrere Abende)"""
+    name: str
+    points: int = 0
+    wins: int = 0
+    games: int = 0
+    solo_count: int = 0
+    solo_wins: int = 0
+    bock_games: int = 0
+    bock_points: int = 0
+    
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games * 100 if self.games else 0.0
+    
+    @property
+    def avg_points(self) -> float:
+        return self.points / self.games if self.games else 0.0
+
+
+class SessionRollup(NamedTuple):
+    """Alle Kennzahlen eines Abends"""
+    rounds: int
+    solo_count: int
+    bock_count: int
+    normal_points: int
+    bock_points: int
+    re_wins: int
+    kontra_wins: int
+    players: Dict[str, PlayerRollup]
+    streaks: Dict[str, StreakBounds]
+    # Sortiertes Pärchen -> (Punktesumme, gemeinsame Spiele) wie StatsSnapshot.team_performance
+    pairs: Dict[Tuple[str, str], Tuple[int, int]]
+
+
+# Sortierschlüssel der Ranglisten
+LEADERBOARD_METRICS: Dict[str, Tuple[str, Callable[[PlayerRollup], float]]] = {
+    'points': ("Punkte", lambda totals: totals.points),
+    'avg_points': ("Punkte pro Spiel", lambda totals: totals.avg_points),
+    'win_rate': ("Gewinnrate", lambda totals: totals.win_rate),
+    'wins': ("Siege", lambda totals: totals.wins),
+    'solo_wins': ("Gewonnene Soli", lambda totals: totals.solo_wins),
+    'bock_points': ("Bock-Punkte", lambda totals: totals.bock_points),
+}
+
+
+def compute_session_rollup(player_names: List[str], rounds: List[Dict]) -> SessionRollup:
+    """Verdichtet die Runden eines Abends in einem Durchlauf"""
+    counters = {name: [0] * 7 for name in player_names}
+    outcomes = {name: [] for name in player_names}
+    # Pärchen nur bis MAX_PLAYERS (größere Runden werden ohne Pärchen-Rollups archiviert)
+    teams = TeamStats(player_names) if len(player_names) <= MAX_PLAYERS else None
+    solo_count = bock_count = normal_points = bock_points = re_wins = kontra_wins = 0
+    
+    for round_data in rounds:
+        points = round_data['points']
+        is_bock = round_data.get('is_bock', False)
+        is_solo = round_data.get('is_solo', False)
+        if is_bock:
+            bock_count += 1
+            bock_points += points
+        else:
+            normal_points += points
+        solo_count += bool(is_solo)
+        winning_team = round_data.get('winning_team', 'Re')
+        re_wins += winning_team == 'Re'
+        kontra_wins += winning_team == 'Kontra'
+        
+        sitting_out = round_data.get('sitting_out')
+        scores = round_data.get('scores', {})
+        winners = [name for name in player_names if name != sitting_out and name in round_data['winners']]
+        losers = [name for name in player_names if name != sitting_out and name not in winners]
+        
+        for name in winners + losers:
+            won = name in winners
+            player = counters[name]
+            player[0] += scores.get(name, 0)
+            player[1] += won
+            player[2] += 1
+            if is_bock:
+                player[5] += 1
+                player[6] += scores.get(name, 0)
+            outcomes[name].append(won)
+        
+        solo_player = round_data.get('solo_player')
+        if is_solo and solo_player in counters:
+            counters[solo_player][3] += 1
+            counters[solo_player][4] += solo_player in winners
+        if teams is not None:
+            teams.apply_round(round_data)
+    
+    pairs = {}
+    if teams is not None:
+        games, _, team_points = teams.together()
+        for first, second in combinations(range(len(player_names)), 2):
+            mask = (1 << first) | (1 << second)
+            if games[mask]:
+                pairs[tuple(sorted((player_names[first], player_names[second])))] = (int(team_points[mask]), int(games[mask]))
+    
+    return SessionRollup(
+        rounds=len(rounds),
+        solo_count=solo_count,
+        bock_count=bock_count,
+        normal_points=normal_points,
+        bock_points=bock_points,
+        re_wins=re_wins,
+        kontra_wins=kontra_wins,
+        players={name: PlayerRollup(name, *values) for name, values in counters.items()},
+        streaks={name: streak_bounds(results) for name, results in outcomes.items()},
+        pairs=pairs
+    )
+
+
+def streak_bounds(outcomes: List[bool]) -> StreakBounds:
+    """Erste, letzte und längste Strähnen einer Ergebnisfolge (ohne Aussetzer)"""
+    if not outcomes:
+        return StreakBounds()
+    
+    runs = []
+    for won in outcomes:
+        if runs and runs[-1][0] == won:
+            runs[-1][1] += 1
+        else:
+            runs.append([won, 1])
+    return StreakBounds(
+        first_outcome=runs[0][0],
+        first_length=runs[0][1],
+        last_outcome=runs[-1][0],
+        last_length=runs[-1][1],
+        max_win=max((length for won, length in runs if won), default=0),
+        max_loss=max((length for won, length in runs if not won), default=0),
+        games=len(outcomes)
+    )
+
+
+def chain_streaks(bounds: Iterable[StreakBounds]) -> Tuple[int, int, Tuple[Optional[bool], int]]:
+    """
+    Verkettet die Strähnen aufeinanderfolgender Abende eines Spielers (chronologisch sortiert)
+    
+    Returns:
+        (längste Siegesserie, längste Pechsträhne, aktuelle Strähne als (Ergebnis, Länge))
+    """
+    longest = {True: 0, False: 0}
+    tail: Tuple[Optional[bool], int] = (None, 0)
+    for streak in bounds:
+        if streak.first_outcome is None:
+            continue
+        longest[True] = max(longest[True], streak.max_win)
+        longest[False] = max(longest[False], streak.max_loss)
+        
+        if tail[0] == streak.first_outcome:
+            # Strähne läuft über die Abendgrenze weiter
+            joined = tail[1] + streak.first_length
+            longest[tail[0]] = max(longest[tail[0]], joined)
+            if streak.first_length == streak.games:
+                # Der ganze Abend war eine einzige Strähne
+                tail = (tail[0], joined)
+                continue
+        tail = (streak.last_outcome, streak.last_length)
+    return longest[True], longest[False], tail
+
+
+def top_k(totals: Iterable[PlayerRollup], metric: str = 'points', k: int = 10,
+          min_games: int = 1) -> List[PlayerRollup]:
+    """Die k Besten nach metric (siehe LEADERBOARD_METRICS), ohne die ganze Liste zu sortieren"""
+    _, key = LEADERBOARD_METRICS[metric]
+    return heapq.nlargest(k, (row for row in totals if row.games >= min_games), key=key)
@@ -0,0 +1,209 @@
+"""
+Kompakte Runden-Datensätze für den Session State
+Eine Runde als Dictionary speichert ID und Zeitstempel als Text sowie alle Spielernamen erneut
+(Gewinner-Liste, Punkte-Dictionary) - pro Runde deutlich über 1 KB. Round hält dieselben Daten mit
+__slots__: Spieler als Index bzw. Bitmaske, Punkte als Array in Sitzreihenfolge, ID und Zeitstempel
+als Ganzzahlen. Nach außen verhält sich eine Round wie das bisherige (nur lesbare) Dictionary;
+Export, Cloud-Sync und Import arbeiten weiterhin mit Dictionaries (to_dict / compact_rounds).
+"""
+import sys
+import uuid
+from array import array
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
+from src.game_data_codec import ROUND_FIELDS, OPTIONAL_ROUND_FIELDS
+
+# Zeitstempel sind lokale Zeit ohne Zeitzone (datetime.now().isoformat()): Mikrosekunden seit 1970-01-01 derselben Uhr
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class Round(Mapping):
+    """
+    Eine Runde, lesbar wie das Dictionary aus _build_round()
+    
+    Unveränderlich: Neu-Nummerieren (renumbered) und Bearbeiten erzeugen einen neuen Datensatz,
+    daher dürfen Schnappschüsse (Export, Cloud-Sync) die Datensätze einer flachen Listenkopie teilen.
+    Runden, die sich nicht verlustfrei abbilden lassen, bleiben Dictionaries (siehe compact_round).
+    """
+    __slots__ = ('names', 'uid', 'number', 'ts', 'is_solo', 'winner_mask', 'points', 'solo_index',
+                 'sitting_index', 'team', 'is_bock', 'deltas', 'updated')
+    
+    @classmethod
+    def from_dict(cls, round_data: Dict, names: Tuple[str, ...]) -> Optional['Round']:
+        """Kompakte Form einer Runde, None wenn sie sich nicht verlustfrei abbilden lässt"""
+        optional = [field for field in OPTIONAL_ROUND_FIELDS if field in round_data]
+        if len(round_data) != len(ROUND_FIELDS) + len(optional) or any(field not in round_data for field in ROUND_FIELDS):
+            return None
+        
+        index = _name_index(names)
+        scores = round_data['scores']
+        winners = round_data['winners']
+        if not isinstance(scores, dict) or list(scores) != list(names) or not isinstance(winners, list):
+            return None
+        # Gewinner werden in Sitzreihenfolge eingetragen; nur dann ist die Bitmaske verlustfrei
+        if any(name not in index for name in winners) or [index[name] for name in winners] != sorted({index[name] for name in winners}):
+            return None
+        if any(not isinstance(value, int) or isinstance(value, bool) for value in scores.values()):
+            return None
+        for key in ('is_solo', 'is_bock'):
+            if not isinstance(round_data[key], bool):
+                return None
+        for key in ('solo_player', 'sitting_out'):
+            if round_data[key] is not None and round_data[key] not in index:
+                return None
+        # ID und Zeitstempel werden als Zahl gespeichert, Text bleibt nur bei fremden Formaten
+        if any(not isinstance(round_data[key], str) for key in ['id', 'timestamp'] + optional):
+            return None
+        
+        record = cls()
+        try:
+            record.deltas = array('i', scores.values())
+        except (TypeError, OverflowError):
+            return None
+        record.names = _shared_names(names)
+        record.uid = _pack_id(round_data['id'])
+        record.number = round_data['round_number']
+        record.ts = _pack_timestamp(round_data['timestamp'])
+        record.is_solo = round_data['is_solo']
+        record.winner_mask = sum(1 << index[name] for name in winners)
+        record.points = round_data['points']
+        record.solo_index = -1 if round_data['solo_player'] is None else index[round_data['solo_player']]
+        record.sitting_index = -1 if round_data['sitting_out'] is None else index[round_data['sitting_out']]
+        # 'Re'/'Kontra' aus JSON sind pro Runde eigene Strings; intern teilen sich alle Runden einen
+        record.team = sys.intern(round_data['winning_team']) if isinstance(round_data['winning_team'], str) else round_data['winning_team']
+        record.is_bock = round_data['is_bock']
+        record.updated = None if 'updated_at' not in round_data else _pack_timestamp(round_data['updated_at'])
+        return record
+    
+    def renumbered(self, number: int) -> 'Round':
+        """Kopie mit anderer Rundennummer (der Datensatz selbst bleibt unverändert)"""
+        record = Round()
+        for slot in Round.__slots__:
+            setattr(record, slot, getattr(self, slot))
+        record.number = number
+        return record
+    
+    def to_dict(self) -> Dict:
+        """Die Runde als Dictionary im Export-Format (Felder in ROUND_FIELDS-Reihenfolge)"""
+        round_data = {field: self[field] for field in ROUND_FIELDS}
+        if self.updated is not None:
+            round_data['updated_at'] = _unpack_timestamp(self.updated)
+        return round_data
+    
+    # ===== Dictionary-Schnittstelle =====
+    
+    def __getitem__(self, key: str):
+        try:
+            getter = _FIELD_GETTERS[key]
+        except KeyError:
+            raise KeyError(key) from None
+        value = getter(self)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+    
+    def __iter__(self):
+        yield from ROUND_FIELDS
+        if self.updated is not None:
+            yield 'updated_at'
+    
+    def __len__(self) -> int:
+        return len(ROUND_FIELDS) + (self.updated is not None)
+    
+    def __repr__(self) -> str:
+        return f"Round({self.to_dict()!r})"
+    
+    # ===== Direktzugriff ohne Umweg über Namen =====
+    
+    @property
+    def winners(self) -> List[str]:
+        return [name for idx, name in enumerate(self.names) if self.winner_mask >> idx & 1]
+    
+    @property
+    def active_mask(self) -> int:
+        """Bitmaske der Mitspieler (alle außer dem Aussetzenden)"""
+        full = (1 << len(self.names)) - 1
+        return full if self.sitting_index < 0 else full & ~(1 << self.sitting_index)
+
+
+_MISSING = object()
+
+_FIELD_GETTERS = {
+    'id': lambda record: _unpack_id(record.uid),
+    'round_number': lambda record: record.number,
+    'timestamp': lambda record: _unpack_timestamp(record.ts),
+    'is_solo': lambda record: record.is_solo,
+    'winners': lambda record: record.winners,
+    'points': lambda record: record.points,
+    'solo_player': lambda record: None if record.solo_index < 0 else record.names[record.solo_index],
+    'sitting_out': lambda record: None if record.sitting_index < 0 else record.names[record.sitting_index],
+    'winning_team': lambda record: record.team,
+    'is_bock': lambda record: record.is_bock,
+    'scores': lambda record: dict(zip(record.names, record.deltas)),
+    'updated_at': lambda record: _MISSING if record.updated is None else _unpack_timestamp(record.updated),
+}
+
+
+def compact_round(round_data: Union[Dict, Round], names: Tuple[str, ...]) -> Union[Dict, Round]:
+    """Round für round_data, oder round_data unverändert wenn keine verlustfreie Abbildung möglich ist"""
+    names = tuple(names)
+    if isinstance(round_data, Round):
+        if round_data.names == names:
+            return round_data
+        # Andere Spielerliste (z.B. nach dem Zusammenführen): neu kodieren oder als Dictionary behalten
+        round_data = round_data.to_dict()
+    record = Round.from_dict(round_data, names)
+    return round_data if record is None else record
+
+
+def compact_rounds(rounds: List[Dict], names: Tuple[str, ...]) -> List[Union[Dict, Round]]:
+    """Runden beim Laden (Import, Cloud) in die kompakte Form bringen"""
+    names = tuple(names)
+    return [compact_round(round_data, names) for round_data in rounds]
+
+
+def round_dicts(rounds: List[Union[Dict, Round]]) -> List[Dict]:
+    """Runden als Dictionaries für Export, JSON und Cloud-Sync"""
+    return [round_data.to_dict() if isinstance(round_data, Round) else round_data for round_data in rounds]
+
+
+@lru_cache(maxsize=1024)
+def _shared_names(names: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Ein gemeinsames Namens-Tupel für alle Runden derselben Spielerliste"""
+    return names
+
+
+@lru_cache(maxsize=1024)
+def _name_index(names: Tuple[str, ...]) -> Dict[str, int]:
+    return {name: idx for idx, name in enumerate(names)}
+
+
+def _pack_id(round_id: str) -> Union[int, str]:
+    """UUID-Text als 128-Bit-Zahl; andere IDs bleiben Text"""
+    try:
+        parsed = uuid.UUID(round_id)
+    except ValueError:
+        return round_id
+    return parsed.int if str(parsed) == round_id else round_id
+
+
+def _unpack_id(packed: Union[int, str]) -> str:
+    return str(uuid.UUID(int=packed)) if isinstance(packed, int) else packed
+
+
+def _pack_timestamp(timestamp: str) -> Union[int, str]:
+    """ISO-Zeitstempel ohne Zeitzone als Mikrosekunden seit 1970; andere Zeitangaben bleiben Text"""
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except ValueError:
+        return timestamp
+    if parsed.tzinfo is None and parsed.isoformat() == timestamp:
+        return (parsed - _EPOCH) // _MICROSECOND
+    return timestamp
+
+
+def _unpack_timestamp(packed: Union[int, str]) -> str:
+    return (_EPOCH + packed * _MICROSECOND).isoformat() if isinstance(packed, int) else packed
@@ -0,0 +1,142 @@
+"""
+Spaltenbasierter Runden-Speicher (Spieler × Runden Matrix) mit NumPy
+Hält dieselben Daten wie st.session_state.rounds als Arrays für vektorisierte Auswertungen
+"""
+import numpy as np
+from typing import Dict, List
+from src.round_record import Round
+
+# Kodierung für winning_team
+TEAM_RE = 0
+TEAM_KONTRA = 1
+TEAM_UNKNOWN = -1
+
+_INITIAL_CAPACITY = 64
+
+
+class RoundStore:
+    """
+    Spaltenspeicher für alle Runden einer Session
+    
+    Pro Runde (Zeile) und Spieler (Spalte):
+        deltas:  Punkteänderung (int32)
+        active:  Spieler hat mitgespielt (nicht ausgesetzt)
+        winners: Spieler ist Gewinner
+    Pro Runde:
+        points, is_solo, is_bock, winning_team, solo_player (Spielerindex, -1 = keiner)
+    """
+    
+    def __init__(self, player_names: List[str], capacity: int = _INITIAL_CAPACITY):
+        self.players = tuple(player_names)
+        self.player_index = {name: idx for idx, name in enumerate(self.players)}
+        self._bits = 1 << np.arange(len(self.players), dtype=np.int64)
+        self.key = None
+        self.size = 0
+        self._allocate(max(capacity, 1))
+    
+    def _allocate(self, capacity: int):
+        num_players = len(self.players)
+        self._deltas = np.zeros((capacity, num_players), dtype=np.int32)
+        self._active = np.zeros((capacity, num_players), dtype=bool)
+        self._winners = np.zeros((capacity, num_players), dtype=bool)
+        self._points = np.zeros(capacity, dtype=np.int32)
+        self._is_solo = np.zeros(capacity, dtype=bool)
+        self._is_bock = np.zeros(capacity, dtype=bool)
+        self._winning_team = np.full(capacity, TEAM_UNKNOWN, dtype=np.int8)
+        self._solo_player = np.full(capacity, -1, dtype=np.int8)
+    
+    def _grow(self):
+        """Verdoppelt die Kapazität (amortisiert O(1) pro append)"""
+        old = (self._deltas, self._active, self._winners, self._points,
+               self._is_solo, self._is_bock, self._winning_team, self._solo_player)
+        self._allocate(len(self._points) * 2)
+        new = (self._deltas, self._active, self._winners, self._points,
+               self._is_solo, self._is_bock, self._winning_team, self._solo_player)
+        for old_array, new_array in zip(old, new):
+            new_array[:self.size] = old_array[:self.size]
+    
+    @classmethod
+    def from_rounds(cls, player_names: List[str], rounds: List[Dict]) -> 'RoundStore':
+        """Baut den Speicher aus der Liste der Runden-Dictionaries auf"""
+        store = cls(player_names, capacity=max(len(rounds), _INITIAL_CAPACITY))
+        for round_data in rounds:
+            store.append(round_data)
+        return store
+    
+    def append(self, round_data: Dict):
+        """Hängt eine Runde an"""
+        if self.size == len(self._points):
+            self._grow()
+        
+        row = self.size
+        if isinstance(round_data, Round) and round_data.names == self.players:
+            # Kompakte Runde mit derselben Spielerliste: Spalten direkt aus Array und Bitmasken
+            active_mask = round_data.active_mask
+            self._deltas[row] = round_data.deltas
+            self._active[row] = self._bits & active_mask != 0
+            self._winners[row] = self._bits & (round_data.winner_mask & active_mask) != 0
+        else:
+            sitting_out = round_data.get('sitting_out')
+            winners = round_data['winners']
+            scores = round_data['scores']
+            
+            for name, idx in self.player_index.items():
+                self._deltas[row, idx] = scores.get(name, 0)
+                self._active[row, idx] = name != sitting_out
+                self._winners[row, idx] = name in winners and name != sitting_out
+        
+        self._points[row] = round_data['points']
+        self._is_solo[row] = round_data['is_solo']
+        self._is_bock[row] = round_data.get('is_bock', False)
+        
+        winning_team = round_data.get('winning_team', 'Re')
+        self._winning_team[row] = TEAM_RE if winning_team == 'Re' else TEAM_KONTRA if winning_team == 'Kontra' else TEAM_UNKNOWN
+        
+        solo_player = round_data.get('solo_player') if round_data['is_solo'] else None
+        self._solo_player[row] = self.player_index.get(solo_player, -1)
+        
+        self.size += 1
+    
+    # Views auf die belegten Zeilen
+    @property
+    def deltas(self) -> np.ndarray:
+        return self._deltas[:self.size]
+    
+    @property
+    def active(self) -> np.ndarray:
+        return self._active[:self.size]
+    
+    @property
+    def winners(self) -> np.ndarray:
+        return self._winners[:self.size]
+    
+    @property
+    def points(self) -> np.ndarray:
+        return self._points[:self.size]
+    
+    @property
+    def is_solo(self) -> np.ndarray:
+        return self._is_solo[:self.size]
+    
+    @property
+    def is_bock(self) -> np.ndarray:
+        return self._is_bock[:self.size]
+    
+    @property
+    def winning_team(self) -> np.ndarray:
+        return self._winning_team[:self.size]
+    
+    @property
+    def solo_player(self) -> np.ndarray:
+        return self._solo_player[:self.size]
+    
+    def totals(self) -> Dict[str, int]:
+        """Gesamtpunkte pro Spieler"""
+        sums = self.deltas.sum(axis=0, dtype=np.int64)
+        return {name: int(sums[idx]) for idx, name in enumerate(self.players)}
+    
+    def cumulative(self) -> np.ndarray:
+        """Kumulierte Punkte pro Spieler inkl. Startzeile 0 (Form: (size + 1) × Spieler)"""
+        result = np.zeros((self.size + 1, len(self.players)), dtype=np.int64)
+        np.cumsum(self.deltas, axis=0, out=result[1:])
+        return result
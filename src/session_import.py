@@ -0,0 +1,368 @@
+"""
+Import von Sessions aus einzelnen Exporten und Sammelarchiven
+Das JSON wird stückweise gelesen und die Runden werden stapelweise geprüft. Es wird immer nur eine
+Session auf einmal gehalten, so bleibt auch ein ganzes Jahr exportierter Spielabende im Speicher klein.
+
+Unterstützte Formate:
+- Einzelne Session (Export aus der Sidebar)
+- JSON Lines bzw. aneinandergereihte Sessions oder ein JSON-Array von Sessions
+- Zip-Archiv mit beliebig vielen .json/.jsonl-Dateien
+"""
+import io
+import json
+import re
+import uuid
+import zipfile
+from typing import BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional, Set
+from src.team_stats import MAX_PLAYERS
+
+# Lesegröße pro Schritt (Zeichen); der Puffer hält höchstens einen Wert plus einen Block
+CHUNK_SIZE = 64 * 1024
+
+# Runden werden in Stapeln dieser Größe geprüft (danach wird der Fortschritt gemeldet)
+ROUND_BATCH_SIZE = 500
+
+SESSION_FILE_SUFFIXES = ('.json', '.jsonl', '.ndjson')
+
+_WHITESPACE = re.compile(r'\s*')
+
+# Ein Fehler oder eine Zahl so nah am Pufferende kann ein abgeschnittenes Token sein (längstes: -Infinity, \uXXXX-Escape)
+_TOKEN_TAIL = 10
+
+
+class SessionImportError(ValueError):
+    """Datei oder Session ist ungültig (die Meldung ist für die UI gedacht)"""
+
+
+class ImportedSession(NamedTuple):
+    """Ergebnis für eine Session: game_data im Exportformat oder die Fehlermeldung"""
+    source: str
+    game_data: Optional[Dict]
+    error: Optional[str]
+
+
+def iter_import_sessions(file: BinaryIO, name: str,
+                         progress: Optional[Callable[[int, int], None]] = None) -> Iterator[ImportedSession]:
+    """
+    Liest alle Sessions einer Datei nacheinander
+    
+    Ungültige Sessions werden mit Fehlermeldung geliefert, die übrigen weiter gelesen. Bei einem
+    JSON-Syntaxfehler endet die betroffene Datei (bzw. der Zip-Eintrag) mit einem Fehlereintrag.
+    
+    Args:
+        file: Binärer, seekbarer Dateistrom (z.B. von st.file_uploader)
+        name: Dateiname (für Meldungen)
+        progress: Wird mit (gelesene Bytes, Gesamtbytes) aufgerufen
+    """
+    report = progress or (lambda done, total: None)
+    file.seek(0)
+    is_zip = file.read(4) == b'PK\x03\x04'
+    file.seek(0)
+    
+    if not is_zip:
+        file.seek(0, io.SEEK_END)
+        total = file.tell()
+        file.seek(0)
+        counter = _CountingReader(file)
+        yield from _iter_text_sessions(counter, name, lambda: report(counter.count, total))
+        report(total, total)
+        return
+    
+    try:
+        archive = zipfile.ZipFile(file)
+    except zipfile.BadZipFile as e:
+        yield ImportedSession(name, None, f"Zip-Archiv nicht lesbar: {e}")
+        return
+    
+    with archive:
+        members = [
+            info for info in archive.infolist()
+            if not info.is_dir() and info.filename.lower().endswith(SESSION_FILE_SUFFIXES)
+            and not info.filename.startswith('__MACOSX/')
+        ]
+        total = sum(info.file_size for info in members)
+        done = 0
+        for info in members:
+            with archive.open(info) as member:
+                counter = _CountingReader(member)
+                yield from _iter_text_sessions(counter, info.filename, lambda: report(done + counter.count, total))
+            done += info.file_size
+            report(done, total)
+
+
+def _iter_text_sessions(counter: '_CountingReader', source: str, report: Callable[[], None]) -> Iterator[ImportedSession]:
+    """Sessions eines Textstroms: ein Objekt, mehrere Objekte hintereinander (JSON Lines) oder ein Array"""
+    stream = _JsonStream(io.TextIOWrapper(io.BufferedReader(counter), encoding='utf-8-sig'))
+    index = 0
+    try:
+        in_array = stream.peek() == '['
+        if in_array:
+            stream.advance()
+        while True:
+            char = stream.peek()
+            if in_array and char == ']':
+                stream.advance()
+                if stream.peek():
+                    raise SessionImportError("Unerwartete Daten nach dem Ende des Arrays")
+                return
+            if not char:
+                if in_array:
+                    raise SessionImportError("Unerwartetes Dateiende (']' fehlt)")
+                return
+            
+            index += 1
+            label = source if index == 1 else f"{source} #{index}"
+            yield _read_session(stream, label, report)
+            report()
+            
+            if in_array and stream.peek() == ',':
+                stream.advance()
+    except SessionImportError as e:
+        yield ImportedSession(source if index <= 1 else f"{source} #{index}", None, str(e))
+    except UnicodeDecodeError:
+        yield ImportedSession(source, None, "Datei ist nicht UTF-8-kodiert")
+
+
+def _read_session(stream: '_JsonStream', source: str, report: Callable[[], None]) -> ImportedSession:
+    """Liest ein Session-Objekt; die Runden werden einzeln gelesen statt als ein großes Array"""
+    builder = _SessionBuilder()
+    stream.expect('{')
+    if stream.peek() == '}':
+        stream.advance()
+        return builder.finish(source)
+    
+    while True:
+        key = stream.value()
+        if not isinstance(key, str):
+            raise SessionImportError("Ungültiger Schlüssel im Session-Objekt")
+        stream.expect(':')
+        
+        if key == 'rounds':
+            stream.expect('[')
+            if stream.peek() == ']':
+                stream.advance()
+            else:
+                while True:
+                    if builder.add_round(stream.value()):
+                        report()
+                    if stream.peek() == ',':
+                        stream.advance()
+                        continue
+                    stream.expect(']')
+                    break
+        else:
+            builder.set_field(key, stream.value())
+        
+        if stream.peek() == ',':
+            stream.advance()
+            continue
+        stream.expect('}')
+        return builder.finish(source)
+
+
+class _SessionBuilder:
+    """
+    Sammelt eine Session und prüft ihre Runden stapelweise, sobald die Spieler bekannt sind
+    Nach dem ersten Fehler werden die übrigen Runden nur noch überlesen
+    """
+    
+    def __init__(self):
+        self.fields: Dict = {}
+        self.rounds: List[Dict] = []
+        self.error: Optional[str] = None
+        self._pending: List[Dict] = []
+        self._players: Optional[Set[str]] = None
+        self._round_ids: Set[str] = set()
+    
+    def set_field(self, key: str, value):
+        self.fields[key] = value
+        if key == 'players' and self.error is None:
+            try:
+                self._players = _player_names(value)
+            except SessionImportError as e:
+                self._fail(str(e))
+            self._flush()
+    
+    def add_round(self, round_data) -> bool:
+        """Nimmt eine Runde auf; True wenn dabei ein Stapel geprüft wurde"""
+        if self.error is not None:
+            return False
+        self._pending.append(round_data)
+        if len(self._pending) >= ROUND_BATCH_SIZE and self._players is not None:
+            self._flush()
+            return True
+        return False
+    
+    def finish(self, source: str) -> ImportedSession:
+        if self._players is None and self.error is None:
+            self._fail("Keine Spielerliste gefunden")
+        self._flush()
+        if self.error is not None:
+            return ImportedSession(source, None, self.error)
+        return ImportedSession(source, {**self.fields, 'rounds': self.rounds}, None)
+    
+    def _flush(self):
+        if self.error is not None or self._players is None or not self._pending:
+            return
+        try:
+            _validate_rounds(self._pending, self._players, len(self.rounds), self._round_ids)
+        except SessionImportError as e:
+            self._fail(str(e))
+            return
+        self.rounds.extend(self._pending)
+        self._pending = []
+    
+    def _fail(self, message: str):
+        self.error = message
+        self.rounds = []
+        self._pending = []
+
+
+def _player_names(players) -> Set[str]:
+    """Prüft die Spielerliste und liefert die Namen"""
+    if not isinstance(players, list) or not players:
+        raise SessionImportError("Spielerliste fehlt oder ist leer")
+    if len(players) > MAX_PLAYERS:
+        raise SessionImportError(f"{len(players)} Spieler, erlaubt sind höchstens {MAX_PLAYERS}")
+    names = set()
+    for player in players:
+        if not isinstance(player, dict) or not isinstance(player.get('name'), str) or not player['name']:
+            raise SessionImportError("Spieler ohne Namen")
+        if player['name'] in names:
+            raise SessionImportError(f"Spieler '{player['name']}' ist doppelt")
+        names.add(player['name'])
+        if 'id' not in player:
+            player['id'] = str(uuid.uuid4())
+    return names
+
+
+def _validate_rounds(batch: List[Dict], players: Set[str], offset: int, round_ids: Set[str]):
+    """
+    Prüft einen Stapel Runden (offset = Anzahl bereits geprüfter Runden)
+    Fehlende IDs werden ergänzt und Rundennummern lückenlos neu vergeben, alles andere ist ein Fehler
+    """
+    for position, round_data in enumerate(batch):
+        number = offset + position + 1
+        if not isinstance(round_data, dict):
+            raise SessionImportError(f"Runde {number}: kein Objekt")
+        
+        if 'id' not in round_data:
+            round_data['id'] = str(uuid.uuid4())
+        round_id = round_data['id']
+        if round_id in round_ids:
+            raise SessionImportError(f"Runde {number}: ID {round_id} ist doppelt")
+        round_ids.add(round_id)
+        round_data['round_number'] = number
+        
+        winners = round_data.get('winners')
+        scores = round_data.get('scores')
+        points = round_data.get('points')
+        if not isinstance(winners, list) or not isinstance(scores, dict):
+            raise SessionImportError(f"Runde {number}: Gewinner oder Punkte fehlen")
+        if not isinstance(points, int) or isinstance(points, bool):
+            raise SessionImportError(f"Runde {number}: ungültige Punktzahl")
+        
+        named = set(winners) | set(scores)
+        for key in ('solo_player', 'sitting_out'):
+            if round_data.get(key) is not None:
+                named.add(round_data[key])
+        unknown = named - players
+        if unknown:
+            raise SessionImportError(f"Runde {number}: unbekannte Spieler {', '.join(sorted(map(str, unknown)))}")
+        
+        if any(not isinstance(value, int) or isinstance(value, bool) for value in scores.values()):
+            raise SessionImportError(f"Runde {number}: Punkte sind keine ganzen Zahlen")
+        
+        # Punktesumme: Solo ist ein Nullsummenspiel, im Normalspiel zählt jeder Gewinner +points, jeder Verlierer -points
+        sitting_out = round_data.get('sitting_out')
+        if sitting_out is not None and scores.get(sitting_out, 0) != 0:
+            raise SessionImportError(f"Runde {number}: Aussetzender {sitting_out} hat Punkte")
+        if round_data.get('is_solo'):
+            expected = 0
+        else:
+            active = [name for name in scores if name != sitting_out]
+            winning = sum(1 for name in active if name in winners)
+            expected = points * (winning - (len(active) - winning))
+        if sum(scores.values()) != expected:
+            raise SessionImportError(f"Runde {number}: Punktesumme {sum(scores.values())} statt {expected}")
+
+
+class _CountingReader(io.RawIOBase):
+    """Liest aus einem Binärstrom und zählt die gelesenen Bytes (für die Fortschrittsanzeige)"""
+    
+    def __init__(self, raw: BinaryIO):
+        self._raw = raw
+        self.count = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        data = self._raw.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self.count += size
+        return size
+
+
+class _JsonStream:
+    """
+    Liest JSON-Werte nacheinander aus einem Textstrom
+    raw_decode auf einem gleitenden Puffer; ist ein Wert am Pufferende abgeschnitten, wird nachgelesen
+    """
+    
+    def __init__(self, text: io.TextIOBase):
+        self._text = text
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+    
+    def _fill(self) -> bool:
+        """Hängt den nächsten Block an (verbrauchte Zeichen fallen weg); False am Dateiende"""
+        if self._eof:
+            return False
+        chunk = self._text.read(CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+    
+    def peek(self) -> str:
+        """Nächstes Zeichen nach Leerraum ('' am Dateiende)"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or not self._fill():
+                return self._buffer[self._pos:self._pos + 1]
+    
+    def advance(self):
+        self._pos += 1
+    
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise SessionImportError(f"Ungültiges JSON: '{char}' erwartet, '{found or 'Dateiende'}' gefunden")
+        self._pos += 1
+    
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                # Nur nachlesen, wenn der Wert am Pufferende abgeschnitten ist; ungültiges JSON mitten
+                # im Puffer würde sonst den Rest der Datei in den Puffer ziehen
+                if self._cut_off(e) and self._fill():
+                    continue
+                raise SessionImportError(f"Ungültiges JSON: {e.msg}")
+            # Nur Zahlen können abgeschnitten und trotzdem gültig sein ("-1." vor "5", "12" vor "3")
+            if isinstance(value, (int, float)) and end >= len(self._buffer) - _TOKEN_TAIL and self._fill():
+                continue
+            self._pos = end
+            return value
+    
+    def _cut_off(self, error: json.JSONDecodeError) -> bool:
+        """Fehler nur wegen des Pufferendes? (offene Zeichenkette oder Fehlerstelle in den letzten Zeichen)"""
+        return error.msg.startswith("Unterminated string") or error.pos >= len(self._buffer) - _TOKEN_TAIL
@@ -17,6 +17,12 @@ def init_session_state():
     if 'rounds' not in st.session_state:
         st.session_state.rounds = []
     
+    if 'rounds_version' not in st.session_state:
+        st.session_state.rounds_version = 0  # Wird bei jeder Änderung der Runden erhöht
+    
+    if 'deleted_round_ids' not in st.session_state:
+        st.session_state.deleted_round_ids = []  # IDs gelöschter Runden (für das Zusammenführen im Cloud-Sync)
+    
     if 'session_started' not in st.session_state:
         st.session_state.session_started = False
     
@@ -26,6 +32,9 @@ def init_session_state():
     if 'last_imported_file' not in st.session_state:
         st.session_state.last_imported_file = None
     
+    if 'active_view' not in st.session_state:
+        st.session_state.active_view = 'new_round'  # Gewählte Ansicht im Spielmodus (nur diese wird gerendert)
+    
     if 'sitting_out_index' not in st.session_state:
         st.session_state.sitting_out_index = 0  # Startet bei erstem Spieler
     
@@ -0,0 +1,420 @@
+"""
+Inkrementelle Statistik-Aggregate für Doppelkopf Zettel
+Jede Runde kann einzeln angewendet (apply) oder zurückgenommen (unapply) werden
+"""
+import os
+import logging
+import threading
+import numpy as np
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from src.round_store import RoundStore, TEAM_RE, TEAM_KONTRA
+from src.team_stats import MAX_PLAYERS, TeamStats, TeamResult
+
+logger = logging.getLogger(__name__)
+
+# Debug-Modus: inkrementellen Stand im Hintergrund gegen Vollberechnung prüfen
+DEBUG_STATS = os.environ.get('DOPPELKOPF_DEBUG', '').lower() in ('1', 'true', 'yes')
+
+
+def _outcome(round_data: Dict, player_name: str) -> Optional[bool]:
+    """Ergebnis eines Spielers in einer Runde: True = gewonnen, False = verloren, None = ausgesetzt"""
+    if player_name == round_data.get('sitting_out'):
+        return None
+    return player_name in round_data['winners']
+
+
+def _run_length(rounds: List[Dict], player_name: str, start: int, step: int, outcome: bool) -> int:
+    """Zählt ab start in Richtung step aufeinanderfolgende Runden mit gleichem Ergebnis (Aussetzen wird übersprungen)"""
+    length = 0
+    position = start
+    while 0 <= position < len(rounds):
+        result = _outcome(rounds[position], player_name)
+        if result is not None:
+            if result != outcome:
+                break
+            length += 1
+        position += step
+    return length
+
+
+class StatsSnapshot:
+    """
+    Statistik-Aggregate eines Spielstands
+    
+    Hält nur Zähler und Summen; die Auswertungen (win_rates, solo_stats, ...) werden daraus
+    bei Zugriff in O(Spieler) bzw. O(Pärchen) abgeleitet.
+    Strähnen werden als Multimenge der Lauflängen pro Spieler gespeichert, damit auch das
+    Löschen einer Runde mitten in einer Strähne ohne Vollberechnung möglich ist.
+    """
+    
+    def __init__(self, player_names: List[str]):
+        self.key = None
+        self.players = tuple(player_names)
+        
+        self.total_rounds = 0
+        self.solo_count = 0
+        self.bock_count = 0
+        self.normal_points = 0
+        self.bock_points = 0
+        self.re_wins = 0
+        self.kontra_wins = 0
+        
+        self.wins = {name: 0 for name in self.players}
+        self.games = {name: 0 for name in self.players}
+        self.solo_counts = {name: 0 for name in self.players}
+        self.solo_wins = {name: 0 for name in self.players}
+        
+        # Seiten jeder Runde als Bitmasken (Pärchen, Dreier-Teams, gegeneinander); über MAX_PLAYERS
+        # (z.B. ältere Cloud-Stände) gibt es keine Team-Statistiken statt riesiger Tabellen
+        self.teams = TeamStats(self.players) if len(self.players) <= MAX_PLAYERS else None
+        
+        # Lauflängen-Multimengen und aktuelle Strähne am Ende (Ergebnis, Länge)
+        self.win_runs = {name: Counter() for name in self.players}
+        self.loss_runs = {name: Counter() for name in self.players}
+        self.tails = {name: (None, 0) for name in self.players}
+        self._tails_dirty = False
+    
+    @classmethod
+    def from_store(cls, store: RoundStore) -> 'StatsSnapshot':
+        """Vollberechnung aller Aggregate, vektorisiert über den Spaltenspeicher"""
+        snapshot = cls(store.players)
+        snapshot.key = store.key
+        
+        points = store.points.astype(np.int64)
+        snapshot.total_rounds = store.size
+        snapshot.solo_count = int(store.is_solo.sum())
+        snapshot.bock_count = int(store.is_bock.sum())
+        snapshot.normal_points = int(points[~store.is_bock].sum())
+        snapshot.bock_points = int(points[store.is_bock].sum())
+        snapshot.re_wins = int((store.winning_team == TEAM_RE).sum())
+        snapshot.kontra_wins = int((store.winning_team == TEAM_KONTRA).sum())
+        
+        win_counts = store.winners.sum(axis=0)
+        active_counts = store.active.sum(axis=0)
+        
+        solo_rows = np.flatnonzero(store.solo_player >= 0)
+        solo_players = store.solo_player[solo_rows].astype(np.intp)
+        solo_won = store.winners[solo_rows, solo_players]
+        solo_counts = np.bincount(solo_players, minlength=len(store.players))
+        solo_wins = np.bincount(solo_players[solo_won], minlength=len(store.players))
+        
+        for idx, name in enumerate(store.players):
+            snapshot.wins[name] = int(win_counts[idx])
+            snapshot.games[name] = int(active_counts[idx])
+            snapshot.solo_counts[name] = int(solo_counts[idx])
+            snapshot.solo_wins[name] = int(solo_wins[idx])
+            
+            # Ergebnisfolge des Spielers ohne die Runden, in denen er aussetzt
+            outcomes = store.winners[store.active[:, idx], idx]
+            win_runs, loss_runs, tail = _run_lengths(outcomes)
+            snapshot.win_runs[name] = win_runs
+            snapshot.loss_runs[name] = loss_runs
+            snapshot.tails[name] = tail
+        
+        if snapshot.teams is not None:
+            snapshot.teams = TeamStats.from_store(store)
+        return snapshot
+    
+    # ===== Inkrementelle Updates =====
+    
+    def apply_round(self, rounds: List[Dict], position: int):
+        """
+        Nimmt die Runde rounds[position] in die Aggregate auf
+        rounds muss die Runde bereits enthalten; Anhängen am Ende kostet O(Spieler)
+        """
+        round_data = rounds[position]
+        self._apply_counters(round_data, 1)
+        
+        is_append = position == len(rounds) - 1
+        if is_append:
+            self.refresh_tails(rounds, end=position)
+        
+        for name in self.players:
+            outcome = _outcome(round_data, name)
+            if outcome is None:
+                continue
+            
+            if is_append:
+                self._append_outcome(name, outcome)
+            else:
+                self._insert_outcome(rounds, name, position, outcome)
+        
+        if not is_append:
+            self._tails_dirty = True
+    
+    def unapply_round(self, rounds: List[Dict], position: int):
+        """
+        Nimmt die Runde rounds[position] aus den Aggregaten heraus
+        Muss aufgerufen werden, solange die Runde noch in rounds steht;
+        Strähnen werden dabei nur lokal um die Position herum neu gezählt
+        """
+        round_data = rounds[position]
+        self._apply_counters(round_data, -1)
+        
+        for name in self.players:
+            outcome = _outcome(round_data, name)
+            if outcome is not None:
+                self._remove_outcome(rounds, name, position, outcome)
+        
+        self._tails_dirty = True
+    
+    def _apply_counters(self, round_data: Dict, sign: int):
+        """Zähler und Summen einer Runde addieren (sign=1) oder abziehen (sign=-1)"""
+        points = round_data['points']
+        self.total_rounds += sign
+        
+        if round_data.get('is_bock', False):
+            self.bock_count += sign
+            self.bock_points += sign * points
+        else:
+            self.normal_points += sign * points
+        
+        winning_team = round_data.get('winning_team', 'Re')
+        if winning_team == 'Re':
+            self.re_wins += sign
+        elif winning_team == 'Kontra':
+            self.kontra_wins += sign
+        
+        sitting_out = round_data.get('sitting_out')
+        active = [name for name in self.players if name != sitting_out]
+        winners = [name for name in active if name in round_data['winners']]
+        
+        for name in active:
+            self.games[name] += sign
+        for name in winners:
+            self.wins[name] += sign
+        
+        if round_data['is_solo']:
+            self.solo_count += sign
+            solo_player = round_data.get('solo_player')
+            if solo_player in self.solo_counts:
+                self.solo_counts[solo_player] += sign
+                if solo_player in winners:
+                    self.solo_wins[solo_player] += sign
+        
+        if self.teams is not None:
+            self.teams.apply_round(round_data, sign)
+    
+    def _runs(self, outcome: bool) -> Dict[str, Counter]:
+        return self.win_runs if outcome else self.loss_runs
+    
+    def _append_outcome(self, name: str, outcome: bool):
+        """Ergebnis am Ende anhängen: verlängert die aktuelle Strähne oder beginnt eine neue"""
+        runs = self._runs(outcome)[name]
+        tail_outcome, tail_length = self.tails[name]
+        
+        if tail_outcome == outcome:
+            _counter_remove(runs, tail_length)
+            runs[tail_length + 1] += 1
+            self.tails[name] = (outcome, tail_length + 1)
+        else:
+            runs[1] += 1
+            self.tails[name] = (outcome, 1)
+    
+    def _insert_outcome(self, rounds: List[Dict], name: str, position: int, outcome: bool):
+        """Ergebnis mitten in der Folge einfügen (rounds enthält die Runde bereits)"""
+        before = _run_length(rounds, name, position - 1, -1, outcome)
+        after = _run_length(rounds, name, position + 1, 1, outcome)
+        runs = self._runs(outcome)[name]
+        
+        if before + after > 0:
+            # Grenzt an eine Strähne gleichen Ergebnisses: diese wird um 1 länger
+            _counter_remove(runs, before + after)
+            runs[before + after + 1] += 1
+        else:
+            # Teilt ggf. eine Strähne des Gegenteils in zwei Hälften
+            other_runs = self._runs(not outcome)[name]
+            left = _run_length(rounds, name, position - 1, -1, not outcome)
+            right = _run_length(rounds, name, position + 1, 1, not outcome)
+            if left + right > 0:
+                _counter_remove(other_runs, left + right)
+                for length in (left, right):
+                    if length:
+                        other_runs[length] += 1
+            runs[1] += 1
+    
+    def _remove_outcome(self, rounds: List[Dict], name: str, position: int, outcome: bool):
+        """Ergebnis aus der Folge entfernen (rounds enthält die Runde noch)"""
+        before = _run_length(rounds, name, position - 1, -1, outcome)
+        after = _run_length(rounds, name, position + 1, 1, outcome)
+        runs = self._runs(outcome)[name]
+        
+        _counter_remove(runs, before + after + 1)
+        if before + after > 0:
+            runs[before + after] += 1
+        else:
+            # Strähne der Länge 1 verschwindet: Nachbar-Strähnen des Gegenteils verschmelzen
+            other_runs = self._runs(not outcome)[name]
+            left = _run_length(rounds, name, position - 1, -1, not outcome)
+            right = _run_length(rounds, name, position + 1, 1, not outcome)
+            if left and right:
+                _counter_remove(other_runs, left)
+                _counter_remove(other_runs, right)
+                other_runs[left + right] += 1
+    
+    def refresh_tails(self, rounds: List[Dict], end: Optional[int] = None):
+        """Aktuelle Strähne vor Position end nach Änderungen in der Mitte neu bestimmen (lokaler Scan)"""
+        if not self._tails_dirty:
+            return
+        
+        end = len(rounds) if end is None else end
+        for name in self.players:
+            position = end - 1
+            while position >= 0 and _outcome(rounds[position], name) is None:
+                position -= 1
+            
+            if position < 0:
+                self.tails[name] = (None, 0)
+            else:
+                last = _outcome(rounds[position], name)
+                self.tails[name] = (last, _run_length(rounds, name, position, -1, last))
+        self._tails_dirty = False
+    
+    # ===== Abgeleitete Auswertungen =====
+    
+    @property
+    def win_rates(self) -> Dict[str, float]:
+        """Gewinnrate pro Spieler in Prozent"""
+        return {
+            name: (self.wins[name] / self.games[name]) * 100 if self.games[name] > 0 else 0.0
+            for name in self.players
+        }
+    
+    @property
+    def team_stats_available(self) -> bool:
+        """False bei mehr als MAX_PLAYERS Spielern (Team-Auswertungen sind dann leer)"""
+        return self.teams is not None
+    
+    @property
+    def team_performance(self) -> List[Tuple[str, str, float, int]]:
+        """
+        Alle Pärchen mit mind. 2 gemeinsamen Spielen, sortiert nach Ø Punkten pro Spiel
+        Gezählt wird jede Runde auf derselben Seite, also auch als Gegner eines Solos und in Dreier-Teams
+        """
+        if self.teams is None:
+            return []
+        team_performance = [
+            (names[0], names[1], avg_points, games)
+            for names, avg_points, games, _ in self.teams.combinations(2, min_games=2)
+        ]
+        team_performance.sort(key=lambda x: x[2], reverse=True)
+        return team_performance
+    
+    @property
+    def trio_performance(self) -> List[TeamResult]:
+        """Dreier-Teams (5-6 Spieler, Solo-Gegner) mit mind. 2 gemeinsamen Spielen, sortiert nach Ø Punkten"""
+        if self.teams is None:
+            return []
+        return sorted(self.teams.combinations(3, min_games=2), key=lambda result: result[1], reverse=True)
+    
+    @property
+    def head_to_head(self) -> Dict[Tuple[str, str], Tuple[int, int]]:
+        """(a, b) -> (Siege von a gegen b, Runden gegeneinander)"""
+        return self.teams.head_to_head() if self.teams is not None else {}
+    
+    @property
+    def best_teams(self) -> List[Tuple[str, str, float, int]]:
+        team_performance = self.team_performance
+        return team_performance[:3] if len(team_performance) >= 3 else team_performance
+    
+    @property
+    def worst_teams(self) -> List[Tuple[str, str, float, int]]:
+        team_performance = self.team_performance
+        return team_performance[-3:] if len(team_performance) >= 3 else []
+    
+    @property
+    def avg_normal(self) -> float:
+        normal_count = self.total_rounds - self.bock_count
+        return self.normal_points / normal_count if normal_count else 0.0
+    
+    @property
+    def avg_bock(self) -> float:
+        return self.bock_points / self.bock_count if self.bock_count else 0.0
+    
+    @property
+    def solo_stats(self) -> Dict[str, Dict]:
+        return {
+            name: {
+                'solo_count': self.solo_counts[name],
+                'solo_wins': self.solo_wins[name],
+                'solo_rate': (self.solo_wins[name] / self.solo_counts[name]) * 100 if self.solo_counts[name] > 0 else 0.0
+            }
+            for name in self.players
+        }
+    
+    @property
+    def streaks(self) -> Dict[str, Dict]:
+        return {
+            name: {
+                'win_streak': max(self.win_runs[name], default=0),
+                'loss_streak': max(self.loss_runs[name], default=0)
+            }
+            for name in self.players
+        }
+    
+    @property
+    def re_kontra(self) -> Dict[str, int]:
+        total_games = self.re_wins + self.kontra_wins
+        return {
+            're_wins': self.re_wins,
+            'kontra_wins': self.kontra_wins,
+            're_rate': (self.re_wins / total_games * 100) if total_games > 0 else 0.0,
+            'kontra_rate': (self.kontra_wins / total_games * 100) if total_games > 0 else 0.0,
+            'total': total_games
+        }
+    
+    def aggregates(self) -> Dict:
+        """Vergleichbarer Rohzustand (für die Konsistenzprüfung)"""
+        return {
+            'counters': (self.total_rounds, self.solo_count, self.bock_count, self.normal_points,
+                         self.bock_points, self.re_wins, self.kontra_wins),
+            'wins': dict(self.wins),
+            'games': dict(self.games),
+            'solo_counts': dict(self.solo_counts),
+            'solo_wins': dict(self.solo_wins),
+            'teams': self.teams.aggregates() if self.teams is not None else None,
+            'win_runs': {name: dict(runs) for name, runs in self.win_runs.items()},
+            'loss_runs': {name: dict(runs) for name, runs in self.loss_runs.items()},
+        }
+
+
+def _counter_remove(counter: Counter, length: int):
+    """Entfernt eine Lauflänge aus der Multimenge (Einträge mit 0 werden gelöscht)"""
+    counter[length] -= 1
+    if counter[length] <= 0:
+        del counter[length]
+
+
+def _run_lengths(outcomes: np.ndarray) -> Tuple[Counter, Counter, Tuple[Optional[bool], int]]:
+    """Lauflängen der True- und False-Folgen (Run-Length-Encoding) plus letzte Strähne"""
+    if outcomes.size == 0:
+        return Counter(), Counter(), (None, 0)
+    
+    change_points = np.flatnonzero(outcomes[1:] != outcomes[:-1]) + 1
+    boundaries = np.concatenate(([0], change_points, [outcomes.size]))
+    lengths = np.diff(boundaries)
+    values = outcomes[boundaries[:-1]]
+    
+    win_runs = Counter(int(length) for length in lengths[values])
+    loss_runs = Counter(int(length) for length in lengths[~values])
+    return win_runs, loss_runs, (bool(values[-1]), int(lengths[-1]))
+
+
+def start_consistency_check(snapshot: StatsSnapshot, player_names: List[str], rounds: List[Dict]):
+    """
+    Startet im Debug-Modus eine Vollberechnung im Hintergrund und vergleicht sie mit dem inkrementellen Stand
+    Abweichungen werden geloggt; der Aufrufer wird nicht blockiert
+    """
+    if not DEBUG_STATS:
+        return
+    
+    expected_state = snapshot.aggregates()
+    rounds = list(rounds)
+    
+    def check():
+        full = StatsSnapshot.from_store(RoundStore.from_rounds(player_names, rounds))
+        if full.aggregates() != expected_state:
+            logger.warning("Inkrementelle Statistiken weichen von der Vollberechnung ab (%d Runden)", len(rounds))
+    
+    threading.Thread(target=check, name="stats-consistency-check", daemon=True).start()
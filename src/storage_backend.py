@@ -0,0 +1,219 @@
+"""
+Speicher-Backends für Spielstände
+Gemeinsame Schnittstelle für DynamoDB (siehe dynamodb_backend), SQLite und In-Memory
+sowie ein lokaler Read-Through-Cache vor einem entfernten Backend
+"""
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional
+from src.game_data_codec import encode_game_data, decode_game_data
+
+logger = logging.getLogger(__name__)
+
+
+class SessionHead(NamedTuple):
+    """Metadaten eines gespeicherten Spielstands (ohne die Spieldaten selbst)"""
+    version: int
+    last_updated: Optional[str]
+
+
+class StoredSession(NamedTuple):
+    """Gespeicherter Spielstand mit Version"""
+    game_data: Dict
+    version: int
+    last_updated: Optional[str]
+
+
+class VersionConflictError(Exception):
+    """Ein anderes Gerät hat seit dem letzten Lesen gespeichert (erwartete Version passt nicht)"""
+
+
+class StorageBackend:
+    """
+    Schnittstelle aller Speicher-Backends
+    
+    Versionen steigen mit jeder Speicherung um 1; 0 bedeutet "noch nie versioniert gespeichert".
+    Alle Methoden werfen bei Verbindungsfehlern, ohne UI-Ausgaben (auch aus dem Sync-Worker genutzt).
+    """
+    
+    name = 'abstract'
+    
+    def head(self, session_name: str) -> Optional[SessionHead]:
+        """Version und Zeitpunkt der letzten Speicherung (None wenn die Session nicht existiert)"""
+        raise NotImplementedError
+    
+    def load(self, session_name: str) -> Optional[StoredSession]:
+        """Lädt einen Spielstand (None wenn die Session nicht existiert)"""
+        raise NotImplementedError
+    
+    def save(self, session_name: str, game_data: Dict, expected_version: int) -> SessionHead:
+        """
+        Speichert einen Spielstand, wenn die gespeicherte Version noch expected_version ist
+        
+        Raises:
+            VersionConflictError: Die Session wurde zwischenzeitlich von einem anderen Gerät gespeichert
+        """
+        raise NotImplementedError
+    
+    def prime(self, session_name: str, stored: StoredSession):
+        """Teilt dem Backend einen anderweitig (z.B. aus dem Cache) geladenen Stand mit"""
+
+
+class InMemoryBackend(StorageBackend):
+    """Hält Spielstände im Prozess (für Tests und Einzelrechner ohne Persistenz)"""
+    
+    name = 'memory'
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Kodiert gespeichert, damit spätere Änderungen an den Dicts nicht durchschlagen
+        self._sessions: Dict[str, tuple] = {}
+    
+    def head(self, session_name: str) -> Optional[SessionHead]:
+        with self._lock:
+            entry = self._sessions.get(session_name)
+        return SessionHead(entry[1], entry[2]) if entry else None
+    
+    def load(self, session_name: str) -> Optional[StoredSession]:
+        with self._lock:
+            entry = self._sessions.get(session_name)
+        if entry is None:
+            return None
+        data, version, last_updated = entry
+        return StoredSession(decode_game_data(data), version, last_updated)
+    
+    def save(self, session_name: str, game_data: Dict, expected_version: int) -> SessionHead:
+        data = encode_game_data(game_data)
+        with self._lock:
+            entry = self._sessions.get(session_name)
+            if (entry[1] if entry else 0) != expected_version:
+                raise VersionConflictError(session_name)
+            head = SessionHead(expected_version + 1, datetime.now().isoformat())
+            self._sessions[session_name] = (data, head.version, head.last_updated)
+        return head
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Spielstände in einer lokalen SQLite-Datei (Offline-Betrieb, z.B. Turnier ohne WLAN)
+    Eine Verbindung pro Aufruf, damit Script-Runs und Sync-Worker parallel zugreifen können
+    """
+    
+    name = 'sqlite'
+    
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " session_name TEXT PRIMARY KEY,"
+                " version INTEGER NOT NULL,"
+                " last_updated TEXT,"
+                " created_at TEXT,"
+                " game_data BLOB NOT NULL)"
+            )
+    
+    @contextmanager
+    def _connect(self):
+        """Verbindung als Transaktion (Commit bei Erfolg, Rollback bei Fehler), danach geschlossen"""
+        connection = sqlite3.connect(self.path, timeout=10)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+    
+    def head(self, session_name: str) -> Optional[SessionHead]:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT version, last_updated FROM sessions WHERE session_name = ?", (session_name,)
+            ).fetchone()
+        return SessionHead(*row) if row else None
+    
+    def load(self, session_name: str) -> Optional[StoredSession]:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT game_data, version, last_updated FROM sessions WHERE session_name = ?", (session_name,)
+            ).fetchone()
+        if row is None:
+            return None
+        return StoredSession(decode_game_data(row[0]), row[1], row[2])
+    
+    def save(self, session_name: str, game_data: Dict, expected_version: int) -> SessionHead:
+        head = SessionHead(expected_version + 1, datetime.now().isoformat())
+        data = encode_game_data(game_data)
+        with self._connect() as connection:
+            if expected_version:
+                updated = connection.execute(
+                    "UPDATE sessions SET version = ?, last_updated = ?, game_data = ?"
+                    " WHERE session_name = ? AND version = ?",
+                    (head.version, head.last_updated, data, session_name, expected_version)
+                ).rowcount
+            else:
+                updated = connection.execute(
+                    "INSERT OR IGNORE INTO sessions (session_name, version, last_updated, created_at, game_data)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (session_name, head.version, head.last_updated, game_data.get('created_at'), data)
+                ).rowcount
+        if not updated:
+            raise VersionConflictError(session_name)
+        return head
+    
+    def put(self, session_name: str, stored: StoredSession):
+        """Übernimmt einen Stand unbedingt mit fremder Version (Ablage des lokalen Caches)"""
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO sessions (session_name, version, last_updated, created_at, game_data)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (session_name, stored.version, stored.last_updated,
+                 stored.game_data.get('created_at'), encode_game_data(stored.game_data))
+            )
+
+
+class CachedBackend(StorageBackend):
+    """
+    Lokaler Read-Through-Cache vor einem entfernten Backend
+    
+    Gelesen wird nur der Kopf (Version, last_updated) aus der Cloud; stimmt er mit der lokalen Kopie
+    überein, kommt der Spielstand von der Platte. Ist die Cloud nicht erreichbar, wird die lokale
+    Kopie geliefert. Gespeichert wird zuerst in der Cloud, danach wird die Kopie aktualisiert;
+    das Schreiben selbst läuft ohnehin verzögert im Sync-Worker.
+    """
+    
+    def __init__(self, remote: StorageBackend, cache: SQLiteBackend):
+        self.remote = remote
+        self.cache = cache
+        self.name = f"{remote.name}+cache"
+    
+    def head(self, session_name: str) -> Optional[SessionHead]:
+        return self.remote.head(session_name)
+    
+    def load(self, session_name: str) -> Optional[StoredSession]:
+        cached = self.cache.load(session_name)
+        try:
+            head = self.remote.head(session_name)
+        except Exception as e:
+            if cached is None:
+                raise
+            logger.warning("Cloud nicht erreichbar, lade '%s' aus dem lokalen Cache: %s", session_name, e)
+            return cached
+        
+        if head is None:
+            return None
+        if cached is not None and SessionHead(cached.version, cached.last_updated) == head:
+            self.remote.prime(session_name, cached)
+            return cached
+        
+        stored = self.remote.load(session_name)
+        if stored is not None:
+            self.cache.put(session_name, stored)
+        return stored
+    
+    def save(self, session_name: str, game_data: Dict, expected_version: int) -> SessionHead:
+        head = self.remote.save(session_name, game_data, expected_version)
+        self.cache.put(session_name, StoredSession(game_data, head.version, head.last_updated))
+        return head
@@ -0,0 +1,232 @@
+"""
+Write-Ahead-Journal für den Cloud-Sync
+Jede Änderung an einer Session wird lokal (SQLite) festgehalten, bevor sie hochgeladen wird.
+Scheitert der Upload (z.B. kein Netz), bleiben die Einträge liegen und werden später gesammelt nachgetragen.
+"""
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+# Eintragsarten
+ENTRY_ROUND = 'round'    # Runde neu oder geändert (payload: Runde + ID des Vorgängers)
+ENTRY_DELETE = 'delete'  # Runde gelöscht
+ENTRY_HEADER = 'header'  # Spieler und übrige Felder außer den Runden
+
+
+class JournalEntry(NamedTuple):
+    seq: int
+    writer: str
+    kind: str
+    round_id: Optional[str]
+    payload: Optional[Dict]
+
+
+class SyncJournal:
+    """
+    Append-only Journal in einer SQLite-Datei (WAL), geteilt von allen Script-Runs und dem Sync-Worker
+    
+    Einträge gehören zu einer Session und einem Schreiber (Browser-Session). Nach erfolgreichem
+    Upload werden sie bestätigt und gelöscht.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS journal ("
+                " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " session_name TEXT NOT NULL,"
+                " writer TEXT NOT NULL,"
+                " kind TEXT NOT NULL,"
+                " round_id TEXT,"
+                " payload TEXT,"
+                " created_at TEXT NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS journal_session ON journal (session_name, seq)")
+    
+    @contextmanager
+    def _connect(self):
+        """Verbindung als Transaktion (Commit bei Erfolg, Rollback bei Fehler), danach geschlossen"""
+        connection = sqlite3.connect(self.path, timeout=10)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+    
+    def append(self, session_name: str, writer: str, entries: List[tuple]) -> int:
+        """
+        Hängt Einträge (kind, round_id, payload) in einer Transaktion an
+        
+        Returns:
+            Höchste Sequenznummer des Schreibers für diese Session (0 wenn es keine gibt)
+        """
+        now = datetime.now().isoformat()
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT INTO journal (session_name, writer, kind, round_id, payload, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (session_name, writer, kind, round_id, None if payload is None else json.dumps(payload), now)
+                    for kind, round_id, payload in entries
+                ]
+            )
+            row = connection.execute(
+                "SELECT MAX(seq) FROM journal WHERE session_name = ? AND writer = ?", (session_name, writer)
+            ).fetchone()
+        return row[0] or 0
+    
+    def pending(self, session_name: str) -> List[JournalEntry]:
+        """Alle noch nicht hochgeladenen Einträge einer Session (aller Schreiber) in Reihenfolge"""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT seq, writer, kind, round_id, payload FROM journal WHERE session_name = ? ORDER BY seq",
+                (session_name,)
+            ).fetchall()
+        return [
+            JournalEntry(seq, writer, kind, round_id, None if payload is None else json.loads(payload))
+            for seq, writer, kind, round_id, payload in rows
+        ]
+    
+    def pending_count(self, session_name: str) -> int:
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT COUNT(*) FROM journal WHERE session_name = ?", (session_name,)
+            ).fetchone()[0]
+    
+    def acknowledge(self, session_name: str, up_to_seq: int, writer: Optional[str] = None):
+        """Löscht hochgeladene Einträge bis einschließlich up_to_seq (nur eines Schreibers oder aller)"""
+        with self._connect() as connection:
+            if writer is None:
+                connection.execute(
+                    "DELETE FROM journal WHERE session_name = ? AND seq <= ?", (session_name, up_to_seq)
+                )
+            else:
+                connection.execute(
+                    "DELETE FROM journal WHERE session_name = ? AND writer = ? AND seq <= ?",
+                    (session_name, writer, up_to_seq)
+                )
+
+
+def _header(game_data: Dict) -> Dict:
+    return {key: value for key, value in game_data.items() if key not in ('rounds', 'deleted_round_ids')}
+
+
+def diff_game_data(previous: Optional[Dict], current: Dict) -> List[tuple]:
+    """
+    Ermittelt die Journal-Einträge zwischen zwei Ständen (previous None = alles ist neu)
+    Runden werden bei Änderungen ersetzt, daher genügt meist der Identitätsvergleich
+    
+    Returns:
+        Liste von (kind, round_id, payload)
+    """
+    entries = []
+    header = _header(current)
+    if previous is None or _header(previous) != header:
+        entries.append((ENTRY_HEADER, None, header))
+    
+    previous_rounds = {r['id']: r for r in previous['rounds']} if previous else {}
+    current_ids = set()
+    predecessor = None
+    for round_data in current['rounds']:
+        current_ids.add(round_data['id'])
+        old = previous_rounds.get(round_data['id'])
+        if old is not round_data and old != round_data:
+            entries.append((ENTRY_ROUND, round_data['id'], {'round': dict(round_data), 'after': predecessor}))
+        predecessor = round_data['id']
+    
+    for round_id in previous_rounds:
+        if round_id not in current_ids:
+            entries.append((ENTRY_DELETE, round_id, None))
+    
+    return entries
+
+
+def changed_entries(previous: Dict, current: Dict, changed_round_ids: List[str]) -> List[tuple]:
+    """
+    Journal-Einträge für die gemeldeten Runden-IDs (geändert, eingefügt oder gelöscht), ohne den ganzen Stand
+    zu vergleichen
+    
+    Absichtlich weniger Einträge als diff_game_data(previous, current): Runden, die sich nur durch
+    Neu-Nummerieren nach einem Einfügen oder Löschen geändert haben, fehlen. apply_journal vergibt die
+    Rundennummern ohnehin lückenlos neu, der wiederhergestellte Stand ist derselbe.
+    
+    Geänderte Runden liegen fast immer am Ende (neue Runde): gesucht wird von hinten, bis alle gefunden sind.
+    
+    Returns:
+        Liste von (kind, round_id, payload)
+    """
+    entries = []
+    header = _header(current)
+    if _header(previous) != header:
+        entries.append((ENTRY_HEADER, None, header))
+    
+    pending = dict.fromkeys(changed_round_ids)
+    deleted = set(current.get('deleted_round_ids', [])) & pending.keys()
+    missing = pending.keys() - deleted
+    rounds = current['rounds']
+    positions = {}
+    for position in range(len(rounds) - 1, -1, -1):
+        if not missing:
+            break
+        round_id = rounds[position]['id']
+        if round_id in missing:
+            missing.discard(round_id)
+            positions[round_id] = position
+    
+    for round_id in pending:
+        if round_id in deleted:
+            entries.append((ENTRY_DELETE, round_id, None))
+        elif round_id in positions:
+            position = positions[round_id]
+            predecessor = rounds[position - 1]['id'] if position else None
+            entries.append((ENTRY_ROUND, round_id, {'round': dict(rounds[position]), 'after': predecessor}))
+    
+    return entries
+
+
+def apply_journal(game_data: Dict, entries: List[JournalEntry]) -> Dict:
+    """
+    Trägt Journal-Einträge in einen (z.B. aus der Cloud geladenen) Spielstand ein
+    
+    Idempotent über die Runden-IDs: bereits enthaltene Runden werden ersetzt statt verdoppelt,
+    gelöschte bleiben gelöscht. Mehrfaches Anwenden derselben Einträge ergibt denselben Stand.
+    
+    Returns:
+        Neues Dictionary mit den Spieldaten
+    """
+    result = dict(game_data)
+    rounds = list(game_data.get('rounds', []))
+    deleted = list(game_data.get('deleted_round_ids', []))
+    deleted_set = set(deleted)
+    
+    for entry in entries:
+        if entry.kind == ENTRY_HEADER:
+            result.update(entry.payload)
+        elif entry.kind == ENTRY_DELETE:
+            rounds = [r for r in rounds if r['id'] != entry.round_id]
+            if entry.round_id not in deleted_set:
+                deleted_set.add(entry.round_id)
+                deleted.append(entry.round_id)
+        elif entry.kind == ENTRY_ROUND and entry.round_id not in deleted_set:
+            positions = {r['id']: position for position, r in enumerate(rounds)}
+            round_data = entry.payload['round']
+            if entry.round_id in positions:
+                rounds[positions[entry.round_id]] = round_data
+            elif entry.payload.get('after') in positions:
+                rounds.insert(positions[entry.payload['after']] + 1, round_data)
+            elif entry.payload.get('after') is None:
+                rounds.insert(0, round_data)
+            else:
+                rounds.append(round_data)
+    
+    # Lückenlos neu nummerieren (Kopie nur bei geänderter Nummer)
+    for position, round_data in enumerate(rounds):
+        if round_data.get('round_number') != position + 1:
+            rounds[position] = {**round_data, 'round_number': position + 1}
+    
+    result['rounds'] = rounds
+    result['deleted_round_ids'] = deleted
+    return result
@@ -0,0 +1,100 @@
+"""
+Hintergrund-Worker für Cloud-Sync
+Speichert Spielstände außerhalb des Script-Runs und fasst schnelle Folgen von Speicherungen zusammen
+"""
+import threading
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Status-Werte pro Session
+SYNC_PENDING = 'pending'
+SYNC_OK = 'ok'
+SYNC_ERROR = 'error'
+
+# Wartezeiten (Sekunden) bis zur automatischen Wiederholung einer fehlgeschlagenen Speicherung
+RETRY_DELAYS = (2, 10, 30, 60)
+
+
+class SyncWorker:
+    """
+    Ein Worker-Thread pro Prozess mit einer Warteschlange pro Session
+    
+    Pro Session wird nur der jeweils neueste Stand vorgehalten: kommen mehrere Speicherungen,
+    während noch geschrieben wird, ersetzt jede neue die vorherige und es folgt genau ein Schreibvorgang.
+    """
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._pending: Dict[str, tuple] = {}
+        self._status: Dict[str, Dict] = {}
+        # Zähler pro Session: eine Wiederholung läuft nur, solange nichts Neueres eingereicht wurde
+        self._generation: Dict[str, int] = {}
+        self._thread = threading.Thread(target=self._run, name="cloud-sync-worker", daemon=True)
+        self._thread.start()
+    
+    def submit(self, session_name: str, write: Callable[[], Optional[Dict]]):
+        """
+        Stellt einen Schreibvorgang für eine Session ein (ersetzt einen noch nicht gestarteten)
+        
+        Args:
+            session_name: Cloud-Session-Name
+            write: Funktion, die den Stand schreibt und bei Fehlern eine Exception wirft
+                   (ihr Rückgabewert steht danach als 'result' im Status)
+        """
+        with self._condition:
+            self._generation[session_name] = self._generation.get(session_name, 0) + 1
+            self._pending[session_name] = (write, 0)
+            status = self._status.setdefault(session_name, {'state': SYNC_PENDING, 'message': None, 'updated_at': None, 'result': None})
+            status['state'] = SYNC_PENDING
+            self._condition.notify()
+    
+    def status(self, session_name: str) -> Optional[Dict]:
+        """Letzter bekannter Sync-Status einer Session (None wenn nie gespeichert)"""
+        with self._condition:
+            status = self._status.get(session_name)
+            return dict(status) if status else None
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                # Älteste Session zuerst: eine neu eingereihte Speicherung behält den Platz ihres Vorgängers,
+                # eine Session mit vielen Speicherungen kann die anderen so nicht überholen
+                session_name = next(iter(self._pending))
+                write, attempt = self._pending.pop(session_name)
+                generation = self._generation[session_name]
+            
+            result = None
+            try:
+                result = write()
+                state, message = SYNC_OK, None
+            except Exception as e:
+                logger.warning("Cloud-Sync für '%s' fehlgeschlagen: %s", session_name, e)
+                state, message = SYNC_ERROR, str(e)
+            
+            with self._condition:
+                status = self._status[session_name]
+                status['updated_at'] = datetime.now()
+                status['message'] = message
+                # Ist inzwischen ein neuerer Stand eingereiht, bleibt der Status "pending"
+                if session_name not in self._pending:
+                    status['state'] = state
+                if state == SYNC_OK:
+                    status['result'] = result
+                elif attempt < len(RETRY_DELAYS):
+                    timer = threading.Timer(RETRY_DELAYS[attempt], self._retry, args=(session_name, write, attempt + 1, generation))
+                    timer.daemon = True
+                    timer.start()
+    
+    def _retry(self, session_name: str, write: Callable[[], Optional[Dict]], attempt: int, generation: int):
+        """Reiht eine fehlgeschlagene Speicherung erneut ein (nicht, wenn inzwischen ein neuerer Stand kam)"""
+        with self._condition:
+            if self._generation.get(session_name) != generation or session_name in self._pending:
+                return
+            self._pending[session_name] = (write, attempt)
+            self._status[session_name]['state'] = SYNC_PENDING
+            self._condition.notify()
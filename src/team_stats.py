@@ -0,0 +1,167 @@
+"""
+Team-Kombinationen als Bitmasken
+Jede Runde wird als Gewinner- und Verlierer-Seite kodiert (Bit i = Spieler i). Pro Seite werden
+Spiele, Siege und Punkte in flachen Arrays der Länge 2^Spieler aufsummiert, Begegnungen zusätzlich
+pro (Gewinner-Seite, Verlierer-Seite). Pärchen, Dreier-Teams und "gegeneinander" für beliebige
+Teamgrößen ergeben sich daraus über Obermengen-Summen, ohne die Runden erneut zu durchlaufen.
+"""
+import numpy as np
+from itertools import combinations
+from typing import Dict, List, Tuple
+from src.round_store import RoundStore
+
+# Auswertung eines Teams: (Namen, Ø Punkte pro Spiel und Spieler, Spiele, Siege)
+TeamResult = Tuple[Tuple[str, ...], float, int, int]
+
+# Die Tabellen wachsen mit 4^Spieler (Begegnungen): 6 Spieler wie im Spieler-Setup sind 4096 Einträge,
+# 14 Spieler wären schon über zwei Milliarden
+MAX_PLAYERS = 6
+
+
+class TeamStats:
+    """
+    Summen pro Seite einer Runde, indiziert über die Bitmaske der Spieler
+    
+    side_games/side_wins/side_points zählen genau diese Seite (Punkte pro Mitglied, wie in scores);
+    matchups[gewinner * size + verlierer] zählt die Begegnungen. Bei 6 Spielern sind das 64 bzw.
+    4096 Einträge, unabhängig von der Anzahl der Runden.
+    """
+    
+    def __init__(self, player_names: List[str]):
+        if len(player_names) > MAX_PLAYERS:
+            raise ValueError(f"Team-Statistiken unterstützen höchstens {MAX_PLAYERS} Spieler, nicht {len(player_names)}")
+        self.players = tuple(player_names)
+        self.bits = {name: 1 << idx for idx, name in enumerate(self.players)}
+        self.size = 1 << len(self.players)
+        
+        self.side_games = np.zeros(self.size, dtype=np.int64)
+        self.side_wins = np.zeros(self.size, dtype=np.int64)
+        self.side_points = np.zeros(self.size, dtype=np.int64)
+        self.matchups = np.zeros(self.size * self.size, dtype=np.int64)
+    
+    @classmethod
+    def from_store(cls, store: RoundStore) -> 'TeamStats':
+        """Vollberechnung über den Spaltenspeicher (bincount pro Bitmaske)"""
+        stats = cls(store.players)
+        weights = np.int64(1) << np.arange(len(store.players), dtype=np.int64)
+        winners = store.winners & store.active
+        losers = store.active & ~store.winners
+        winner_masks = winners.astype(np.int64) @ weights
+        loser_masks = losers.astype(np.int64) @ weights
+        
+        # Alle Mitglieder einer Seite haben dieselbe Punktzahl: Summe / Anzahl
+        deltas = store.deltas.astype(np.int64)
+        winner_points = _member_points(deltas, winners)
+        loser_points = _member_points(deltas, losers)
+        
+        for masks, points, won in ((winner_masks, winner_points, True), (loser_masks, loser_points, False)):
+            counts = np.bincount(masks, minlength=stats.size)
+            stats.side_games += counts
+            if won:
+                stats.side_wins += counts
+            stats.side_points += np.bincount(masks, weights=points, minlength=stats.size).astype(np.int64)
+        stats.matchups += np.bincount(winner_masks * stats.size + loser_masks, minlength=stats.size * stats.size)
+        
+        # Seiten ohne Spieler (z.B. Runden ohne Gewinner) nicht als Team zählen
+        stats.side_games[0] = stats.side_wins[0] = stats.side_points[0] = 0
+        return stats
+    
+    def apply_round(self, round_data: Dict, sign: int = 1):
+        """Nimmt eine Runde auf (sign=1) oder heraus (sign=-1) - O(Spieler)"""
+        sitting_out = round_data.get('sitting_out')
+        scores = round_data.get('scores', {})
+        winner_mask = loser_mask = 0
+        winner_points = loser_points = 0
+        for name, bit in self.bits.items():
+            if name == sitting_out:
+                continue
+            if name in round_data['winners']:
+                winner_mask |= bit
+                winner_points = scores.get(name, 0)
+            else:
+                loser_mask |= bit
+                loser_points = scores.get(name, 0)
+        
+        for mask, points, won in ((winner_mask, winner_points, True), (loser_mask, loser_points, False)):
+            if mask:
+                self.side_games[mask] += sign
+                self.side_wins[mask] += sign * won
+                self.side_points[mask] += sign * points
+        self.matchups[winner_mask * self.size + loser_mask] += sign
+    
+    # ===== Auswertungen =====
+    
+    def together(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Spiele, Siege und Punkte pro Bitmaske, bei denen mindestens diese Spieler auf einer Seite waren
+        (Obermengen-Summe über alle Seiten, O(Spieler × 2^Spieler))
+        """
+        return tuple(self._superset_sums(values) for values in (self.side_games, self.side_wins, self.side_points))
+    
+    def combinations(self, team_size: int, min_games: int = 1) -> List[TeamResult]:
+        """Alle Teams der Größe team_size (2 = Pärchen, 3 = Dreier-Teams), die zusammen gespielt haben"""
+        games, wins, points = self.together()
+        results = []
+        for members in combinations(range(len(self.players)), team_size):
+            mask = sum(1 << idx for idx in members)
+            if games[mask] >= min_games:
+                names = tuple(self.players[idx] for idx in members)
+                results.append((names, float(points[mask] / games[mask]), int(games[mask]), int(wins[mask])))
+        return results
+    
+    def against(self, team: Tuple[str, ...], opponents: Tuple[str, ...]) -> Tuple[int, int]:
+        """
+        Begegnungen, in denen team (zusammen) gegen opponents (zusammen) gespielt hat
+        
+        Returns:
+            (Siege von team, Spiele)
+        """
+        team_mask = self._mask(team)
+        opponent_mask = self._mask(opponents)
+        matchups = self.matchups.reshape(self.size, self.size)
+        masks = np.arange(self.size)
+        team_sides = (masks & team_mask) == team_mask
+        opponent_sides = (masks & opponent_mask) == opponent_mask
+        
+        wins = int(matchups[np.ix_(team_sides, opponent_sides)].sum())
+        losses = int(matchups[np.ix_(opponent_sides, team_sides)].sum())
+        return wins, wins + losses
+    
+    def head_to_head(self) -> Dict[Tuple[str, str], Tuple[int, int]]:
+        """Für jedes Spielerpaar (a, b): (Siege von a gegen b, Runden auf verschiedenen Seiten)"""
+        matchups = self.matchups.reshape(self.size, self.size)
+        member = (np.arange(self.size)[:, None] >> np.arange(len(self.players))) & 1
+        # beat[a, b] = Runden mit a auf der Gewinner- und b auf der Verlierer-Seite
+        beat = member.T @ matchups @ member
+        return {
+            (first, second): (int(beat[i, j]), int(beat[i, j] + beat[j, i]))
+            for i, first in enumerate(self.players)
+            for j, second in enumerate(self.players)
+            if i != j
+        }
+    
+    def aggregates(self) -> Tuple:
+        """Vergleichbarer Rohzustand (für die Konsistenzprüfung)"""
+        return tuple(tuple(values.tolist()) for values in (self.side_games, self.side_wins, self.side_points, self.matchups))
+    
+    def _mask(self, names: Tuple[str, ...]) -> int:
+        mask = 0
+        for name in names:
+            mask |= self.bits[name]
+        return mask
+    
+    def _superset_sums(self, values: np.ndarray) -> np.ndarray:
+        result = values.copy()
+        for idx in range(len(self.players)):
+            step = 1 << idx
+            # Achse 1 ist Bit idx: Masken ohne das Bit erhalten die Summe der Masken mit dem Bit
+            view = result.reshape(-1, 2, step)
+            view[:, 0, :] += view[:, 1, :]
+        return result
+
+
+def _member_points(deltas: np.ndarray, members: np.ndarray) -> np.ndarray:
+    """Punktzahl eines Mitglieds pro Runde (0 bei leerer Seite)"""
+    counts = members.sum(axis=1)
+    sums = np.where(members, deltas, 0).sum(axis=1)
+    return np.divide(sums, counts, out=np.zeros(len(sums)), where=counts > 0)
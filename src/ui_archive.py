@@ -0,0 +1,132 @@
+"""
+Archiv UI-Komponente (vergangene Spielabende)
+"""
+import streamlit as st
+from datetime import datetime
+from src.data_manager import get_session_archive, apply_imported_session
+from src.rollups import LEADERBOARD_METRICS
+
+
+def render_archive_tab():
+    """Rendert das Archiv: Filter nach Spielern und Zeitraum, Detailansicht, Laden und Export"""
+    st.header("🗄️ Archiv")
+    archive = get_session_archive()
+    
+    all_players = archive.player_names()
+    if not all_players:
+        st.info("Noch keine Spielabende archiviert - über die Sidebar archivieren oder ein Archiv importieren.")
+        return
+    
+    # Filter (laufen als Index-Abfragen in SQLite)
+    col_players, col_exact = st.columns([3, 1])
+    with col_players:
+        players = st.multiselect("Spieler", options=all_players, key="archive_players")
+    with col_exact:
+        exact = st.checkbox("Genau diese", key="archive_exact", disabled=not players,
+                            help="Nur Abende, an denen genau die gewählten Spieler teilgenommen haben")
+    period = st.date_input("Zeitraum", value=(), key="archive_period", format="DD.MM.YYYY")
+    date_from = period[0].isoformat() if len(period) > 0 else None
+    date_to = period[1].isoformat() if len(period) > 1 else date_from
+    
+    sessions = archive.list_sessions(players or None, exact and bool(players), date_from, date_to)
+    st.caption(f"📅 {len(sessions)} Spielabende")
+    
+    # Ranglisten-Abfragen nur auf Wunsch (ein eingeklappter Expander würde sie bei jedem Rerun ausführen)
+    if st.toggle("🏆 Rangliste", key="archive_show_leaderboard"):
+        _render_leaderboard(archive, date_from, date_to)
+    
+    # Soli der gewählten Spieler im Zeitraum
+    if players:
+        solo_counts = [
+            f"{name}: {archive.count_rounds(name, solo=True, date_from=date_from, date_to=date_to)}"
+            for name in players
+        ]
+        st.caption(f"🎯 Soli im Zeitraum - {' | '.join(solo_counts)}")
+    
+    if not sessions:
+        return
+    
+    by_id = {session.session_id: session for session in sessions}
+    selected = st.selectbox(
+        "Spielabend",
+        options=list(by_id),
+        format_func=lambda session_id: _describe(by_id[session_id]),
+        key="archive_selected"
+    )
+    
+    # Detailansicht: Endstand des Abends
+    game_data = archive.load_session(selected)
+    if game_data is not None:
+        totals = {player['name']: 0 for player in game_data['players']}
+        for round_data in game_data['rounds']:
+            for name, score in round_data['scores'].items():
+                totals[name] = totals.get(name, 0) + score
+        
+        cols = st.columns(len(totals))
+        for col, (name, total) in zip(cols, sorted(totals.items(), key=lambda item: item[1], reverse=True)):
+            with col:
+                st.metric(name, f"{total:+d}")
+        
+        col_load, col_delete = st.columns([3, 1])
+        with col_load:
+            if st.button("📂 Spielabend laden", use_container_width=True, key="archive_load"):
+                apply_imported_session(game_data)
+                st.rerun()
+        with col_delete:
+            if st.button("🗑️", help="Aus dem Archiv löschen", use_container_width=True, key="archive_delete"):
+                archive.delete_session(selected)
+                st.rerun()
+    
+    # Export der gefilterten Abende als JSON Lines (wieder importierbar), erzeugt erst beim Klick
+    session_ids = list(by_id)
+    st.download_button(
+        label=f"📥 {len(session_ids)} Spielabende exportieren",
+        data=lambda: ''.join(archive.iter_export(session_ids)).encode('utf-8'),
+        file_name=f"doppelkopf_archiv_{datetime.now().strftime('%Y%m%d')}.jsonl",
+        mime="application/jsonl",
+        use_container_width=True,
+        key="archive_export"
+    )
+
+
+def _render_leaderboard(archive, date_from, date_to):
+    """Ewige Rangliste bzw. Rangliste des Zeitraums, berechnet aus den Rollups der Abende"""
+    metric = st.selectbox(
+        "Sortieren nach",
+        options=list(LEADERBOARD_METRICS),
+        format_func=lambda key: LEADERBOARD_METRICS[key][0],
+        key="archive_leaderboard_metric"
+    )
+    
+    leaders = archive.leaderboard(metric, k=10, date_from=date_from, date_to=date_to)
+    if not leaders:
+        st.info("Keine Runden im Zeitraum")
+        return
+    
+    for rank, totals in enumerate(leaders, 1):
+        st.write(
+            f"**{rank}. {totals.name}** - {totals.points:+d} Punkte | {totals.win_rate:.1f}% Gewinnrate "
+            f"({totals.games} Spiele) | {totals.solo_wins}/{totals.solo_count} Soli gewonnen"
+        )
+    
+    col_streaks, col_pairs = st.columns(2)
+    with col_streaks:
+        st.markdown("**🔥 Längste Strähnen**")
+        for record in sorted(archive.streak_records(date_from, date_to), key=lambda record: -record.longest_win):
+            st.write(f"{record.name}: {record.longest_win} Siege / {record.longest_loss} Niederlagen")
+    with col_pairs:
+        st.markdown("**👥 Beste Pärchen**")
+        for pair in archive.pair_leaderboard(3, date_from, date_to, min_games=5):
+            st.write(f"{' & '.join(pair.players)}: {pair.avg_points:+.2f} pro Spiel ({pair.games} Spiele)")
+    
+    # Sieger pro Jahr nur ohne Zeitraum-Filter (sonst wäre es meist nur ein Jahr)
+    if not date_from:
+        winners = archive.period_leaderboards('year', metric, k=1)
+        st.caption("📆 " + " | ".join(
+            f"{year}: {ranking[0].name}" for year, ranking in winners.items() if ranking
+        ))
+
+
+def _describe(session) -> str:
+    played_on = datetime.fromisoformat(session.played_on).strftime("%d.%m.%Y")
+    return f"{played_on} · {', '.join(session.players)} · {session.round_count} Runden"
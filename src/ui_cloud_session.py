@@ -6,8 +6,12 @@ import streamlit as st
 from src.cloud_sync import (
     load_from_dynamodb,
     save_to_dynamodb,
-    check_cloud_credentials
+    check_cloud_credentials,
+    get_sync_status,
+    get_pending_journal_count,
+    adopt_merged_sync_result
 )
+from src.sync_worker import SYNC_PENDING, SYNC_ERROR
 
 
 def render_cloud_session_dialog():
@@ -145,6 +149,23 @@ def render_cloud_sync_status():
         st.sidebar.success(f"☁️ Cloud-Sync aktiv")
         st.sidebar.caption(f"Session: `{session_name}`")
         
+        # Runden anderer Geräte übernehmen (Sidebar läuft vor den Tabs, die Anzeige ist also aktuell)
+        if adopt_merged_sync_result(session_name):
+            st.sidebar.info("🔀 Runden eines anderen Geräts wurden übernommen")
+        
+        # Status des Hintergrund-Syncs (wird beim nächsten Rerun aktualisiert)
+        sync_status = get_sync_status(session_name)
+        if sync_status:
+            if sync_status['state'] == SYNC_PENDING:
+                st.sidebar.caption("⏳ Speichert im Hintergrund…")
+            elif sync_status['state'] == SYNC_ERROR:
+                st.sidebar.warning(f"⚠️ Automatische Speicherung fehlgeschlagen: {sync_status['message']}")
+                pending = get_pending_journal_count(session_name)
+                if pending:
+                    st.sidebar.caption(f"📝 {pending} Änderungen lokal gesichert, werden automatisch nachgetragen")
+            else:
+                st.sidebar.caption(f"☁️ Zuletzt gespeichert: {sync_status['updated_at'].strftime('%H:%M:%S')}")
+        
         # Manuelle Sync-Option
         if st.sidebar.button("💾 Jetzt speichern", help="Manuelles Backup erstellen"):
             if save_to_dynamodb(session_name):
@@ -2,77 +2,111 @@
 Rundenhistorie UI-Komponente
 """
 import streamlit as st
-from src.game_logic import delete_round
+from typing import TYPE_CHECKING, Dict, List, Tuple
+from src.game_logic import delete_round, get_score_index
+from src.prewarm import wait_for_prewarm
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Anzahl Runden pro Seite (weitere über "Ältere Runden laden")
+HISTORY_PAGE_SIZE = 50
 
 
 def render_history_tab():
-    """Rendert den Historie-Tab als große Tabelle"""
+    """Rendert den Historie-Tab als eine große Tabelle (neueste Runden zuerst, seitenweise)"""
     st.header("Rundenhistorie")
-    if st.session_state.rounds:
-        # Berechne kumulative Gesamtpunkte pro Spieler über alle Runden
-        player_names = [p['name'] for p in st.session_state.players]
-        
-        # Header-Zeile mit Spielernamen (nur einmal ganz oben)
-        col_widths = [3] + [2] * len(player_names) + [1]
-        header_cols = st.columns(col_widths)
-        
-        with header_cols[0]:
-            st.markdown("**Info**")
-        
-        for idx, player_name in enumerate(player_names):
-            with header_cols[idx + 1]:
-                st.markdown(f"**{player_name}**")
-        
-        with header_cols[-1]:
-            st.markdown("")  # Leer für Löschen-Button-Spalte
-        
-        st.divider()
+    if not st.session_state.rounds:
+        st.info("Noch keine Runden gespielt")
+        return
+    
+    if 'history_visible_rounds' not in st.session_state:
+        st.session_state.history_visible_rounds = HISTORY_PAGE_SIZE
+    
+    rounds = st.session_state.rounds
+    player_names = [p['name'] for p in st.session_state.players]
+    visible = min(st.session_state.history_visible_rounds, len(rounds))
+    first = len(rounds) - visible
+    
+    table, styles, round_ids = _build_history_table(rounds, first, player_names)
+    
+    # Eine einzige Tabelle statt einer Zeile mit Spalten/Buttons pro Runde
+    # Key enthält die Runden-Version, damit eine Auswahl nach Änderungen nicht auf eine andere Runde zeigt
+    event = st.dataframe(
+        table.style.apply(lambda _: styles, axis=None),
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=f"history_table_{st.session_state.get('rounds_version', 0)}"
+    )
+    
+    st.caption(f"Zeige {visible} von {len(rounds)} Runden · Zeile anklicken zum Löschen")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if first > 0:
+            if st.button("⬇️ Ältere Runden laden", use_container_width=True):
+                st.session_state.history_visible_rounds += HISTORY_PAGE_SIZE
+                st.rerun()
+    
+    # Löschen über die Zeilenauswahl
+    with col2:
+        selected_rows = event.selection.rows if event is not None else []
+        if selected_rows:
+            if st.button("🗑️ Ausgewählte Runde löschen", use_container_width=True):
+                delete_round(round_ids[selected_rows[0]])
+                st.rerun()
+
+
+def _build_history_table(rounds: List[Dict], first: int, player_names: List[str]) -> Tuple['pd.DataFrame', 'pd.DataFrame', List[str]]:
+    """
+    Baut die Tabelle für die Runden ab Position first (neueste zuerst)
+    
+    Returns:
+        (Tabelle mit Anzeige-Texten, gleich geformte Tabelle mit CSS pro Zelle, Runden-IDs pro Zeile)
+    """
+    # Stand vor der ersten angezeigten Runde aus dem Fenwick-Index, danach laufend aufsummieren
+    cumulative_scores = get_score_index().totals_after(first)
+    
+    rows = []
+    row_styles = []
+    round_ids = []
+    for round_data in rounds[first:]:
+        round_type = "🎯 Solo" if round_data['is_solo'] else "👥 Normal"
+        team = "🟢 Re" if round_data.get('winning_team') == 'Re' else "🔴 Kontra"
+        bock = " 🎯" if round_data.get('is_bock') else ""
         
-        # Zeige Runden in umgekehrter Reihenfolge (neueste zuerst)
-        for round_data in reversed(st.session_state.rounds):
-            # Spaltenbreiten: Info + Spieler + Löschen-Button (konsistent mit Header)
-            cols = st.columns(col_widths)
-            
-            # Info-Spalte
-            with cols[0]:
-                round_type = "🎯 Solo" if round_data['is_solo'] else "👥 Normal"
-                team = "🟢 Re" if round_data.get('winning_team') == 'Re' else "🔴 Kontra"
-                bock = " 🎯" if round_data.get('is_bock') else ""
-                st.markdown(f"**R{round_data['round_number']}** {round_type} {team}{bock}")
-            
-            # Berechne Gesamtpunkte bis zu dieser Runde
-            cumulative_scores = {name: 0 for name in player_names}
-            for r in st.session_state.rounds:
-                if r['round_number'] <= round_data['round_number']:
-                    for name, score in r['scores'].items():
-                        if name in cumulative_scores:
-                            cumulative_scores[name] += score
+        row = {'Info': f"R{round_data['round_number']} {round_type} {team}{bock}"}
+        style = {'Info': ''}
+        for player_name in player_names:
+            score_change = round_data['scores'].get(player_name, 0)
+            cumulative_scores[player_name] = cumulative_scores.get(player_name, 0) + score_change
+            row[player_name] = f"{cumulative_scores[player_name]} ({score_change:+d})"
             
-            # Spieler-Spalten
-            for idx, player_name in enumerate(player_names):
-                with cols[idx + 1]:
-                    score_change = round_data['scores'].get(player_name, 0)
-                    total_score = cumulative_scores.get(player_name, 0)
-                    
-                    # Gewinner grün markieren
-                    is_winner = player_name in round_data['winners']
-                    
-                    if is_winner:
-                        st.markdown(f"<span style='color: #28a745; font-weight: bold;'>{total_score} ({score_change:+d})</span>", unsafe_allow_html=True)
-                    else:
-                        if score_change > 0:
-                            st.markdown(f"{total_score} (<span style='color: #28a745;'>{score_change:+d}</span>)", unsafe_allow_html=True)
-                        elif score_change < 0:
-                            st.markdown(f"{total_score} (<span style='color: #dc3545;'>{score_change:+d}</span>)", unsafe_allow_html=True)
-                        else:
-                            st.markdown(f"{total_score} ({score_change:+d})")
-            
-            # Löschen-Button
-            with cols[-1]:
-                if st.button("🗑️", key=f"delete_{round_data['id']}"):
-                    delete_round(round_data['id'])
-                    st.rerun()
-            
-            st.divider()
-    else:
-        st.info("Noch keine Runden gespielt")
+            # Gewinner grün und fett markieren, sonst Farbe nach Punkteänderung
+            if player_name in round_data['winners']:
+                style[player_name] = 'color: #28a745; font-weight: bold;'
+            elif score_change > 0:
+                style[player_name] = 'color: #28a745;'
+            elif score_change < 0:
+                style[player_name] = 'color: #dc3545;'
+            else:
+                style[player_name] = ''
+        
+        rows.append(row)
+        row_styles.append(style)
+        round_ids.append(round_data['id'])
+    
+    # Neueste Runde zuerst
+    rows.reverse()
+    row_styles.reverse()
+    round_ids.reverse()
+    
+    columns = ['Info'] + player_names
+    # pandas (~300 ms Import) erst laden, wenn die Historie tatsächlich angezeigt wird
+    import pandas as pd
+    wait_for_prewarm()
+    
+    return pd.DataFrame(rows, columns=columns), pd.DataFrame(row_styles, columns=columns), round_ids
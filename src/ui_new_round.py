@@ -2,13 +2,42 @@
 Neue Runde eintragen UI-Komponente
 """
 import streamlit as st
+import logging
+import time
 from src.game_logic import add_round
 from src.cloud_sync import auto_sync_after_round
+from src.statistics import get_stats_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Zielwert für die Serverzeit vom Eintragen bis zur fertig gerenderten Folgeseite
+ROUND_SUBMIT_LATENCY_BUDGET_MS = 150
 
 
 def render_new_round_tab():
     """Rendert den Tab für neue Runden"""
     st.header("Neue Runde eintragen")
+    
+    # Volle App-Runs seit der letzten eingetragenen Runde (Fragment-Reruns kommen hier nicht vorbei)
+    st.session_state.round_entry_full_reruns = st.session_state.get('round_entry_full_reruns', 0) + 1
+    
+    # Bestätigung der gerade eingetragenen Runde (überlebt den Rerun über den Session State)
+    submitted = st.session_state.get('round_submitted')
+    if submitted and not submitted.get('shown'):
+        submitted['shown'] = True
+        st.toast(submitted['message'])
+        # Rotation erst hier, vor dem Formular: der Submit-Run selbst macht nur das Nötigste
+        _auto_rotate_sitting_out()
+    
+    _render_round_form()
+
+
+@st.fragment
+def _render_round_form():
+    """
+    Eingabeformular als Fragment: Punkte, Gewinner, Team und Bock rendern nur das Formular neu,
+    erst das Eintragen löst einen vollen App-Run aus (Übersicht, Sidebar, Cloud-Sync)
+    """
     num_players = len(st.session_state.players)
     
     # Initialisiere reset_flag falls nicht vorhanden
@@ -33,27 +62,28 @@ def render_new_round_tab():
     for idx, point_value in enumerate(common_points[:3]):
         with cols_row1[idx]:
             button_type = "primary" if st.session_state.selected_points == point_value else "secondary"
-            if st.button(
+            st.button(
                 f"**{point_value}**",
                 key=f"points_{point_value}",
                 type=button_type,
-                use_container_width=True
-            ):
-                st.session_state.selected_points = point_value
-                st.rerun()
+                use_container_width=True,
+                on_click=_select_points,
+                args=(point_value,)
+            )
     
     # Zweite Reihe: 4, 5, [Andere]
     cols_row2 = st.columns(3)
     for idx, point_value in enumerate(common_points[3:]):
         with cols_row2[idx]:
             button_type = "primary" if st.session_state.selected_points == point_value else "secondary"
-            if st.button(
+            st.button(
                 f"**{point_value}**",
                 key=f"points_{point_value}",
                 type=button_type,
-                use_container_width=True            ):
-                st.session_state.selected_points = point_value
-                st.rerun()
+                use_container_width=True,
+                on_click=_select_points,
+                args=(point_value,)
+            )
     
     # "Andere" Option in dritter Spalte der zweiten Reihe
     with cols_row2[2]:
@@ -150,14 +180,10 @@ def render_new_round_tab():
     col_re, col_kontra = st.columns(2)
     
     with col_re:
-        team_re = st.button("🟢 Re", type="primary" if st.session_state.get('selected_team') == 'Re' else "secondary", use_container_width=True, key=f"team_re{key_suffix}")
-        if team_re:
-            st.session_state.selected_team = 'Re'
+        st.button("🟢 Re", type="primary" if st.session_state.get('selected_team') == 'Re' else "secondary", use_container_width=True, key=f"team_re{key_suffix}", on_click=_select_team, args=('Re',))
     
     with col_kontra:
-        team_kontra = st.button("🔴 Kontra", type="primary" if st.session_state.get('selected_team') == 'Kontra' else "secondary", use_container_width=True, key=f"team_kontra{key_suffix}")
-        if team_kontra:
-            st.session_state.selected_team = 'Kontra'
+        st.button("🔴 Kontra", type="primary" if st.session_state.get('selected_team') == 'Kontra' else "secondary", use_container_width=True, key=f"team_kontra{key_suffix}", on_click=_select_team, args=('Kontra',))
     
     # Initialisiere selected_team falls nicht vorhanden
     if 'selected_team' not in st.session_state:
@@ -175,10 +201,7 @@ def render_new_round_tab():
         submit_button = st.button("✅ Runde eintragen", type="primary", use_container_width=True)
     
     with col_btn2:
-        if st.button("🔄", help="Auswahl zurücksetzen"):
-            # Toggle reset flag um neue Keys zu erzwingen
-            st.session_state.reset_round_form = not st.session_state.reset_round_form
-            st.rerun()
+        st.button("🔄", help="Auswahl zurücksetzen", on_click=_reset_round_form)
     if submit_button:
         # Nochmal validieren vor Submit
         if num_players >= 5 and num_active < 4:
@@ -190,6 +213,7 @@ def render_new_round_tab():
 
 def _handle_round_submission(winners, points, sitting_out_player=None):
     """Verarbeitet die Rundeneintragung"""
+    started = time.perf_counter()
     
     num_winners = len(winners)
     num_players = len(st.session_state.players)
@@ -209,21 +233,18 @@ def _handle_round_submission(winners, points, sitting_out_player=None):
             # Solo gewonnen (1 vs 3)
             solo_player = winners[0]
             add_round(winners, points, is_solo=True, solo_player=solo_player, sitting_out=sitting_out_player, winning_team=winning_team, is_bock=is_bock)
-            st.success(f"✅ Solo-Runde eingetragen! {solo_player} gewinnt Solo mit {points:+d} Punkten")
-            sleep_and_rerun()
+            _finish_round_submission(f"✅ Solo-Runde eingetragen! {solo_player} gewinnt Solo mit {points:+d} Punkten", started)
         
         elif num_winners == 2:
             # Normalspiel (2 vs 2)
             add_round(winners, points, sitting_out=sitting_out_player, winning_team=winning_team, is_bock=is_bock)
-            st.success(f"✅ Runde eingetragen! {winners[0]} & {winners[1]} gewinnen {points:+d} Punkte")
-            sleep_and_rerun()
+            _finish_round_submission(f"✅ Runde eingetragen! {winners[0]} & {winners[1]} gewinnen {points:+d} Punkte", started)
         
         elif num_winners == 3:
             # Solo verloren (1 vs 3)
             solo_player = [p for p in active_players if p not in winners][0]
             add_round(winners, points, is_solo=True, solo_player=solo_player, sitting_out=sitting_out_player, winning_team=winning_team, is_bock=is_bock)
-            st.success(f"✅ Solo-Runde eingetragen! {solo_player} verliert Solo, andere gewinnen je {points:+d} Punkte")
-            sleep_and_rerun()
+            _finish_round_submission(f"✅ Solo-Runde eingetragen! {solo_player} verliert Solo, andere gewinnen je {points:+d} Punkte", started)
         
         else:
             st.error(f"❌ Du hast {num_winners} Gewinner gewählt. Bei 4 aktiven Spielern: 1 (Solo gewonnen), 2 (Normal) oder 3 (Solo verloren)!")
@@ -233,35 +254,79 @@ def _handle_round_submission(winners, points, sitting_out_player=None):
             # Solo gewonnen
             solo_player = winners[0]
             add_round(winners, points, is_solo=True, solo_player=solo_player, sitting_out=sitting_out_player, winning_team=winning_team, is_bock=is_bock)
-            st.success(f"✅ Solo-Runde eingetragen! {solo_player} gewinnt Solo mit {points:+d} Punkten")
-            sleep_and_rerun()
+            _finish_round_submission(f"✅ Solo-Runde eingetragen! {solo_player} gewinnt Solo mit {points:+d} Punkten", started)
         
         elif num_winners in [2, 3]:
             # Normalspiel bei 5-6 Spielern
             add_round(winners, points, sitting_out=sitting_out_player, winning_team=winning_team, is_bock=is_bock)
             winner_names = " & ".join(winners)
-            st.success(f"✅ Runde eingetragen! {winner_names} gewinnen {points:+d} Punkte")
-            sleep_and_rerun()
+            _finish_round_submission(f"✅ Runde eingetragen! {winner_names} gewinnen {points:+d} Punkte", started)
         
         elif num_winners == num_active - 1:
             # Solo verloren (alle außer einem gewinnen)
             solo_player = [p for p in active_players if p not in winners][0]
             add_round(winners, points, is_solo=True, solo_player=solo_player, sitting_out=sitting_out_player, winning_team=winning_team, is_bock=is_bock)
-            st.success(f"✅ Solo-Runde eingetragen! {solo_player} verliert Solo, andere gewinnen je {points:+d} Punkte")
-            sleep_and_rerun()
+            _finish_round_submission(f"✅ Solo-Runde eingetragen! {solo_player} verliert Solo, andere gewinnen je {points:+d} Punkte", started)
         
         else:
             st.error(f"❌ Ungültige Gewinner-Anzahl für {num_active} aktive Spieler!")
 
-def sleep_and_rerun():
-    import time
-    time.sleep(1.5)
-    _auto_rotate_sitting_out()
+def _select_points(point_value: int):
+    """Callback der Punkte-Buttons: läuft vor dem Fragment-Rerun, der Button ist damit sofort markiert"""
+    st.session_state.selected_points = point_value
+
+
+def _select_team(team: str):
+    """Callback der Team-Buttons"""
+    st.session_state.selected_team = team
+
+
+def _reset_round_form():
+    """Callback des Zurücksetzen-Buttons: Toggle reset flag um neue Keys zu erzwingen"""
+    st.session_state.reset_round_form = not st.session_state.reset_round_form
+
+
+def _finish_round_submission(message: str, started: float):
+    """
+    Schließt das Eintragen ab: Bestätigung merken und die ganze App neu rendern (auch aus dem Fragment)
+    Rotation, Cloud-Sync und Statistik-Aufwärmen laufen erst im Folge-Run (siehe run_deferred_round_tasks)
+    """
+    st.session_state.round_submitted = {'message': message, 'started': started, 'shown': False}
+    st.rerun(scope="app")
+
+
+def run_deferred_round_tasks():
+    """
+    Nacharbeiten einer eingetragenen Runde, am Ende des Folge-Runs aufzurufen (Seite ist dann schon gerendert)
+    Misst die Serverzeit vom Eintragen bis hierher gegen ROUND_SUBMIT_LATENCY_BUDGET_MS
+    """
+    submitted = st.session_state.get('round_submitted')
+    if not submitted or not submitted.get('shown'):
+        return
+    del st.session_state['round_submitted']
+    
+    latency_ms = (time.perf_counter() - submitted['started']) * 1000
+    latencies = st.session_state.setdefault('round_submit_latencies', [])
+    latencies.append(latency_ms)
+    del latencies[:-20]  # Nur die letzten Messungen behalten
+    
+    # Volle App-Runs für diese Runde (einschließlich des Folge-Runs, im Idealfall 1)
+    full_reruns = st.session_state.pop('round_entry_full_reruns', 0)
+    reruns = st.session_state.setdefault('round_entry_full_reruns_history', [])
+    reruns.append(full_reruns)
+    del reruns[:-20]
+    
+    if latency_ms > ROUND_SUBMIT_LATENCY_BUDGET_MS:
+        logger.warning("Runde eintragen: %.0f ms Serverzeit (Ziel: %d ms), %d volle Reruns",
+                       latency_ms, ROUND_SUBMIT_LATENCY_BUDGET_MS, full_reruns)
+    else:
+        logger.info("Runde eintragen: %.0f ms Serverzeit, %d volle Reruns", latency_ms, full_reruns)
     
-    # Automatisches Cloud-Sync nach jeder Runde
+    # Automatisches Cloud-Sync nach jeder Runde (Journal + Hintergrund-Worker)
     auto_sync_after_round()
     
-    st.rerun()
+    # Statistiken für den nächsten Tab-Wechsel aktuell halten (inkrementell, meist nur eine Runde)
+    get_stats_snapshot()
 
 
 def _auto_rotate_sitting_out():
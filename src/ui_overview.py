@@ -2,8 +2,15 @@
 Spielstand-Übersicht UI-Komponente
 """
 import streamlit as st
-import plotly.graph_objects as go
-from src.game_logic import calculate_scores
+import numpy as np
+from src.game_logic import calculate_scores, get_round_store, get_rounds_key
+from src.prewarm import wait_for_prewarm
+
+# Maximale Anzahl Punkte (x-Werte) pro Linie im Punkteverlauf, darüber wird ausgedünnt
+CHART_POINT_BUDGET = 600
+
+# Ab dieser Rundenzahl WebGL (Scattergl) ohne Marker statt SVG mit Markern
+CHART_WEBGL_THRESHOLD = 200
 
 
 def render_overview_tab():
@@ -15,13 +22,11 @@ def render_overview_tab():
     
     # Sortiere nach Punktzahl
     sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-      # Berechne Solo-Anzahl pro Spieler
-    solo_counts = {player['name']: 0 for player in st.session_state.players}
-    for round_data in st.session_state.rounds:
-        if round_data['is_solo'] and round_data.get('solo_player'):
-            solo_player = round_data['solo_player']
-            if solo_player in solo_counts:
-                solo_counts[solo_player] += 1
+    
+    # Berechne Solo-Anzahl pro Spieler (vektorisiert über den Spaltenspeicher)
+    store = get_round_store()
+    solo_player_counts = np.bincount(store.solo_player[store.solo_player >= 0], minlength=len(store.players))
+    solo_counts = {name: int(solo_player_counts[idx]) for idx, name in enumerate(store.players)}
     
     # Zeige Tabelle
     st.subheader("🏆 Rangliste")
@@ -57,27 +62,25 @@ def render_overview_tab():
         with col1:
             st.metric("Gespielte Runden", len(st.session_state.rounds))
         with col2:
-            solo_count = sum(1 for r in st.session_state.rounds if r['is_solo'])
+            solo_count = int(store.is_solo.sum())
             st.metric("Solo-Spiele", solo_count)
         
         with col3:
             # Gesamtpunkte = Summe aller absoluten Punkteänderungen
-            total_points = sum(abs(score) for r in st.session_state.rounds for score in r['scores'].values())
+            total_points = int(np.abs(store.deltas).sum(dtype=np.int64))
             st.metric("Gesamtpunkte", total_points)
         
         # Punkteverlauf-Plot
         st.divider()
         st.subheader("📊 Punkteverlauf")
         
-        # Berechne kumulative Punkte für jeden Spieler pro Runde
-        player_names = [p['name'] for p in st.session_state.players]
-        cumulative_data = {name: [0] for name in player_names}  # Startwert 0 bei Runde 0
+        # Kumulative Punkte pro Spieler (gecacht auf die Runden-Version, ggf. ausgedünnt)
+        player_names = list(store.players)
+        x_values, cumulative = _get_chart_series(CHART_POINT_BUDGET)
         
-        for round_data in st.session_state.rounds:
-            for player_name in player_names:
-                score_change = round_data['scores'].get(player_name, 0)
-                last_score = cumulative_data[player_name][-1]
-                cumulative_data[player_name].append(last_score + score_change)
+        # Plotly erst beim ersten Diagramm laden (Kaltstart ohne Runden braucht es nicht)
+        import plotly.graph_objects as go
+        wait_for_prewarm()
         
         # Erstelle Plotly Figure
         fig = go.Figure()
@@ -85,15 +88,18 @@ def render_overview_tab():
         # Farbpalette für bessere Unterscheidbarkeit
         colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b']
         
+        # Lange Sessions: WebGL-Rendering ohne Marker hält Browser und Payload schlank
+        use_webgl = store.size > CHART_WEBGL_THRESHOLD
+        scatter = go.Scattergl if use_webgl else go.Scatter
+        
         for idx, player_name in enumerate(player_names):
-            rounds = list(range(len(cumulative_data[player_name])))
-            fig.add_trace(go.Scatter(
-                x=rounds,
-                y=cumulative_data[player_name],
-                mode='lines+markers',
+            fig.add_trace(scatter(
+                x=x_values,
+                y=cumulative[:, idx],
+                mode='lines' if use_webgl else 'lines+markers',
                 name=player_name,
-                line=dict(width=3, color=colors[idx % len(colors)]),
-                marker=dict(size=8)
+                line=dict(width=2 if use_webgl else 3, color=colors[idx % len(colors)]),
+                marker=None if use_webgl else dict(size=8)
             ))
         
         # Layout anpassen
@@ -116,3 +122,48 @@ def render_overview_tab():
         fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
         
         st.plotly_chart(fig, use_container_width=True)
+
+
+def _get_chart_series(point_budget: int):
+    """
+    Gibt (x-Werte, kumulative Punkte pro Spieler) für den Punkteverlauf zurück
+    Gecacht auf Runden-Version und Punkte-Budget, damit Reruns ohne neue Runde nichts neu berechnen
+    """
+    cache_key = (get_rounds_key(), point_budget)
+    cached = st.session_state.get('chart_series')
+    if cached is not None and cached[0] == cache_key:
+        return cached[1]
+    
+    # Startwert 0 bei Runde 0
+    cumulative = get_round_store().cumulative()
+    x_values = _downsample_min_max(cumulative, point_budget)
+    series = (x_values, cumulative[x_values])
+    
+    st.session_state.chart_series = (cache_key, series)
+    return series
+
+
+def _downsample_min_max(values: np.ndarray, point_budget: int) -> np.ndarray:
+    """
+    Min-Max-Ausdünnung für mehrere Linien mit gemeinsamer x-Achse
+    Teilt die Runden in Buckets und behält pro Bucket und Spieler Minimum und Maximum,
+    so bleiben Ausschläge sichtbar. Gibt die sortierten Zeilenindizes zurück (höchstens point_budget).
+    """
+    num_points, num_series = values.shape
+    if num_points <= point_budget:
+        return np.arange(num_points)
+    
+    # Pro Bucket bis zu 2 Punkte je Linie plus erster/letzter Punkt
+    num_buckets = max(1, (point_budget - 2) // (2 * max(num_series, 1)))
+    bucket_size = -(-num_points // num_buckets)
+    
+    padded = np.pad(values, ((0, num_buckets * bucket_size - num_points), (0, 0)), mode='edge')
+    buckets = padded.reshape(num_buckets, bucket_size, num_series)
+    offsets = np.arange(num_buckets)[:, None] * bucket_size
+    
+    indices = np.concatenate((
+        [0, num_points - 1],
+        (buckets.argmin(axis=1) + offsets).ravel(),
+        (buckets.argmax(axis=1) + offsets).ravel()
+    ))
+    return np.unique(np.minimum(indices, num_points - 1))
@@ -3,7 +3,14 @@ Sidebar UI-Komponente
 """
 import streamlit as st
 from datetime import datetime
-from src.data_manager import export_session, import_session
+from src.data_manager import (
+    session_exporter,
+    read_import_file,
+    load_import_session,
+    apply_imported_session,
+    archive_current_session,
+    archive_import_file
+)
 from src.session_manager import reset_session
 from src.ui_cloud_session import render_cloud_sync_status
 
@@ -31,33 +38,37 @@ def render_sidebar():
         # Export/Import
         st.subheader("💾 Speichern/Laden")
         if st.session_state.session_started:
-            # Export
-            json_export = export_session()
+            # Export: JSON wird erst beim Klick erzeugt, nicht bei jedem Rerun
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"doppelkopf_{timestamp}.json"
             
             st.download_button(
                 label="📥 Session exportieren",
-                data=json_export,
+                data=session_exporter(),
                 file_name=filename,
                 mime="application/json",
                 use_container_width=True,
                 help="Speichere die Session als JSON-Datei",
-                key=f"download_session_{len(st.session_state.rounds)}"  # Eindeutiger Key
+                key="download_session"
             )
             
             st.caption("💡 Tipp: Exportiere regelmäßig!")
+            
+            # Spielabend im lokalen Archiv ablegen (erneutes Archivieren aktualisiert ihn)
+            if st.button("🗄️ Spielabend archivieren", use_container_width=True, disabled=not st.session_state.rounds):
+                archive_current_session()
+                st.success("✅ Spielabend archiviert")
         
         # Import
-        uploaded_file = st.file_uploader("📤 Session importieren", type=['json'], help="Lade eine gespeicherte Session")
+        uploaded_file = st.file_uploader(
+            "📤 Session importieren",
+            type=['json', 'jsonl', 'zip'],
+            help="Lade eine gespeicherte Session oder ein Archiv mit mehreren Sessions (Zip oder JSON Lines)"
+        )
         if uploaded_file is not None:
             file_id = f"{uploaded_file.name}_{uploaded_file.size}"
             if st.session_state.last_imported_file != file_id:
-                json_data = uploaded_file.read().decode('utf-8')
-                if import_session(json_data):
-                    st.session_state.last_imported_file = file_id
-                    st.success("✅ Session erfolgreich importiert!")
-                    st.rerun()
+                _render_import(uploaded_file, file_id)
             else:
                 st.info("ℹ️ Diese Session ist bereits geladen")
         
@@ -66,3 +77,66 @@ def render_sidebar():
         # Neue Session starten
         if st.button("🔄 Neue Session starten", type="secondary", use_container_width=True):
             reset_session()
+
+
+def _render_import(uploaded_file, file_id: str):
+    """Prüft die hochgeladene Datei (einmal pro Datei) und übernimmt sie bzw. bietet die enthaltenen Sessions an"""
+    scan = st.session_state.get('import_scan')
+    if scan is None or scan['file_id'] != file_id:
+        progress_bar = st.progress(0.0, text="Datei wird geprüft …")
+        
+        def report(done: int, total: int):
+            progress_bar.progress(min(done / total, 1.0) if total else 1.0, text=f"Datei wird geprüft … {done // 1024} / {total // 1024} KB")
+        
+        game_data, overview = read_import_file(uploaded_file, uploaded_file.name, report)
+        progress_bar.empty()
+        
+        # Genau eine gültige Session: wie bisher direkt übernehmen
+        if game_data is not None:
+            apply_imported_session(game_data)
+            st.session_state.last_imported_file = file_id
+            st.success("✅ Session erfolgreich importiert!")
+            st.rerun()
+        
+        scan = {'file_id': file_id, 'overview': overview}
+        st.session_state.import_scan = scan
+    
+    overview = scan['overview']
+    valid = [index for index, entry in enumerate(overview) if not entry['error']]
+    invalid = [entry for entry in overview if entry['error']]
+    
+    if len(overview) == 1 and invalid:
+        st.error(f"❌ Fehler beim Importieren: {invalid[0]['error']}")
+        return
+    
+    st.caption(f"📦 {len(overview)} Sessions gefunden, davon {len(valid)} gültig")
+    if invalid:
+        with st.expander(f"⚠️ {len(invalid)} ungültige Sessions"):
+            for entry in invalid:
+                st.caption(f"**{entry['source']}**: {entry['error']}")
+    if not valid:
+        return
+    
+    def describe(index: int) -> str:
+        entry = overview[index]
+        date = (entry['created_at'] or '')[:10]
+        return f"{date} · {', '.join(entry['players'])} · {entry['rounds']} Runden"
+    
+    if st.button(f"🗄️ Alle {len(valid)} gültigen ins Archiv", use_container_width=True, key=f"import_archive_{file_id}"):
+        progress_bar = st.progress(0.0, text="Sessions werden archiviert …")
+        archived, _ = archive_import_file(
+            uploaded_file, uploaded_file.name,
+            lambda done, total: progress_bar.progress(min(done / total, 1.0) if total else 1.0, text="Sessions werden archiviert …")
+        )
+        progress_bar.empty()
+        st.success(f"✅ {archived} Spielabende archiviert")
+    
+    selected = st.selectbox("Session auswählen", options=valid, format_func=describe, key=f"import_choice_{file_id}")
+    if st.button("📂 Session laden", use_container_width=True, key=f"import_load_{file_id}"):
+        game_data = load_import_session(uploaded_file, uploaded_file.name, selected)
+        if game_data is None:
+            st.error("❌ Session konnte nicht erneut gelesen werden")
+            return
+        apply_imported_session(game_data)
+        st.success("✅ Session erfolgreich importiert!")
+        st.rerun()
@@ -2,14 +2,7 @@
 Statistik-Übersicht UI-Komponente
 """
 import streamlit as st
-from src.statistics import (
-    calculate_win_rate,
-    calculate_team_performance,
-    calculate_average_points,
-    calculate_solo_stats,
-    calculate_longest_streak,
-    calculate_re_kontra_stats
-)
+from src.statistics import get_stats_snapshot
 
 
 def render_statistics_tab():
@@ -20,6 +13,9 @@ def render_statistics_tab():
         st.info("Noch keine Runden gespielt - Statistiken werden nach der ersten Runde angezeigt.")
         return
     
+    # Alle Statistiken in einem Durchlauf, gecacht bis sich die Spieldaten ändern
+    stats = get_stats_snapshot()
+    
     # Tab-Struktur für bessere Übersichtlichkeit
     stats_tab1, stats_tab2, stats_tab3 = st.tabs([
         "🎯 Spieler-Statistiken", 
@@ -31,7 +27,7 @@ def render_statistics_tab():
     with stats_tab1:
         st.subheader("🏆 Gewinnrate pro Spieler")
         
-        win_rates = calculate_win_rate()
+        win_rates = stats.win_rates
         sorted_win_rates = sorted(win_rates.items(), key=lambda x: x[1], reverse=True)
         
         for idx, (player_name, win_rate) in enumerate(sorted_win_rates):
@@ -62,27 +58,27 @@ def render_statistics_tab():
         # Solo-Statistiken
         st.subheader("🎯 Solo-Spiele & Erfolgsrate")
         
-        solo_stats = calculate_solo_stats()
+        solo_stats = stats.solo_stats
         
         # Filtern: Nur Spieler mit Solo-Spielen anzeigen
-        players_with_solos = [(name, stats) for name, stats in solo_stats.items() if stats['solo_count'] > 0]
+        players_with_solos = [(name, solo) for name, solo in solo_stats.items() if solo['solo_count'] > 0]
         
         if players_with_solos:
-            for player_name, stats in sorted(players_with_solos, key=lambda x: x[1]['solo_rate'], reverse=True):
+            for player_name, solo in sorted(players_with_solos, key=lambda x: x[1]['solo_rate'], reverse=True):
                 col1, col2, col3, col4 = st.columns([2, 1, 1, 2])
                 
                 with col1:
                     st.write(f"**{player_name}**")
                 
                 with col2:
-                    st.metric("Gesamt", stats['solo_count'])
+                    st.metric("Gesamt", solo['solo_count'])
                 
                 with col3:
-                    st.metric("Gewonnen", stats['solo_wins'])
+                    st.metric("Gewonnen", solo['solo_wins'])
                 
                 with col4:
-                    rate_color = "#28a745" if stats['solo_rate'] >= 50 else "#dc3545"
-                    st.markdown(f"<span style='color: {rate_color}; font-weight: bold;'>Erfolgsrate: {stats['solo_rate']:.1f}%</span>",
+                    rate_color = "#28a745" if solo['solo_rate'] >= 50 else "#dc3545"
+                    st.markdown(f"<span style='color: {rate_color}; font-weight: bold;'>Erfolgsrate: {solo['solo_rate']:.1f}%</span>",
                                unsafe_allow_html=True)
         else:
             st.info("Noch keine Solo-Spiele gespielt")
@@ -92,7 +88,7 @@ def render_statistics_tab():
         # Gewinn-/Verluststrähnen
         st.subheader("🔥 Längste Gewinn-/Verluststrähne")
         
-        streaks = calculate_longest_streak()
+        streaks = stats.streaks
         
         for player_name, streak_data in sorted(streaks.items(), 
                                                key=lambda x: x[1]['win_streak'], 
@@ -120,9 +116,11 @@ def render_statistics_tab():
         st.subheader("👥 Beste & Schlechteste Pärchen")
         st.caption("Basierend auf durchschnittlichen Punkten pro Spiel (mind. 2 gemeinsame Runden)")
         
-        best_teams, worst_teams = calculate_team_performance()
+        best_teams, worst_teams = stats.best_teams, stats.worst_teams
         
-        if best_teams:
+        if not stats.team_stats_available:
+            st.info("Team-Statistiken gibt es nur für Runden mit höchstens 6 Spielern")
+        elif best_teams:
             st.markdown("### 🏆 Beste Pärchen")
             for player1, player2, avg_score, games in best_teams:
                 col1, col2, col3 = st.columns([3, 1, 1])
@@ -156,14 +154,46 @@ def render_statistics_tab():
                     with col3:
                         st.caption(f"{games} Spiele")
         else:
-            st.info("Noch nicht genug Normalspiele für Team-Statistiken (mind. 2 Spiele pro Pärchen)")
+            st.info("Noch nicht genug gemeinsame Runden für Team-Statistiken (mind. 2 Spiele pro Pärchen)")
+        
+        # Dreier-Teams gibt es bei 5-6 Spielern und als Gegner eines Solos
+        trios = stats.trio_performance
+        if trios:
+            st.divider()
+            st.markdown("### 👨‍👩‍👦 Beste Dreier-Teams")
+            for names, avg_score, games, wins in trios[:3]:
+                col1, col2, col3 = st.columns([3, 1, 1])
+                
+                with col1:
+                    st.write(" & ".join(f"**{name}**" for name in names))
+                
+                with col2:
+                    color = "#28a745" if avg_score > 0 else "#ffc107" if avg_score == 0 else "#dc3545"
+                    st.markdown(f"<span style='color: {color}; font-weight: bold;'>{avg_score:+.2f} Ø Pkt/Spiel</span>",
+                               unsafe_allow_html=True)
+                
+                with col3:
+                    st.caption(f"{wins}/{games} gewonnen")
+        
+        # Direkter Vergleich: Runden auf verschiedenen Seiten
+        head_to_head = stats.head_to_head
+        duels = [
+            (first, second, wins, games)
+            for (first, second), (wins, games) in head_to_head.items()
+            if first < second and games > 0
+        ]
+        if duels:
+            st.divider()
+            st.markdown("### ⚔️ Gegeneinander")
+            for first, second, wins, games in sorted(duels, key=lambda duel: -duel[3]):
+                st.write(f"**{first}** {wins} : {games - wins} **{second}** ({games} Runden)")
     
     # ===== TAB 3: Allgemeine Statistiken =====
     with stats_tab3:
         st.subheader("📈 Allgemeine Statistiken")
         
         # Durchschnittliche Punkte
-        avg_normal, avg_bock = calculate_average_points()
+        avg_normal, avg_bock = stats.avg_normal, stats.avg_bock
         
         col1, col2 = st.columns(2)
         
@@ -193,7 +223,7 @@ def render_statistics_tab():
         # Re vs. Kontra Statistik
         st.subheader("🟢 Re vs. 🔴 Kontra")
         
-        re_kontra = calculate_re_kontra_stats()
+        re_kontra = stats.re_kontra
         
         if re_kontra['total'] > 0:
             col1, col2, col3 = st.columns(3)
@@ -226,9 +256,9 @@ def render_statistics_tab():
         # Weitere allgemeine Stats
         st.subheader("🎮 Spielübersicht")
         
-        total_rounds = len(st.session_state.rounds)
-        solo_count = sum(1 for r in st.session_state.rounds if r['is_solo'])
-        bock_count = sum(1 for r in st.session_state.rounds if r.get('is_bock', False))
+        total_rounds = stats.total_rounds
+        solo_count = stats.solo_count
+        bock_count = stats.bock_count
         normal_count = total_rounds - solo_count
         
         col1, col2, col3, col4 = st.columns(4)
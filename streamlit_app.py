@@ -5,12 +5,14 @@ Progressive Web App für Doppelkopf-Spielverwaltung
 
 import streamlit as st
 from src.session_manager import init_session_state
+from src.prewarm import start_prewarm
 from src.ui_sidebar import render_sidebar
 from src.ui_player_setup import render_player_setup
-from src.ui_new_round import render_new_round_tab
+from src.ui_new_round import render_new_round_tab, run_deferred_round_tasks
 from src.ui_overview import render_overview_tab
 from src.ui_history import render_history_tab
 from src.ui_statistics import render_statistics_tab
+from src.ui_archive import render_archive_tab
 
 # Seitenkonfiguration
 st.set_page_config(
@@ -57,8 +59,21 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# Ansichten im Spielmodus: Schlüssel → (Beschriftung, Render-Funktion)
+VIEWS = {
+    'new_round': ("📝 Neue Runde", render_new_round_tab),
+    'overview': ("📊 Übersicht", render_overview_tab),
+    'statistics': ("📈 Statistiken", render_statistics_tab),
+    'history': ("📜 Historie", render_history_tab),
+    'archive': ("🗄️ Archiv", render_archive_tab),
+}
+
+
 def main():
     """Hauptfunktion der App"""
+    # Teure Imports (plotly, pandas, boto3) im Hintergrund nachladen, einmal pro Prozess
+    start_prewarm()
+    
     # Initialisiere Session State
     init_session_state()
     
@@ -71,21 +86,26 @@ def main():
     if not st.session_state.session_started:
         # Spieler-Setup Phase
         render_player_setup()
-    else:
-        # Spiel-Phase mit Tabs
-        tab1, tab2, tab3, tab4 = st.tabs(["📝 Neue Runde", "📊 Übersicht", "📈 Statistiken", "📜 Historie"])
-        
-        with tab1:
-            render_new_round_tab()
         
-        with tab2:
-            render_overview_tab()
+        # Archiv auch ohne laufende Session erreichbar (alte Abende ansehen oder laden)
+        # Umschalter statt Expander: ein eingeklappter Expander würde das Archiv trotzdem bei jedem Rerun abfragen
+        if st.toggle("🗄️ Archiv vergangener Spielabende", key="show_archive"):
+            render_archive_tab()
+    else:
+        # Spiel-Phase: Navigation statt st.tabs, damit nur die gewählte Ansicht berechnet und gesendet wird
+        st.radio(
+            "Ansicht",
+            options=list(VIEWS),
+            format_func=lambda view: VIEWS[view][0],
+            horizontal=True,
+            label_visibility="collapsed",
+            key="active_view"
+        )
         
-        with tab3:
-            render_statistics_tab()
+        VIEWS[st.session_state.active_view][1]()
         
-        with tab4:
-            render_history_tab()
+        # Nacharbeiten einer gerade eingetragenen Runde erst nach dem Rendern
+        run_deferred_round_tasks()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,11 @@
+"""
+Gemeinsame Einstellungen der Tests: Projektverzeichnis importierbar, kein Vorwärm-Thread
+(der Hintergrund-Import von plotly/pandas würde die gemessenen Serverzeiten verfälschen)
+"""
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+os.environ.setdefault("DOPPELKOPF_PREWARM", "0")
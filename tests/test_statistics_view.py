@@ -0,0 +1,88 @@
+"""
+Statistik-Ansicht mit Solo- und Normalrunden (AppTest)
+Alle drei Reiter werden gerendert; Solo-Spieler, Strähnen und Pärchen müssen erscheinen.
+Stände mit mehr Spielern als die Team-Tabellen fassen (z.B. ältere Cloud-Stände) zeigen keine Team-Statistiken.
+"""
+import os
+import uuid
+import pytest
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit_app.py")
+
+PLAYERS = ["Anna", "Ben", "Carla", "Dirk"]
+
+
+def _round(number, winners, points, solo_player=None, players=PLAYERS):
+    """Runde im Format von _build_round (alle Spieler aktiv)"""
+    if solo_player is None:
+        scores = {name: points if name in winners else -points for name in players}
+    else:
+        solo_won = solo_player in winners
+        opponents = len(players) - 1
+        scores = {name: (opponents * points if solo_won else -opponents * points) if name == solo_player
+                  else (-points if solo_won else points) for name in players}
+    return {
+        'id': str(uuid.uuid4()),
+        'round_number': number,
+        'timestamp': f"2026-01-01T20:{number:02d}:00",
+        'is_solo': solo_player is not None,
+        'winners': winners,
+        'points': points,
+        'solo_player': solo_player,
+        'sitting_out': None,
+        'winning_team': 'Re',
+        'is_bock': False,
+        'scores': scores
+    }
+
+
+def _statistics_view(players, rounds) -> AppTest:
+    """App im Spielmodus mit den gegebenen Runden, Statistik-Ansicht geöffnet"""
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    at.run()
+    at.session_state.players = [{'id': str(idx), 'name': name} for idx, name in enumerate(players)]
+    at.session_state.rounds = rounds
+    at.session_state.rounds_version = 1
+    at.session_state.session_started = True
+    at.session_state.active_view = 'statistics'
+    at.run()
+    return at
+
+
+@pytest.fixture
+def app():
+    """Drei Normalrunden und ein gewonnenes Solo"""
+    return _statistics_view(PLAYERS, [
+        _round(1, ["Anna", "Ben"], 2),
+        _round(2, ["Anna", "Ben"], 3),
+        _round(3, ["Carla"], 2, solo_player="Carla"),
+        _round(4, ["Carla", "Dirk"], 1),
+    ])
+
+
+def test_statistics_view_renders_with_solo_round(app):
+    assert not app.exception, app.exception
+    
+    subheaders = [subheader.value for subheader in app.subheader]
+    assert "🎯 Solo-Spiele & Erfolgsrate" in subheaders
+    assert "🔥 Längste Gewinn-/Verluststrähne" in subheaders
+    
+    # Solo-Zeile von Carla: 1 gespielt, 1 gewonnen
+    metrics = {(metric.label, metric.value) for metric in app.metric}
+    assert ("Gesamt", "1") in metrics and ("Gewonnen", "1") in metrics
+    
+    # Pärchen aus den Normalrunden
+    assert any("**Anna** & **Ben**" == text.value for text in app.markdown)
+
+
+def test_statistics_view_without_team_stats_for_too_many_players():
+    players = [f"Spieler {idx}" for idx in range(1, 9)]
+    at = _statistics_view(players, [
+        _round(1, players[:4], 2, players=players),
+        _round(2, [players[0]], 1, solo_player=players[0], players=players),
+    ])
+    assert not at.exception, at.exception
+    
+    assert any("höchstens 6 Spielern" in info.value for info in at.info)
+    assert ("Gesamt", "1") in {(metric.label, metric.value) for metric in at.metric}